@@ -0,0 +1 @@
+"""Benchmarks for the AnyList client hot paths."""
@@ -0,0 +1,159 @@
+"""Local stand-in for the AnyList API endpoints used by the client."""
+
+from __future__ import annotations
+
+import random
+import uuid
+
+from aiohttp import web
+
+from anylist import messages_pb2 as pb
+
+CATEGORIES = ["produce", "dairy", "bakery", "meat", "frozen", "pantry", "other"]
+
+
+def make_user_data(
+    item_count: int, items_per_list: int = 5000, seed: int = 0
+) -> pb.PBUserDataResponse:
+    """
+    Build a synthetic account with ``item_count`` items spread over lists.
+
+    The same arguments always produce the same account, so results stay
+    comparable across runs.
+    """
+    rng = random.Random(seed)
+    user_data = pb.PBUserDataResponse()
+    lists_response = user_data.shoppingListsResponse
+    list_count = max(1, -(-item_count // items_per_list))
+
+    for list_index in range(list_count):
+        lst = lists_response.newLists.add(
+            identifier=f"list{list_index:04d}",
+            name=f"List {list_index}",
+            creator="user0",
+            timestamp=1_700_000_000 + list_index,
+        )
+        count = min(items_per_list, item_count - list_index * items_per_list)
+        for item_index in range(count):
+            lst.items.add(
+                identifier=uuid.UUID(int=rng.getrandbits(128)).hex,
+                listId=lst.identifier,
+                name=f"item {list_index}-{item_index}",
+                details="synthetic",
+                checked=rng.random() < 0.3,
+                categoryMatchId=rng.choice(CATEGORIES),
+                userId=f"user{rng.randrange(4)}",
+                quantityPb=pb.PBItemQuantity(amount=str(rng.randrange(1, 5))),
+                serverModTime=1_700_000_000 + rng.random() * 1_000_000,
+                manualSortIndex=item_index,
+            )
+        lists_response.orderedIds.append(lst.identifier)
+
+    return user_data
+
+
+class FakeAnyListServer:
+    """
+    Serves ``/auth/token``, ``data/user-data/get`` and
+    ``data/shopping-lists/update`` from an in-memory account, and accepts
+    ``data/add-user-listener`` websockets that ``push()`` notifies.
+
+    Example:
+        server = FakeAnyListServer(make_user_data(1000))
+        client.BASE_URL = await server.start()
+    """
+
+    def __init__(self, user_data: pb.PBUserDataResponse):
+        self.user_data = user_data
+        self.requests: dict[str, int] = {}
+        self.operations = 0
+        # Statuses to answer the next update requests with, oldest first
+        self.update_errors: list[int] = []
+        # Report this many of the next operations as not processed
+        self.unprocessed_operations = 0
+        self.listeners: list[web.WebSocketResponse] = []
+        self._body = user_data.SerializeToString()
+        self._runner: web.AppRunner | None = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving and return the base URL."""
+        app = web.Application(client_max_size=64 * 1024**2)
+        app.router.add_post("/auth/token", self._token)
+        app.router.add_post("/auth/token/refresh", self._token)
+        app.router.add_post("/data/user-data/get", self._user_data)
+        app.router.add_post("/data/shopping-lists/update", self._update)
+        app.router.add_get("/data/add-user-listener", self._listener)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        sockets = site._server.sockets
+        return f"http://{host}:{sockets[0].getsockname()[1]}"
+
+    async def stop(self) -> None:
+        for ws in list(self.listeners):
+            await ws.close()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def set_user_data(self, user_data: pb.PBUserDataResponse) -> None:
+        """Serve a changed account from now on."""
+        self.user_data = user_data
+        self._body = user_data.SerializeToString()
+
+    async def push(self, message: str | bytes) -> None:
+        """Send a notification (text) or watch sync delta (bytes) to listeners."""
+        for ws in self.listeners:
+            if isinstance(message, bytes):
+                await ws.send_bytes(message)
+            else:
+                await ws.send_str(message)
+
+    def _count(self, request: web.Request) -> None:
+        self.requests[request.path] = self.requests.get(request.path, 0) + 1
+
+    async def _token(self, request: web.Request) -> web.Response:
+        self._count(request)
+        await request.post()
+        return web.json_response(
+            {"access_token": uuid.uuid4().hex, "refresh_token": uuid.uuid4().hex}
+        )
+
+    async def _user_data(self, request: web.Request) -> web.Response:
+        self._count(request)
+        await request.read()
+        return web.Response(body=self._body)
+
+    async def _update(self, request: web.Request) -> web.Response:
+        self._count(request)
+        if self.update_errors:
+            return web.Response(status=self.update_errors.pop(0))
+        form = await request.post()
+        value = form["operations"]
+        ops = pb.PBListOperationList()
+        ops.ParseFromString(
+            value.encode("latin-1") if isinstance(value, str) else bytes(value)
+        )
+        self.operations += len(ops.operations)
+        skipped = min(self.unprocessed_operations, len(ops.operations))
+        self.unprocessed_operations -= skipped
+        response = pb.PBEditOperationResponse(
+            processedOperations=[
+                op.metadata.operationId for op in ops.operations[skipped:]
+            ]
+        )
+        return web.Response(body=response.SerializeToString())
+
+    async def _listener(self, request: web.Request) -> web.WebSocketResponse:
+        self._count(request)
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        self.listeners.append(ws)
+        try:
+            # Only heartbeats arrive from the client
+            async for _ in ws:
+                pass
+        finally:
+            self.listeners.remove(ws)
+        return ws
@@ -0,0 +1,206 @@
+"""Benchmark the AnyList client hot paths against a local fake server.
+
+Usage:
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --output new.json --compare results.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+import uuid
+
+from anylist import AnyListClient
+from benchmarks.fake_server import FakeAnyListServer, make_user_data
+
+DEFAULT_SIZES = [10, 1_000, 100_000]
+
+
+def summarize(samples: list[float]) -> dict[str, float]:
+    """Latency percentiles (milliseconds) and throughput of timed samples."""
+    ms = sorted(sample * 1000 for sample in samples)
+    if len(ms) > 1:
+        percentiles = statistics.quantiles(ms, n=100, method="inclusive")
+        p50, p90, p99 = percentiles[49], percentiles[89], percentiles[98]
+    else:
+        p50 = p90 = p99 = ms[0]
+    total = sum(samples)
+    return {
+        "n": len(ms),
+        "mean_ms": statistics.fmean(ms),
+        "p50_ms": p50,
+        "p90_ms": p90,
+        "p99_ms": p99,
+        "ops_per_s": len(ms) / total if total else float("inf"),
+    }
+
+
+async def timed(coro_factory, repeat: int) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await coro_factory()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def make_client(base_url: str, credentials_dir: str) -> AnyListClient:
+    credentials_file = os.path.join(credentials_dir, uuid.uuid4().hex)
+    client = AnyListClient("bench@example.com", "password", credentials_file)
+    client.BASE_URL = base_url
+    return client
+
+
+async def bench_size(item_count: int, repeat: int, writes: int) -> dict:
+    server = FakeAnyListServer(make_user_data(item_count))
+    base_url = await server.start()
+    results: dict[str, dict] = {}
+
+    with tempfile.TemporaryDirectory() as credentials_dir:
+        # Login: a fresh client without stored credentials each time
+        samples = []
+        for _ in range(repeat):
+            async with make_client(base_url, credentials_dir) as client:
+                start = time.perf_counter()
+                await client.login()
+                samples.append(time.perf_counter() - start)
+        results["login"] = summarize(samples)
+
+        async with make_client(base_url, credentials_dir) as client:
+            await client.login()
+
+            results["full_sync"] = summarize(
+                await timed(lambda: client.get_user_data(refresh=True), repeat)
+            )
+
+            samples = []
+            for _ in range(repeat):
+                await client.get_user_data(refresh=True)
+                start = time.perf_counter()
+                await client.get_lists()
+                samples.append(time.perf_counter() - start)
+            results["get_lists"] = summarize(samples)
+
+            lists = await client.get_lists()
+            target = max(lists, key=lambda lst: len(lst.items))
+            names = [item.name for item in target.items[:1000]]
+            await target.find_item_by_name(names[0])
+            samples = []
+            for name in names:
+                start = time.perf_counter()
+                await target.find_item_by_name(name)
+                samples.append(time.perf_counter() - start)
+            results["find_item_by_name"] = summarize(samples)
+
+            samples = []
+            for index in range(writes):
+                item = client.create_item()
+                item.name = f"bench add {index}"
+                start = time.perf_counter()
+                await target.add_item(item)
+                samples.append(time.perf_counter() - start)
+            results["add_item"] = summarize(samples)
+
+            start = time.perf_counter()
+            async with client.batch():
+                for index in range(writes):
+                    item = client.create_item()
+                    item.name = f"bench batch add {index}"
+                    await target.add_item(item)
+            results["add_item_batched"] = summarize(
+                [(time.perf_counter() - start) / writes] * writes
+            )
+
+            samples = []
+            for item in target.items[:writes]:
+                item.checked = not item.checked
+                start = time.perf_counter()
+                await item.save()
+                samples.append(time.perf_counter() - start)
+            results["save"] = summarize(samples)
+
+            # Peak memory of a full sync plus materializing every item
+            tracemalloc.start()
+            await client.get_user_data(refresh=True)
+            for lst in await client.get_lists():
+                for item in lst.items:
+                    item.name
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            results["peak_memory"] = {"peak_mb": peak / 1024**2}
+
+    results["server"] = {
+        "requests": server.requests,
+        "operations": server.operations,
+    }
+    await server.stop()
+    return results
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: dict, baseline: dict) -> None:
+    """Print the change of each metric relative to a previous run."""
+    print(f"{'size':>8} {'benchmark':<20} {'metric':<10} {'base':>10} {'now':>10}")
+    for size, benchmarks in current["results"].items():
+        for name, metrics in benchmarks.items():
+            base_metrics = baseline["results"].get(size, {}).get(name, {})
+            for metric in ("p50_ms", "p99_ms", "peak_mb"):
+                if not base_metrics.get(metric) or metric not in metrics:
+                    continue
+                before, after = base_metrics[metric], metrics[metric]
+                print(
+                    f"{size:>8} {name:<20} {metric:<10} "
+                    f"{before:>10.3f} {after:>10.3f} ({after / before:.2f}x)"
+                )
+
+
+async def main(args) -> dict:
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "writes": args.writes,
+        "results": {},
+    }
+    for size in args.sizes:
+        print(f"Benchmarking {size} items...")
+        report["results"][str(size)] = await bench_size(size, args.repeat, args.writes)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--writes", type=int, default=200)
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--compare", help="Compare against a previous JSON result")
+    args = parser.parse_args()
+
+    report = asyncio.run(main(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare and os.path.exists(args.compare):
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+    else:
+        print(json.dumps(report, indent=2))
@@ -2,5 +2,20 @@ from __future__ import annotations
 
 __version__ = "0.0.1"
 
+from .categorizer import *  # noqa: F403
 from .client import *  # noqa: F403
+from .columnar import *  # noqa: F403
+from .credential_store import *  # noqa: F403
 from .errors import *  # noqa: F403
+from .export import *  # noqa: F403
+from .ingredients import *  # noqa: F403
+from .instrumentation import *  # noqa: F403
+from .oplog import *  # noqa: F403
+from .partial import *  # noqa: F403
+from .pool import *  # noqa: F403
+from .query import *  # noqa: F403
+from .realtime import *  # noqa: F403
+from .scheduler import *  # noqa: F403
+from .search import *  # noqa: F403
+from .session import *  # noqa: F403
+from .snapshot import *  # noqa: F403
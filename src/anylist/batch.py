@@ -0,0 +1,149 @@
+"""Write batching for AnyList API list operations."""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+import typing
+
+from anylist import messages_pb2 as pb
+from anylist.common import processed_operations
+
+if typing.TYPE_CHECKING:
+    from anylist.client import AnyListClient
+
+__all__ = [
+    "OperationBatch",
+]
+
+logger = logging.getLogger("anylist.batch")
+
+# The batches active in the current task (and the tasks it starts), by client
+_active_batches: contextvars.ContextVar[dict[AnyListClient, OperationBatch]] = (
+    contextvars.ContextVar("anylist_active_batches", default={})
+)
+
+
+class OperationBatch:
+    """
+    Collects list operations and sends them in as few requests as possible.
+
+    Created with ``AnyListClient.batch()``. While the batch is active, every
+    ``ShoppingListItem.save()`` and ``ShoppingList.add_item()`` on that client
+    queues its operations here instead of posting them immediately. Pending
+    operations are sent when the batch exits, when ``flush()`` is called, or
+    automatically once ``max_operations`` are pending or ``max_delay`` seconds
+    have passed since the first pending operation.
+
+    A batch is only active in the task that entered it (and the tasks that
+    task starts), so concurrent tasks using the same client never queue their
+    operations in each other's batches.
+
+    Example:
+        async with client.batch() as batch:
+            for item in items:
+                await shopping_list.add_item(item)
+        print(batch.results)
+    """
+
+    def __init__(
+        self,
+        client: "AnyListClient",
+        max_operations: int | None = None,
+        max_delay: float | None = None,
+    ):
+        self.client = client
+        self.max_operations = max_operations
+        self.max_delay = max_delay
+        self.results: dict[str, bool] = {}
+        self._pending: dict[str, list[pb.PBListOperation]] = {}
+        self._pending_count = 0
+        self._lock = asyncio.Lock()
+        self._timer: asyncio.Task | None = None
+        self._token: contextvars.Token | None = None
+
+    def __len__(self):
+        return self._pending_count
+
+    @staticmethod
+    def active(client: "AnyListClient") -> OperationBatch | None:
+        """Get the batch of ``client`` active in the current task, if any."""
+        return _active_batches.get().get(client)
+
+    async def __aenter__(self):
+        self._token = _active_batches.set({**_active_batches.get(), self.client: self})
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        _active_batches.reset(self._token)
+        self._token = None
+        # Local objects already reflect the queued changes, so send them even
+        # if the block raised.
+        await self.flush()
+
+    async def add(self, path: str, operations: list[pb.PBListOperation]) -> None:
+        """
+        Queue operations for the given update endpoint.
+
+        Args:
+            path: The API endpoint the operations are posted to
+            operations: The operations to queue
+        """
+        self._pending.setdefault(path, []).extend(operations)
+        self._pending_count += len(operations)
+
+        if self.max_operations and self._pending_count >= self.max_operations:
+            await self.flush()
+        elif self.max_delay is not None and self._timer is None:
+            self._timer = asyncio.create_task(self._flush_later())
+
+    async def flush(self) -> dict[str, bool]:
+        """
+        Send all pending operations.
+
+        Operations are only removed from the batch once the request carrying
+        them got a response; if a request fails, its operations and those not
+        sent yet stay pending for the next flush.
+
+        Returns:
+            Whether each sent operation was processed, keyed by operation ID
+        """
+        if self._timer is not None and self._timer is not asyncio.current_task():
+            self._timer.cancel()
+        self._timer = None
+
+        async with self._lock:
+            results = {}
+            try:
+                for path in list(self._pending):
+                    # add() may extend the list while a chunk is in flight
+                    operations = self._pending[path]
+                    while operations:
+                        chunk = operations[: self.max_operations or len(operations)]
+                        response = await self.client._post_operations(path, chunk)
+                        del operations[: len(chunk)]
+                        self._pending_count -= len(chunk)
+                        results.update(processed_operations(chunk, response))
+                    del self._pending[path]
+            finally:
+                self.results.update(results)
+
+            unprocessed = [op_id for op_id, done in results.items() if not done]
+            if unprocessed:
+                logger.warning(
+                    "%d of %d operations were not processed",
+                    len(unprocessed),
+                    len(results),
+                )
+            return results
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.max_delay)
+        try:
+            await self.flush()
+        except asyncio.CancelledError:
+            raise
+        except Exception as error:
+            # The operations stay pending for the next flush
+            logger.warning("Failed to flush operation batch: %s", error)
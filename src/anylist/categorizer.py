@@ -0,0 +1,106 @@
+"""Local item categorization from AnyList categorization data."""
+
+from __future__ import annotations
+
+from anylist import messages_pb2 as pb
+from anylist.common import normalize_name, uuid
+
+__all__ = [
+    "Categorizer",
+]
+
+
+class Categorizer:
+    """
+    Assigns categories to items by name without asking the server.
+
+    Built from a user data response, it combines the list categorization
+    rules (``PBListCategorizationRule``, found in each list's
+    ``PBListResponse``), the categories of the lists' category groups
+    (``PBListCategory``) and the categories the user assigned to items before
+    (``categorizedItemsResponse``) into dict lookups, so categorizing an item
+    costs O(1).
+
+    A list rule wins over a previously assigned category. The client keeps
+    one for its current user data as ``client.categorizer`` and rebuilds it
+    when the user data changes, so updated rules take effect after a refresh.
+    """
+
+    def __init__(self):
+        # Category identifier -> category
+        self._categories: dict[str, pb.PBListCategory] = {}
+        # List identifier -> normalized item name -> rule
+        self._rules: dict[str, dict[str, pb.PBListCategorizationRule]] = {}
+        # Normalized item name -> category match ID
+        self._learned: dict[str, str] = {}
+
+    @classmethod
+    def from_user_data(cls, user_data: pb.PBUserDataResponse | None) -> Categorizer:
+        """
+        Build a categorizer from a user data response.
+
+        Args:
+            user_data: The user data, e.g. ``await client.get_user_data()``
+        """
+        categorizer = cls()
+        if user_data is None:
+            return categorizer
+
+        for response in user_data.shoppingListsResponse.listResponses:
+            for group_response in response.categoryGroupResponses:
+                for category in group_response.categoryGroup.categories:
+                    categorizer._categories[category.identifier] = category
+            rules = categorizer._rules.setdefault(response.listId, {})
+            for rule in response.categorizationRules:
+                rules[normalize_name(rule.itemName)] = rule
+
+        for item in user_data.categorizedItemsResponse.categorizedItems:
+            if item.categoryMatchId:
+                categorizer._learned[normalize_name(item.name)] = item.categoryMatchId
+        return categorizer
+
+    def categorize(self, name: str, list_id: str | None = None) -> str | None:
+        """
+        Get the category match ID (e.g. "dairy") for an item name.
+
+        Args:
+            name: The item name
+            list_id: The list the item is added to, to apply its rules
+
+        Returns:
+            The category match ID, or None if the name is unknown
+        """
+        key = normalize_name(name)
+        rule = self._rules.get(list_id, {}).get(key) if list_id else None
+        if rule is not None:
+            category = self._categories.get(rule.categoryId)
+            if category is not None and category.systemCategory:
+                return category.systemCategory
+        return self._learned.get(key)
+
+    def category_assignment(
+        self, name: str, list_id: str
+    ) -> pb.PBListItemCategoryAssignment | None:
+        """
+        Get the list category a list rule assigns to an item name.
+
+        Args:
+            name: The item name
+            list_id: The list the item is added to
+
+        Returns:
+            The assignment for the item's ``categoryAssignments``, or None if
+            no rule of the list matches
+        """
+        rule = self._rules.get(list_id, {}).get(normalize_name(name))
+        if rule is None:
+            return None
+        return pb.PBListItemCategoryAssignment(
+            identifier=uuid(),
+            categoryGroupId=rule.categoryGroupId,
+            categoryId=rule.categoryId,
+        )
+
+    def remember(self, name: str, category_match_id: str) -> None:
+        """Use a category for an item name from now on."""
+        self._learned[normalize_name(name)] = category_match_id
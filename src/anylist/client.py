@@ -2,23 +2,39 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
+import time
+import typing
 import uuid
 
 import aiohttp
 from multidict import MultiDict
 
 from anylist import messages_pb2 as pb
+from anylist.batch import OperationBatch
+from anylist.categorizer import Categorizer
+from anylist.common import processed_operations
+from anylist.credential_store import CredentialStore, FileCredentialStore
 from anylist.credentials import (
     CREDENTIALS_KEY_ACCESS_TOKEN,
     CREDENTIALS_KEY_CLIENT_ID,
     CREDENTIALS_KEY_REFRESH_TOKEN,
-    decrypt_credentials,
-    encrypt_credentials,
+    token_expiry,
 )
+from anylist.instrumentation import Instrumentation, _RequestTimer
+from anylist.meal_plan import MealPlan
+from anylist.oplog import OperationLog
+from anylist.partial import USER_DATA_SECTIONS, parse_user_data, user_data_section
+from anylist.query import ItemIndex
+from anylist.recipe import RecipeBook
+from anylist.scheduler import RequestScheduler, TokenBucket
+from anylist.search import NameIndex, build_name_index
 from anylist.shopping_list import ShoppingList
 from anylist.shopping_list_item import ShoppingListItem
+from anylist.snapshot import SnapshotStore
+from anylist.sync import build_client_timestamps, merge_sections, merge_user_data
 
 __all__ = [
     "AnyListClient",
@@ -27,106 +43,286 @@ __all__ = [
 # Set up logger
 logger = logging.getLogger("anylist.client")
 
+# Operation message type -> the list message its update endpoint expects
+_OPERATION_LISTS = {
+    pb.PBListOperation: pb.PBListOperationList,
+    pb.PBRecipeOperation: pb.PBRecipeOperationList,
+    pb.PBCalendarOperation: pb.PBCalendarOperationList,
+}
+
+# Client errors after which logged operations are kept and sent again later
+_OPERATION_LOG_RETRY_STATUSES = frozenset({401, 403, 408, 429})
+
 
 class AnyListClient:
     """Client for interacting with the AnyList API."""
 
     BASE_URL = "https://www.anylist.com"
-
-    def __init__(self, email, password, credentials_file=None):
+    # Refresh the access token this many seconds before it expires
+    TOKEN_REFRESH_MARGIN = 60
+    # Maximum number of logged operations sent per request
+    OPERATION_LOG_BATCH_SIZE = 500
+    # Seconds to wait before resending logged operations after a failure
+    OPERATION_LOG_RETRY_INTERVAL = 30
+
+    def __init__(
+        self,
+        email,
+        password,
+        credentials_file=None,
+        snapshot_store: SnapshotStore | None = None,
+        session: aiohttp.ClientSession | None = None,
+        scheduler: RequestScheduler | None = None,
+        rate_limit: TokenBucket | None = None,
+        operation_log: OperationLog | None = None,
+        instrumentation: Instrumentation | None = None,
+        auth_rate_limit: TokenBucket | None = None,
+        credentials_store: CredentialStore | None = None,
+        auto_categorize: bool = True,
+        lazy_recipes: bool = False,
+    ):
         self.email = email
         self.password = password
         self.credentials_file = credentials_file or os.path.expanduser(
             "~/.anylist_credentials"
         )
+        # Credentials are stored under the account email
+        self.credentials_store = credentials_store or FileCredentialStore(
+            self.credentials_file
+        )
         self.access_token = None
         self.refresh_token = None
         self.client_id = None
-        self.session = None
+        self.session = session
+        self._owns_session = session is None
         self.user_data: pb.PBUserDataResponse | None = None
         self.uid = None
+        # Wrappers and indexes built from user_data, see _cached()
+        self._caches: dict[str, typing.Any] = {}
+        # Categorize new items locally when they are added to a list
+        self.auto_categorize = auto_categorize
+        # Decode only the recipe names up front, each body on first use
+        self.lazy_recipes = lazy_recipes
+        self._recipe_book: RecipeBook | None = None
+        self._meal_plan: MealPlan | None = None
+        self.snapshot_store = snapshot_store
+        self._revalidate_task: asyncio.Task | None = None
+        self._refresh_task: asyncio.Task | None = None
+        self._token_expiry: tuple[str | None, float | None] = (None, None)
+        self.scheduler = scheduler or RequestScheduler()
+        self.rate_limit = rate_limit
+        # Applied to logins and token refreshes instead of rate_limit
+        self.auth_rate_limit = auth_rate_limit
+        self.operation_log = operation_log
+        self.instrumentation = instrumentation
+        self._operation_log_lock = asyncio.Lock()
+        self._operation_log_task: asyncio.Task | None = None
 
     async def __aenter__(self):
-        """Enter the async context manager, creating a session."""
-        self.session = aiohttp.ClientSession(
-            headers=self._get_auth_headers(auth_required=False),
-        )
+        """Enter the async context manager, creating a session if none was given."""
+        if self._owns_session:
+            trace_configs = (
+                [self.instrumentation.trace_config()] if self.instrumentation else None
+            )
+            self.session = aiohttp.ClientSession(
+                headers=self._get_auth_headers(auth_required=False),
+                trace_configs=trace_configs,
+            )
+        if self.operation_log is not None and len(self.operation_log):
+            self._schedule_operation_log_flush()
         return self
 
     async def __aexit__(self, exc_type, exc, tb):
-        """Exit the async context manager, closing the session."""
-        await self.session.close()
+        """Exit the async context manager, closing the session if it owns it."""
+        if self._revalidate_task is not None:
+            self._revalidate_task.cancel()
+        if self._operation_log_task is not None:
+            self._operation_log_task.cancel()
+        if self._owns_session:
+            await self.session.close()
 
     async def login(self):
         """Login to AnyList and get access token."""
         await self._load_credentials()
         self.client_id = await self._get_client_id()
         if not self.access_token or not self.refresh_token:
-            print("No saved tokens found, fetching new tokens using credentials")
+            logger.info("No saved tokens found, fetching new tokens using credentials")
             await self._fetch_tokens()
+        else:
+            await self._store_credentials()
 
-    async def get_user_data(self, refresh=False) -> pb.PBUserDataResponse:
+    async def get_user_data(
+        self, refresh=False, incremental=False, sections=None
+    ) -> pb.PBUserDataResponse:
         """Get all user data from AnyList using the data/user-data/get endpoint.
 
         This is the primary method to fetch user data from AnyList. It returns a
         dictionary with all user data including lists, items, recipes, etc.
+
+        With a snapshot store configured, the first call answers from the last
+        stored snapshot and revalidates it against the server in the background.
+
+        Args:
+            refresh: Fetch the data again even if it was already loaded
+            incremental: When refreshing, only download what changed since the
+                last fetch and merge it into the locally held data
+            sections: Names of the top-level response fields to decode, e.g.
+                ``["shoppingListsResponse"]``. The others are skipped unparsed.
+                When user data is already held, the fetched sections replace
+                its own and the held data is returned; otherwise the partial
+                response is returned without being held or stored.
         """
         if self.user_data and not refresh:
             return self.user_data
 
-        self.user_data = await self._request_protobuf(
+        if not self.user_data and not refresh and self.snapshot_store:
+            self._set_user_data(self.snapshot_store.load(self.email))
+            if self.user_data:
+                self._revalidate_task = asyncio.create_task(self._revalidate())
+                return self.user_data
+
+        if incremental and self.user_data:
+            delta = await self._fetch_user_data_changes(sections)
+            user_data = merge_user_data(self.user_data, delta)
+        else:
+            user_data = await self._request_protobuf(
+                "post",
+                "data/user-data/get",
+                protobuf_response_class=pb.PBUserDataResponse,
+                parse_response=self._user_data_parser(sections),
+            )
+            if sections is not None:
+                if self.user_data is None:
+                    return user_data
+                user_data = merge_sections(self.user_data, user_data, sections)
+
+        self._hold_user_data(user_data)
+        return self.user_data
+
+    async def _fetch_user_data_changes(self, sections=None) -> pb.PBUserDataResponse:
+        """Fetch what changed since the held user data, without merging it."""
+        timestamps = build_client_timestamps(self.user_data)
+        if self.lazy_recipes and self._recipe_book is not None:
+            timestamps.userRecipeDataTimestamp.CopyFrom(self._recipe_book._timestamp())
+        return await self._request_protobuf(
             "post",
             "data/user-data/get",
             protobuf_response_class=pb.PBUserDataResponse,
+            data={"timestamps": timestamps.SerializeToString()},
+            as_form=True,
+            parse_response=self._user_data_parser(sections),
         )
-        return self.user_data
+
+    def _hold_user_data(self, user_data: pb.PBUserDataResponse) -> None:
+        """Hold fetched (or merged) user data and store its snapshot."""
+        self._set_user_data(user_data)
+        if self.snapshot_store:
+            try:
+                self.snapshot_store.save(self.email, user_data)
+            except OSError as error:
+                logger.warning("Failed to write user data snapshot: %s", error)
+
+    def _user_data_parser(self, sections):
+        if not self.lazy_recipes:
+            if sections is None:
+                return None
+            return lambda data: parse_user_data(data, sections)
+
+        sections = list(USER_DATA_SECTIONS if sections is None else sections)
+
+        def parse(data):
+            # Recipes go to the recipe book undecoded instead of the user data
+            if "recipeDataResponse" in sections:
+                recipes = user_data_section(data, "recipeDataResponse")
+                if recipes is not None:
+                    self._recipe_book = RecipeBook.from_bytes(self, recipes)
+            return parse_user_data(
+                data, [name for name in sections if name != "recipeDataResponse"]
+            )
+
+        return parse
+
+    async def _revalidate(self):
+        """Bring user data loaded from a snapshot up to date with the server."""
+        try:
+            await self.get_user_data(refresh=True, incremental=True)
+        except asyncio.CancelledError:
+            raise
+        except Exception as error:
+            logger.warning("Failed to revalidate user data snapshot: %s", error)
+
+    async def wait_until_revalidated(self):
+        """Wait for a pending background revalidation of snapshot data."""
+        if self._revalidate_task is not None:
+            await asyncio.shield(self._revalidate_task)
 
     async def _fetch_tokens(self):
         """Fetch new access and refresh tokens using email/password."""
-        # For token endpoints, we need to use form data instead of JSON
-        data = aiohttp.FormData()
-        data.add_field("email", self.email)
-        data.add_field("password", self.password)
-
-        # Note: We can't use _request here because this is used to get the initial tokens
-        # needed for authenticated requests
-        url = f"{self.BASE_URL}/auth/token"
-        async with self.session.post(url, data=data) as resp:
-            resp.raise_for_status()
-            result = await resp.json()
-            self.access_token = result["access_token"]
-            self.refresh_token = result["refresh_token"]
-            await self._store_credentials()
+        if self.instrumentation is not None:
+            self.instrumentation.on_token_refresh("fetch")
+        result = await self._post_token_form(
+            "auth/token", {"email": self.email, "password": self.password}
+        )
+        self.access_token = result["access_token"]
+        self.refresh_token = result["refresh_token"]
+        await self._store_credentials()
 
     async def _refresh_tokens(self):
         """Refresh access token using refresh token."""
-        # For token endpoints, we need to use form data instead of JSON
-        data = aiohttp.FormData()
-        data.add_field("refresh_token", self.refresh_token)
-
+        if self.instrumentation is not None:
+            self.instrumentation.on_token_refresh("refresh")
         try:
-            # Note: We can't use _request here because we're handling a token expiration scenario
-            # and _request would create a circular dependency
-            url = f"{self.BASE_URL}/auth/token/refresh"
-            async with self.session.post(url, data=data) as resp:
-                resp.raise_for_status()
-                result = await resp.json()
-                self.access_token = result["access_token"]
-                self.refresh_token = result["refresh_token"]
-                await self._store_credentials()
-                return True
+            # A refresh uses up the refresh token, so it is never resent
+            result = await self._post_token_form(
+                "auth/token/refresh",
+                {"refresh_token": self.refresh_token},
+                idempotent=False,
+            )
+            self.access_token = result["access_token"]
+            self.refresh_token = result["refresh_token"]
+            await self._store_credentials()
+            return True
         except aiohttp.ClientResponseError as error:
             if error.status != 401:
                 raise
-            print(
+            logger.warning(
                 "Failed to refresh access token, fetching new tokens using credentials"
             )
             await self._fetch_tokens()
             return True
         except Exception as e:
-            print(f"Error refreshing token: {e}")
+            logger.error("Error refreshing token: %s", e)
             return False
 
+    async def _post_token_form(self, path, fields, idempotent=True):
+        """Post form fields to a token endpoint and return the JSON result.
+
+        Args:
+            path: The token endpoint path
+            fields: The form fields
+            idempotent: Whether the request may safely be retried
+        """
+        # Note: We can't use _request_protobuf here because the token endpoints
+        # are used to get (or renew) the tokens it needs, and respond with JSON
+        url = f"{self.BASE_URL}/{path}"
+        headers = self._get_auth_headers(auth_required=False)
+
+        async def send():
+            # For token endpoints, we need to use form data instead of JSON
+            data = aiohttp.FormData()
+            for key, value in fields.items():
+                data.add_field(key, value)
+            async with self.session.post(url, data=data, headers=headers) as resp:
+                resp.raise_for_status()
+                return await resp.json()
+
+        return await self.scheduler.run(
+            send,
+            idempotent=idempotent,
+            rate_limit=self.auth_rate_limit or self.rate_limit,
+            on_retry=self._retry_hook(path),
+        )
+
     async def _request_protobuf(
         self,
         method,
@@ -136,9 +332,13 @@ class AnyListClient:
         as_form=False,
         params=None,
         auth_required=True,
+        idempotent=True,
+        parse_response=None,
     ):
         """Make a request to the AnyList API expecting a protobuf response.
 
+        Transient failures are retried through the client's scheduler.
+
         Args:
             method: HTTP method (get, post, put, delete)
             path: API endpoint path (without base URL)
@@ -146,81 +346,516 @@ class AnyListClient:
             data: Request JSON data (for POST/PUT)
             params: Query parameters
             auth_required: Whether authentication is required
+            idempotent: Whether the request may safely be retried
+            parse_response: Decodes the response body instead of
+                protobuf_response_class.ParseFromString
 
         Returns:
             Response data as decoded protobuf dictionary
         """
         if auth_required and not self.access_token:
             await self.login()
+        elif auth_required and self._token_expires_soon():
+            await self._refresh_tokens_once(self.access_token)
+
+        path = path.lstrip("/")
+        retried = False
+
+        while True:
+            used_token = self.access_token
+
+            async def send():
+                return await self._send_request(
+                    method,
+                    path,
+                    protobuf_response_class,
+                    data,
+                    as_form,
+                    params,
+                    auth_required,
+                    parse_response,
+                )
 
-        url = f"{self.BASE_URL}/{path.lstrip('/')}"
+            try:
+                return await self.scheduler.run(
+                    send,
+                    idempotent=idempotent,
+                    rate_limit=self.rate_limit,
+                    on_retry=self._retry_hook(path),
+                )
+            except aiohttp.ClientResponseError as error:
+                if auth_required and error.status == 401 and not retried:
+                    # Token expired, refresh (unless a concurrent request
+                    # already did) and try again once
+                    await self._refresh_tokens_once(used_token)
+                    retried = True
+                    continue
+                raise
+
+    async def _send_request(
+        self,
+        method,
+        path,
+        protobuf_response_class,
+        data,
+        as_form,
+        params,
+        auth_required,
+        parse_response=None,
+    ):
+        """Send a single attempt of a request made by _request_protobuf."""
+        url = f"{self.BASE_URL}/{path}"
 
         # Get authentication headers
         _headers = self._get_auth_headers(auth_required)
 
-        try:
-            request_method = getattr(self.session, method.lower())
-            request_kwargs = {"params": params, "headers": _headers}
-
-            if data:
-                if as_form:
-                    form_data = aiohttp.FormData(default_to_multipart=True)
-                    for key, value in data.items():
-                        # form_data.add_field(key, value)
-                        # ^ sets the filename in the encoded data, which breaks anylist, so do it manually
-                        type_options = MultiDict({"name": key})
-                        headers = {}
-                        form_data._fields.append((type_options, headers, value))
-                    request_kwargs["data"] = form_data
-                else:
-                    request_kwargs["json"] = data
+        request_method = getattr(self.session, method.lower())
+        request_kwargs = {"params": params, "headers": _headers}
+
+        if data:
+            if as_form:
+                form_data = aiohttp.FormData(default_to_multipart=True)
+                for key, value in data.items():
+                    # form_data.add_field(key, value)
+                    # ^ sets the filename in the encoded data, which breaks anylist, so do it manually
+                    type_options = MultiDict({"name": key})
+                    headers = {}
+                    form_data._fields.append((type_options, headers, value))
+                request_kwargs["data"] = form_data
+            else:
+                request_kwargs["json"] = data
+
+        timer = None
+        if self.instrumentation is not None:
+            request_bytes = sum(
+                len(value)
+                for value in (data or {}).values()
+                if isinstance(value, (bytes, str))
+            )
+            timer = _RequestTimer(method, path, request_bytes)
 
+        try:
             async with request_method(url, **request_kwargs) as resp:
+                if timer is not None:
+                    timer.response_started(resp.status)
                 resp.raise_for_status()
 
                 if protobuf_response_class is not None:
                     binary_data = await resp.read()
+                    if timer is not None:
+                        timer.response_read(len(binary_data))
+
+                    if parse_response is not None:
+                        pb_message = parse_response(binary_data)
+                    else:
+                        pb_message = protobuf_response_class()
+                        pb_message.ParseFromString(binary_data)
+                    if timer is not None:
+                        timer.parsed()
+
+                    result = pb_message
+                else:
+                    result = True
+        except Exception as error:
+            if timer is not None:
+                self.instrumentation.on_request(timer.finish(error))
+            raise
 
-                    pb_message = protobuf_response_class()
-                    pb_message.ParseFromString(binary_data)
+        if timer is not None:
+            self.instrumentation.on_request(timer.finish())
+        return result
 
-                    return pb_message
-                else:
-                    return True
+    def _retry_hook(self, path):
+        """Build the scheduler retry callback reporting retries of path."""
+        if self.instrumentation is None:
+            return None
+        instrumentation = self.instrumentation
 
-        except aiohttp.ClientResponseError as error:
-            if auth_required and error.status == 401:
-                # Token expired, refresh and try again
-                await self._refresh_tokens()
-                return await self._request_protobuf(
-                    method,
-                    path,
-                    protobuf_response_class,
-                    data,
-                    as_form,
-                    params,
-                    auth_required,
+        def on_retry(attempt, delay, error):
+            instrumentation.on_retry(path, attempt, delay, error)
+
+        return on_retry
+
+    async def _refresh_tokens_once(self, stale_token):
+        """Refresh tokens, sharing a single refresh between concurrent callers.
+
+        Args:
+            stale_token: The access token that was found to be expired. Nothing
+                is refreshed if the current token already differs from it.
+        """
+        if self.access_token != stale_token:
+            return True
+        if self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh_tokens())
+            self._refresh_task.add_done_callback(self._clear_refresh_task)
+        return await asyncio.shield(self._refresh_task)
+
+    def _clear_refresh_task(self, task):
+        if self._refresh_task is task:
+            self._refresh_task = None
+
+    def _token_expires_soon(self) -> bool:
+        """Whether the access token is known to expire within the margin."""
+        token, expiry = self._token_expiry
+        if token != self.access_token:
+            expiry = token_expiry(self.access_token)
+            self._token_expiry = (self.access_token, expiry)
+        return expiry is not None and expiry - time.time() < self.TOKEN_REFRESH_MARGIN
+
+    def batch(self, max_operations=None, max_delay=None) -> OperationBatch:
+        """Batch list operations into as few requests as possible.
+
+        Use as ``async with client.batch():``. Item saves and additions made
+        inside the block are queued and sent together.
+
+        Args:
+            max_operations: Flush automatically once this many operations are
+                pending (also the maximum number of operations per request)
+            max_delay: Flush automatically this many seconds after the first
+                operation was queued
+        """
+        return OperationBatch(self, max_operations=max_operations, max_delay=max_delay)
+
+    async def _submit_operations(self, path, operations):
+        """Send operations, or queue them if a batch is active.
+
+        With an operation log configured, list operations are only recorded
+        in the log and sent in the background.
+
+        Returns:
+            The edit response, or None if the operations were queued
+        """
+        if self.operation_log is not None and isinstance(
+            operations[0], pb.PBListOperation
+        ):
+            self.operation_log.append(path, operations)
+            self._schedule_operation_log_flush()
+            return None
+        batch = OperationBatch.active(self)
+        if batch is not None:
+            await batch.add(path, operations)
+            return None
+        return await self._post_operations(path, operations)
+
+    async def _post_operations(self, path, operations) -> pb.PBEditOperationResponse:
+        """Post list, recipe or calendar operations to an update endpoint."""
+        ops = _OPERATION_LISTS[type(operations[0])](
+            operations=operations,
+        )
+        return await self._request_protobuf(
+            method="POST",
+            path=path,
+            protobuf_response_class=pb.PBEditOperationResponse,
+            data={"operations": ops.SerializeToString()},
+            as_form=True,
+            auth_required=True,
+        )
+
+    async def flush_operation_log(self) -> dict[str, bool]:
+        """Send the pending operations of the operation log, oldest first.
+
+        Operations are acknowledged in the log once the server reported them
+        processed; the others stay in the log and are sent again by the next
+        flush. Operations the server rejects outright (a 4xx status other
+        than an authentication, timeout or rate limit error) are dropped.
+
+        Returns:
+            Whether each sent operation was processed, keyed by operation ID
+        """
+        results = {}
+        async with self._operation_log_lock:
+            # Operations appended meanwhile are left to the next flush
+            pending = self.operation_log.pending()
+            start = 0
+            while start < len(pending):
+                # Send the oldest run of operations for the same endpoint
+                path = pending[start][0]
+                chunk = []
+                for op_path, op in pending[start:]:
+                    if op_path != path or len(chunk) >= self.OPERATION_LOG_BATCH_SIZE:
+                        break
+                    chunk.append(op)
+                start += len(chunk)
+
+                try:
+                    response = await self._post_operations(path, chunk)
+                    sent = processed_operations(chunk, response)
+                    self.operation_log.acknowledge(
+                        op_id for op_id, done in sent.items() if done
+                    )
+                except aiohttp.ClientResponseError as error:
+                    if (
+                        not 400 <= error.status < 500
+                        or error.status in _OPERATION_LOG_RETRY_STATUSES
+                    ):
+                        raise
+                    logger.error(
+                        "Dropping %d logged operations rejected by the server: %s",
+                        len(chunk),
+                        error,
+                    )
+                    sent = {op.metadata.operationId: False for op in chunk}
+                    self.operation_log.acknowledge(sent)
+                results.update(sent)
+
+        unprocessed = [op_id for op_id, done in results.items() if not done]
+        if unprocessed:
+            logger.warning(
+                "%d of %d logged operations were not processed",
+                len(unprocessed),
+                len(results),
+            )
+        return results
+
+    def _schedule_operation_log_flush(self):
+        if self._operation_log_task is None or self._operation_log_task.done():
+            self._operation_log_task = asyncio.create_task(
+                self._flush_operation_log_until_empty()
+            )
+
+    async def _flush_operation_log_until_empty(self):
+        while len(self.operation_log):
+            try:
+                results = await self.flush_operation_log()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+                logger.info(
+                    "Failed to send logged operations, retrying in %ss: %s",
+                    self.OPERATION_LOG_RETRY_INTERVAL,
+                    error,
                 )
-            raise
+                await asyncio.sleep(self.OPERATION_LOG_RETRY_INTERVAL)
+                continue
+            if any(op_id in self.operation_log for op_id in results):
+                # Some were not processed, don't resend them right away
+                await asyncio.sleep(self.OPERATION_LOG_RETRY_INTERVAL)
 
     async def get_lists(self):
         """Get all user lists.
 
-        This fetches all user data and extracts the lists.
+        This fetches all user data and extracts the lists. The list objects
+        are reused until the user data is refreshed, and their items are only
+        built when first accessed.
         """
         user_data = await self.get_user_data()
         return [
-            ShoppingList(self, item)
-            for item in user_data.shoppingListsResponse.newLists
+            self._wrap_list(lst) for lst in user_data.shoppingListsResponse.newLists
         ]
 
+    async def iter_items(
+        self,
+        lists=None,
+        checked: bool | None = None,
+        categories=None,
+    ) -> typing.AsyncIterator[ShoppingListItem]:
+        """Iterate over the items of all lists, wrapping them one at a time.
+
+        Unlike get_lists(), no list objects are built and items are only
+        created as they are yielded, so exporting a large account does not
+        hold every item wrapper in memory at once. Items of lists that were
+        already loaded through get_lists() are the same objects.
+
+        Args:
+            lists: Only yield items of these lists (identifiers or names)
+            checked: Only yield checked (True) or unchecked (False) items
+            categories: Only yield items with these category match IDs
+        """
+        user_data = await self.get_user_data()
+        wanted_lists = set(lists) if lists is not None else None
+        categories = set(categories) if categories is not None else None
+
+        for lst in user_data.shoppingListsResponse.newLists:
+            if wanted_lists is not None and not (
+                lst.identifier in wanted_lists or lst.name in wanted_lists
+            ):
+                continue
+            wrapper = self._caches.get("lists", {}).get(lst.identifier)
+            if wrapper is not None and wrapper._items is None:
+                wrapper = None
+
+            for pb_item in lst.items:
+                # Filter on the protobuf before building any wrapper
+                if checked is not None and pb_item.checked != checked:
+                    continue
+                if categories is not None and pb_item.categoryMatchId not in categories:
+                    continue
+                item = wrapper.find_item_by_id(pb_item.identifier) if wrapper else None
+                yield item or ShoppingListItem(self, pb_item)
+
+    @property
+    def item_index(self) -> ItemIndex:
+        """Secondary indexes over the items of the current user data.
+
+        Built on first use and rebuilt after the user data changed.
+        """
+        if self.user_data is None:
+            raise ValueError("User data has not been loaded yet")
+        return self._cached("item_index", lambda: ItemIndex(self.user_data))
+
+    @property
+    def name_index(self) -> NameIndex:
+        """Prefix and fuzzy search index over all item names of the user data.
+
+        Covers list items, starter, recent and favorite items, and previously
+        categorized items (see build_name_index). Built on first use and
+        rebuilt after the user data changed.
+        """
+        if self.user_data is None:
+            raise ValueError("User data has not been loaded yet")
+        return self._cached("name_index", lambda: build_name_index(self.user_data))
+
+    async def query_items(self, **criteria) -> list[ShoppingListItem]:
+        """Find the items of all lists matching indexed field values.
+
+        Args:
+            **criteria: Values of ListItem fields with an index (listId,
+                categoryMatchId, checked, storeIds, userId); a collection
+                matches any of its values. See ItemIndex.query.
+
+        Returns:
+            The matching items
+        """
+        await self.get_user_data()
+        return [self._wrap_item(item) for item in self.item_index.query(**criteria)]
+
+    def _wrap_item(self, item: pb.ListItem) -> ShoppingListItem:
+        """Get the wrapper of an item, reusing those of loaded lists."""
+        wrapper = self._caches.get("lists", {}).get(item.listId)
+        if wrapper is not None:
+            if wrapper._items is not None:
+                existing = wrapper.find_item_by_id(item.identifier)
+                if existing is not None:
+                    return existing
+        return ShoppingListItem(self, item)
+
+    async def get_recipes(self, refresh=False) -> RecipeBook:
+        """Get the recipes of the account.
+
+        With lazy_recipes, the recipes are kept undecoded until used and a
+        refresh only downloads them again if they changed.
+
+        Args:
+            refresh: Fetch the user data again first
+        """
+        if self.lazy_recipes:
+            if refresh or self._recipe_book is None:
+                await self.get_user_data(refresh=True, incremental=True)
+            if self._recipe_book is None:
+                self._recipe_book = RecipeBook(self)
+            return self._recipe_book
+
+        user_data = await self.get_user_data(refresh=refresh)
+        return self._cached(
+            "recipe_book",
+            lambda: RecipeBook.from_response(self, user_data.recipeDataResponse),
+        )
+
+    async def get_meal_plan(self, refresh=False) -> MealPlan:
+        """Get the meal planning calendar of the account.
+
+        Args:
+            refresh: Fetch the calendar changes since the last fetch first
+                (or all user data, if none was fetched yet)
+        """
+        if refresh and self.user_data is not None:
+            user_data = await self.get_user_data(
+                refresh=True,
+                incremental=True,
+                sections=["mealPlanningCalendarResponse"],
+            )
+        else:
+            user_data = await self.get_user_data(refresh=refresh)
+        return self._cached(
+            "meal_plan",
+            lambda: self._load_meal_plan(user_data.mealPlanningCalendarResponse),
+        )
+
+    def _load_meal_plan(self, calendar: pb.PBCalendarResponse) -> MealPlan:
+        """Build the meal plan, or bring the existing one up to date."""
+        if self._meal_plan is None:
+            self._meal_plan = MealPlan(self, calendar)
+        else:
+            self._meal_plan._load(calendar)
+        return self._meal_plan
+
     async def get_list_by_name(self, name):
-        lists = await self.get_lists()
-        for lst in lists:
-            if lst.name.lower() == name.lower():
-                return lst
+        user_data = await self.get_user_data()
+        name = name.lower()
+        for lst in user_data.shoppingListsResponse.newLists:
+            if lst.name.lower() == name:
+                return self._wrap_list(lst)
         return None
 
+    def _wrap_list(self, lst: pb.ShoppingList) -> ShoppingList:
+        """Get the ShoppingList wrapper for a list of the current user data."""
+        wrappers = self._cached("lists", dict)
+        wrapper = wrappers.get(lst.identifier)
+        if wrapper is None:
+            wrapper = wrappers[lst.identifier] = ShoppingList(self, lst)
+        return wrapper
+
+    @property
+    def categorizer(self) -> Categorizer:
+        """The categorizer for the current user data."""
+        return self._cached(
+            "categorizer", lambda: Categorizer.from_user_data(self.user_data)
+        )
+
+    def _forget_lists(self, list_ids):
+        """Drop cached list wrappers after their lists changed in place."""
+        self._caches.pop("item_index", None)
+        self._caches.pop("name_index", None)
+        wrappers = self._caches.get("lists", {})
+        for list_id in list_ids:
+            wrappers.pop(list_id, None)
+
+    def _items_added_or_removed(self):
+        """Drop the item indexes after items were added to or removed from a list."""
+        self._caches.pop("item_index", None)
+        self._caches.pop("name_index", None)
+
+    def _item_changed(self, item: pb.ListItem, old_name: str):
+        """Update the item indexes after an item of the user data was saved.
+
+        Args:
+            item: The changed item message
+            old_name: The item's name before the change
+        """
+        item_index = self._caches.get("item_index")
+        if item_index is not None:
+            item_index.reindex(item.identifier)
+        name_index = self._caches.get("name_index")
+        if name_index is not None and item.name != old_name:
+            for entry in name_index.get(old_name):
+                if entry.source == "item" and entry.item.identifier == item.identifier:
+                    name_index.remove(old_name, entry)
+                    name_index.add(item.name, entry)
+
+    def _set_user_data(self, user_data: pb.PBUserDataResponse | None):
+        """Hold new (or merged) user data, dropping everything built from the old."""
+        self.user_data = user_data
+        self._caches.clear()
+
+    def _cached(self, name: str, build: typing.Callable[[], typing.Any]):
+        """Get a value built from the held user data, building it on first use.
+
+        Values stay cached until _set_user_data() is called again, so they
+        never keep replaced or released user data alive.
+        """
+        try:
+            return self._caches[name]
+        except KeyError:
+            value = self._caches[name] = build()
+            return value
+
+    def _release_user_data(self):
+        """Drop the held user data and everything built from it to free memory.
+
+        The next get_user_data() call fetches (or loads) the data again.
+        """
+        self._set_user_data(None)
+        self._recipe_book = None
+        self._meal_plan = None
+
     def _get_auth_headers(self, auth_required=True):
         _headers = {
             "X-AnyLeaf-API-Version": "3",
@@ -236,42 +871,40 @@ class AnyListClient:
         """Get or generate a client ID."""
         if self.client_id:
             return self.client_id
-        print("No saved clientId found, generating new clientId")
+        logger.info("No saved clientId found, generating new clientId")
 
+        # Stored together with the tokens by login()
         self.client_id = str(uuid.uuid4())
-        await self._store_credentials()
         return self.client_id
 
     async def _load_credentials(self):
-        """Load credentials from the credentials file."""
-        if not self.credentials_file or not os.path.exists(self.credentials_file):
-            print("Credentials file does not exist, not loading saved credentials")
-            return
+        """Load credentials from the credentials store."""
         try:
-            with open(self.credentials_file, "r") as f:
-                encrypted = f.read()
-                credentials = decrypt_credentials(encrypted, self.password)
-                self.client_id = credentials.get(CREDENTIALS_KEY_CLIENT_ID)
-                self.access_token = credentials.get(CREDENTIALS_KEY_ACCESS_TOKEN)
-                self.refresh_token = credentials.get(CREDENTIALS_KEY_REFRESH_TOKEN)
+            credentials = self.credentials_store.load(self.email, self.password)
         except Exception as error:
-            print(f"Failed to read stored credentials: {error}")
+            logger.warning("Failed to read stored credentials: %s", error)
+            return
+        if credentials is None:
+            logger.info("No stored credentials found, not loading saved credentials")
+            return
+        self.client_id = credentials.get(CREDENTIALS_KEY_CLIENT_ID)
+        self.access_token = credentials.get(CREDENTIALS_KEY_ACCESS_TOKEN)
+        self.refresh_token = credentials.get(CREDENTIALS_KEY_REFRESH_TOKEN)
 
     async def _store_credentials(self):
-        """Store credentials in the credentials file."""
-        if not self.credentials_file:
-            return
+        """Store credentials in the credentials store.
+
+        Unchanged credentials are not written again.
+        """
         credentials = {
             CREDENTIALS_KEY_CLIENT_ID: self.client_id,
             CREDENTIALS_KEY_ACCESS_TOKEN: self.access_token,
             CREDENTIALS_KEY_REFRESH_TOKEN: self.refresh_token,
         }
         try:
-            encrypted = encrypt_credentials(credentials, self.password)
-            with open(self.credentials_file, "w") as f:
-                f.write(encrypted)
+            self.credentials_store.save(self.email, credentials, self.password)
         except Exception as error:
-            print(f"Failed to write credentials to storage: {error}")
+            logger.warning("Failed to write credentials to storage: %s", error)
 
     def create_item(self) -> ShoppingListItem:
         """Create a new shopping list item."""
@@ -0,0 +1,114 @@
+"""Columnar views of AnyList list items for analytics."""
+
+from __future__ import annotations
+
+import operator
+import typing
+
+from anylist import messages_pb2 as pb
+
+if typing.TYPE_CHECKING:
+    import numpy
+    import pyarrow
+
+__all__ = [
+    "ITEM_COLUMNS",
+    "item_arrays",
+    "item_columns",
+    "item_table",
+]
+
+# Column name -> ListItem field and Python type of its values
+ITEM_COLUMNS = {
+    "identifier": str,
+    "listId": str,
+    "name": str,
+    "checked": bool,
+    "categoryMatchId": str,
+    "userId": str,
+    "serverModTime": float,
+    "manualSortIndex": int,
+}
+
+
+def item_columns(user_data: pb.PBUserDataResponse) -> dict[str, list]:
+    """
+    Collect the items of all shopping lists into one list per column.
+
+    The values are read straight from the protobuf messages without building
+    any ``ShoppingListItem``.
+
+    Args:
+        user_data: The user data, e.g. ``await client.get_user_data()``
+
+    Returns:
+        The values of each column of ``ITEM_COLUMNS``, in list and item order
+    """
+    get_row = operator.attrgetter(*ITEM_COLUMNS)
+    rows = []
+    for lst in user_data.shoppingListsResponse.newLists:
+        rows.extend(map(get_row, lst.items))
+    if not rows:
+        return {name: [] for name in ITEM_COLUMNS}
+    return {
+        name: list(values)
+        for name, values in zip(ITEM_COLUMNS, zip(*rows), strict=True)
+    }
+
+
+def item_table(user_data: pb.PBUserDataResponse) -> "pyarrow.Table":
+    """
+    Build an Arrow table of the items of all shopping lists.
+
+    Requires the optional ``pyarrow`` dependency.
+
+    Args:
+        user_data: The user data, e.g. ``await client.get_user_data()``
+
+    Returns:
+        A table with the columns of ``ITEM_COLUMNS``
+    """
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ImportError(
+            "Arrow tables require pyarrow (pip install anylist[arrow])"
+        ) from None
+
+    types = {str: pa.string(), bool: pa.bool_(), float: pa.float64(), int: pa.int64()}
+    columns = item_columns(user_data)
+    return pa.table(
+        {
+            name: pa.array(columns[name], type=types[kind])
+            for name, kind in ITEM_COLUMNS.items()
+        }
+    )
+
+
+def item_arrays(user_data: pb.PBUserDataResponse) -> dict[str, "numpy.ndarray"]:
+    """
+    Build NumPy arrays of the items of all shopping lists.
+
+    Requires the optional ``numpy`` dependency. String columns are unicode
+    arrays, so e.g. ``numpy.unique(arrays["categoryMatchId"],
+    return_counts=True)`` counts items per category.
+
+    Args:
+        user_data: The user data, e.g. ``await client.get_user_data()``
+
+    Returns:
+        One array per column of ``ITEM_COLUMNS``, all of the same length
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        raise ImportError(
+            "NumPy arrays require numpy (pip install anylist[numpy])"
+        ) from None
+
+    types = {str: np.str_, bool: np.bool_, float: np.float64, int: np.int64}
+    columns = item_columns(user_data)
+    return {
+        name: np.asarray(columns[name], dtype=types[kind])
+        for name, kind in ITEM_COLUMNS.items()
+    }
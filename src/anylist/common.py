@@ -2,7 +2,25 @@
 
 from uuid import uuid4
 
+from anylist import messages_pb2 as pb
+
 
 def uuid() -> str:
     """Generate a UUID without hyphens for AnyList API."""
     return str(uuid4()).replace("-", "")
+
+
+def normalize_name(name: str) -> str:
+    """Normalize a name for matching (case-insensitive, single spaces)."""
+    return " ".join(name.casefold().split())
+
+
+def processed_operations(
+    operations: list[pb.PBListOperation], response: pb.PBEditOperationResponse
+) -> dict[str, bool]:
+    """Map each operation ID to whether the server reported it processed."""
+    processed = set(response.processedOperations)
+    return {
+        op.metadata.operationId: op.metadata.operationId in processed
+        for op in operations
+    }
@@ -0,0 +1,215 @@
+"""Storage backends for AnyList client credentials (client ID and tokens)."""
+
+from __future__ import annotations
+
+import abc
+import hashlib
+import hmac
+import os
+import sqlite3
+import tempfile
+import threading
+
+from anylist.credentials import decrypt_credentials, derive_key, encrypt_credentials
+
+__all__ = [
+    "CredentialStore",
+    "FileCredentialStore",
+    "MemoryCredentialStore",
+    "SQLiteCredentialStore",
+]
+
+
+class CredentialStore(abc.ABC):
+    """
+    Base class for credential storage backends.
+
+    Credentials are encrypted with the account password before they are
+    written. The store remembers the credentials it last loaded or saved for
+    each account, so saving unchanged credentials (e.g. a client ID that was
+    just read back) costs neither an encryption nor a write. The encryption
+    key is derived once per account and password, and kept instead of the
+    password; a salted fingerprint of the password tells when it changed.
+
+    Subclasses implement ``_read``, ``_write`` and ``_delete`` for the
+    encrypted representation of one account.
+    """
+
+    def __init__(self):
+        self._cache: dict[str, dict] = {}
+        self._keys: dict[str, bytes] = {}
+        # Account -> fingerprint of the password its key was derived from
+        self._fingerprints: dict[str, bytes] = {}
+        self._salt = os.urandom(16)
+
+    def load(self, key: str, secret: str) -> dict | None:
+        """
+        Load the credentials of an account.
+
+        Args:
+            key: The account (usually its email)
+            secret: The password the credentials are encrypted with
+
+        Returns:
+            The stored credentials, or None if there are none
+        """
+        encryption_key = self._encryption_key(key, secret)
+        if key in self._cache:
+            return dict(self._cache[key])
+        encrypted = self._read(key)
+        if encrypted is None:
+            return None
+        credentials = decrypt_credentials(encrypted, secret, key=encryption_key)
+        self._cache[key] = dict(credentials)
+        return credentials
+
+    def save(self, key: str, credentials: dict, secret: str) -> None:
+        """
+        Store the credentials of an account, unless they are unchanged.
+
+        Args:
+            key: The account (usually its email)
+            credentials: The credentials to store
+            secret: The password to encrypt the credentials with
+        """
+        encryption_key = self._encryption_key(key, secret)
+        if self._cache.get(key) == credentials:
+            return
+        encrypted = encrypt_credentials(credentials, secret, key=encryption_key)
+        self._write(key, encrypted)
+        self._cache[key] = dict(credentials)
+
+    def delete(self, key: str) -> None:
+        """Remove the credentials of an account, if any."""
+        self._cache.pop(key, None)
+        self._keys.pop(key, None)
+        self._fingerprints.pop(key, None)
+        self._delete(key)
+
+    def _encryption_key(self, key: str, secret: str) -> bytes:
+        """Get the key for an account's password, deriving it when it changed."""
+        fingerprint = hmac.digest(self._salt, secret.encode(), hashlib.sha256)
+        if self._fingerprints.get(key) != fingerprint:
+            # What was loaded or saved with another password must be read
+            # or written again with this one
+            self._cache.pop(key, None)
+            self._keys[key] = derive_key(secret)
+            self._fingerprints[key] = fingerprint
+        return self._keys[key]
+
+    @abc.abstractmethod
+    def _read(self, key: str) -> str | None:
+        """Read the encrypted credentials of an account (None if missing)."""
+
+    @abc.abstractmethod
+    def _write(self, key: str, encrypted: str) -> None:
+        """Replace the encrypted credentials of an account."""
+
+    @abc.abstractmethod
+    def _delete(self, key: str) -> None:
+        """Remove the encrypted credentials of an account, if any."""
+
+
+class MemoryCredentialStore(CredentialStore):
+    """Keeps credentials in memory only, for the lifetime of the process."""
+
+    def load(self, key: str, secret: str) -> dict | None:
+        # Nothing is ever persisted, so there is no need to encrypt
+        credentials = self._cache.get(key)
+        return dict(credentials) if credentials is not None else None
+
+    def save(self, key: str, credentials: dict, secret: str) -> None:
+        self._cache[key] = dict(credentials)
+
+    def _read(self, key: str) -> str | None:
+        return None
+
+    def _write(self, key: str, encrypted: str) -> None:
+        pass
+
+    def _delete(self, key: str) -> None:
+        pass
+
+
+class FileCredentialStore(CredentialStore):
+    """
+    Stores the credentials of a single account in a file.
+
+    This is the client's default backend and uses the format of the
+    ``credentials_file`` option. The file is replaced atomically, so a crash
+    while writing never leaves it truncated. The account key is not part of
+    the file; use one file per account.
+    """
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+
+    def _read(self, key: str) -> str | None:
+        try:
+            with open(self.path, "r") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _write(self, key: str, encrypted: str) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                f.write(encrypted)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def _delete(self, key: str) -> None:
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class SQLiteCredentialStore(CredentialStore):
+    """
+    Stores the credentials of any number of accounts in one SQLite database.
+
+    Suited to running many accounts (see ``AccountPool``): every account is a
+    row keyed by its email, and each save is a single atomic upsert instead
+    of a file rewrite.
+    """
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS credentials "
+                "(key TEXT PRIMARY KEY, data TEXT NOT NULL)"
+            )
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._connection.close()
+
+    def _read(self, key: str) -> str | None:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT data FROM credentials WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def _write(self, key: str, encrypted: str) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT INTO credentials (key, data) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET data = excluded.data",
+                (key, encrypted),
+            )
+
+    def _delete(self, key: str) -> None:
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM credentials WHERE key = ?", (key,))
@@ -1,3 +1,4 @@
+import base64
 import hashlib
 import json
 import os
@@ -15,9 +16,9 @@ def derive_key(password):
     return sha[:32]
 
 
-def encrypt_credentials(credentials, secret):
+def encrypt_credentials(credentials, secret, key=None):
     plain = json.dumps(credentials).encode()
-    key = derive_key(secret)
+    key = key or derive_key(secret)
     iv = os.urandom(16)
     cipher = Cipher(algorithms.AES(key), modes.CBC(iv), backend=default_backend())
     encryptor = cipher.encryptor()
@@ -32,9 +33,9 @@ def encrypt_credentials(credentials, secret):
     )
 
 
-def decrypt_credentials(credentials, secret):
+def decrypt_credentials(credentials, secret, key=None):
     encrypted = json.loads(credentials)
-    key = derive_key(secret)
+    key = key or derive_key(secret)
     iv = bytes.fromhex(encrypted["iv"])
     cipher = Cipher(algorithms.AES(key), modes.CBC(iv), backend=default_backend())
     decryptor = cipher.decryptor()
@@ -42,3 +43,13 @@ def decrypt_credentials(credentials, secret):
     pad_len = plain[-1]
     plain = plain[:-pad_len]
     return json.loads(plain.decode())
+
+
+def token_expiry(token):
+    """Get the expiry (unix time) of a JWT access token, or None if unknown."""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+    except Exception:
+        return None
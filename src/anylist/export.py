@@ -0,0 +1,157 @@
+"""Streaming export of AnyList items to NDJSON, CSV and Arrow."""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+import typing
+
+from anylist.shopping_list_item import ShoppingListItem
+
+__all__ = [
+    "EXPORT_FIELDS",
+    "export_arrow",
+    "export_csv",
+    "export_ndjson",
+    "item_record",
+]
+
+# Exported item fields, in column order
+EXPORT_FIELDS = (
+    "identifier",
+    "listId",
+    "name",
+    "details",
+    "quantity",
+    "checked",
+    "category",
+    "userId",
+    "manualSortIndex",
+)
+
+DEFAULT_CHUNK_SIZE = 1000
+
+
+def item_record(item: ShoppingListItem) -> dict[str, typing.Any]:
+    """Get the exported fields of an item as a dict."""
+    return {field: getattr(item, field) for field in EXPORT_FIELDS}
+
+
+async def _chunks(
+    items: typing.AsyncIterable[ShoppingListItem], chunk_size: int
+) -> typing.AsyncIterator[list[dict[str, typing.Any]]]:
+    """Group the records of an item stream into lists of chunk_size."""
+    chunk = []
+    async for item in items:
+        chunk.append(item_record(item))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+async def export_ndjson(
+    items: typing.AsyncIterable[ShoppingListItem],
+    f: typing.TextIO,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> int:
+    """
+    Write items as newline-delimited JSON, one object per item.
+
+    Only ``chunk_size`` records are held in memory at a time.
+
+    Args:
+        items: The items to export, e.g. ``client.iter_items()``
+        f: A text file to write to
+        chunk_size: Number of items written per write call
+
+    Returns:
+        The number of exported items
+    """
+    count = 0
+    async for chunk in _chunks(items, chunk_size):
+        f.write("".join(json.dumps(record) + "\n" for record in chunk))
+        count += len(chunk)
+    return count
+
+
+async def export_csv(
+    items: typing.AsyncIterable[ShoppingListItem],
+    f: typing.TextIO,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> int:
+    """
+    Write items as CSV with a header row of ``EXPORT_FIELDS``.
+
+    Only ``chunk_size`` records are held in memory at a time.
+
+    Args:
+        items: The items to export, e.g. ``client.iter_items()``
+        f: A text file to write to (opened with ``newline=""``)
+        chunk_size: Number of items written per write call
+
+    Returns:
+        The number of exported items
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    count = 0
+    async for chunk in _chunks(items, chunk_size):
+        writer.writerows(chunk)
+        f.write(buffer.getvalue())
+        buffer.seek(0)
+        buffer.truncate()
+        count += len(chunk)
+    # Header only, if there were no items
+    f.write(buffer.getvalue())
+    return count
+
+
+async def export_arrow(
+    items: typing.AsyncIterable[ShoppingListItem],
+    sink,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> int:
+    """
+    Write items as an Arrow IPC stream, one record batch per chunk.
+
+    Requires the optional ``pyarrow`` dependency.
+
+    Args:
+        items: The items to export, e.g. ``client.iter_items()``
+        sink: A path or binary file (anything ``pyarrow.ipc.new_stream``
+            accepts) to write to
+        chunk_size: Number of items per record batch
+
+    Returns:
+        The number of exported items
+    """
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ImportError(
+            "Arrow export requires pyarrow (pip install anylist[arrow])"
+        ) from None
+
+    schema = pa.schema(
+        [
+            ("identifier", pa.string()),
+            ("listId", pa.string()),
+            ("name", pa.string()),
+            ("details", pa.string()),
+            ("quantity", pa.string()),
+            ("checked", pa.bool_()),
+            ("category", pa.string()),
+            ("userId", pa.string()),
+            ("manualSortIndex", pa.int64()),
+        ]
+    )
+    count = 0
+    with pa.ipc.new_stream(sink, schema) as writer:
+        async for chunk in _chunks(items, chunk_size):
+            writer.write_batch(pa.RecordBatch.from_pylist(chunk, schema=schema))
+            count += len(chunk)
+    return count
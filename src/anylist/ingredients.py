@@ -0,0 +1,310 @@
+"""Shopping list ingredients from recipes and meal plans."""
+
+from __future__ import annotations
+
+import re
+import typing
+from dataclasses import dataclass, field
+from fractions import Fraction
+
+from anylist import messages_pb2 as pb
+from anylist.common import normalize_name
+from anylist.recipe import Recipe
+
+if typing.TYPE_CHECKING:
+    from anylist.meal_plan import MealPlanEvent
+    from anylist.recipe import RecipeBook
+
+__all__ = [
+    "IngredientTotal",
+    "RecipeUse",
+    "aggregate_ingredients",
+    "format_amount",
+    "parse_quantity",
+    "recipe_uses",
+]
+
+# Unit spelling -> (unit, dimension, size in the dimension's base unit).
+# Amounts are only added up within a dimension.
+_UNITS: dict[str, tuple[str, str, Fraction]] = {
+    spelling: (unit, dimension, size)
+    for spellings, unit, dimension, size in (
+        (("tsp", "teaspoon", "teaspoons"), "tsp", "volume", Fraction(5)),
+        (("tbsp", "tbs", "tablespoon", "tablespoons"), "tbsp", "volume", Fraction(15)),
+        (("cup", "cups"), "cup", "volume", Fraction(240)),
+        (
+            ("ml", "milliliter", "milliliters", "millilitre"),
+            "ml",
+            "volume",
+            Fraction(1),
+        ),
+        (("l", "liter", "liters", "litre", "litres"), "l", "volume", Fraction(1000)),
+        (("g", "gram", "grams"), "g", "mass", Fraction(1)),
+        (("kg", "kilogram", "kilograms"), "kg", "mass", Fraction(1000)),
+        (("oz", "ounce", "ounces"), "oz", "mass", Fraction("28.35")),
+        (("lb", "lbs", "pound", "pounds"), "lb", "mass", Fraction("453.59")),
+    )
+    for spelling in spellings
+}
+
+_VULGAR_FRACTIONS = {
+    "½": Fraction(1, 2),
+    "⅓": Fraction(1, 3),
+    "⅔": Fraction(2, 3),
+    "¼": Fraction(1, 4),
+    "¾": Fraction(3, 4),
+    "⅛": Fraction(1, 8),
+    "⅜": Fraction(3, 8),
+    "⅝": Fraction(5, 8),
+    "⅞": Fraction(7, 8),
+}
+
+# A leading amount: "2", "1.5", "1,5", "1,000", "1/2", "1 1/2", "½" or "1½".
+# A comma followed by exactly three digits separates thousands.
+_AMOUNT = re.compile(
+    r"\s*(?:(?P<whole>(?P<thousands>\d{1,3}(?:,\d{3})+)|\d+(?:\.\d+|,(?!\d{3}(?!\d))\d+)?)"
+    r"(?!\d|\s*/)\s*)?"
+    r"(?:(?P<numerator>\d+)\s*/\s*(?P<denominator>\d+)|(?P<vulgar>[½⅓⅔¼¾⅛⅜⅝⅞]))?"
+)
+_UNIT = re.compile(r"\s*(?P<unit>[^\W\d_]+)\.?(?:\s+|$)")
+
+# Denominators shown as fractions; other amounts are shown as decimals
+_FRACTION_DENOMINATORS = {2, 3, 4, 8}
+
+
+def parse_quantity(text: str) -> tuple[Fraction | None, str, str]:
+    """
+    Split a quantity (or a whole ingredient line) into amount, unit and rest.
+
+    Args:
+        text: E.g. "1 1/2 cups", "½ tsp salt" or "a pinch"
+
+    Returns:
+        The amount (None if the text does not start with one), the unit
+        ("" if there is none, otherwise as in ``_UNITS``) and the rest of the
+        text, e.g. ``(Fraction(3, 2), "cup", "")``
+    """
+    match = _AMOUNT.match(text)
+    whole, numerator, vulgar = match.group("whole", "numerator", "vulgar")
+    if whole is None and numerator is None and vulgar is None:
+        return None, "", text.strip()
+
+    if whole:
+        separator = "" if match.group("thousands") else "."
+        amount = Fraction(whole.replace(",", separator))
+    else:
+        amount = Fraction(0)
+    if numerator is not None:
+        denominator = int(match.group("denominator"))
+        if denominator:
+            amount += Fraction(int(numerator), denominator)
+    elif vulgar is not None:
+        amount += _VULGAR_FRACTIONS[vulgar]
+
+    rest = text[match.end() :]
+    unit_match = _UNIT.match(rest)
+    if unit_match and unit_match.group("unit").casefold() in _UNITS:
+        unit = _UNITS[unit_match.group("unit").casefold()][0]
+        rest = rest[unit_match.end() :]
+    else:
+        unit = ""
+    return amount, unit, rest.strip()
+
+
+def format_amount(amount: Fraction) -> str:
+    """Format an amount as e.g. "2", "1 1/2" or "0.35"."""
+    if amount.denominator == 1:
+        return str(amount.numerator)
+    if amount.denominator in _FRACTION_DENOMINATORS:
+        whole, remainder = divmod(amount.numerator, amount.denominator)
+        fraction = f"{remainder}/{amount.denominator}"
+        return f"{whole} {fraction}" if whole else fraction
+    return f"{float(amount):.2f}".rstrip("0").rstrip(".")
+
+
+def _split_quantity(text: str) -> tuple[Fraction | None, str, str]:
+    """Split a quantity into amount, unit and note (when it has no amount)."""
+    amount, unit, rest = parse_quantity(text)
+    if amount is None:
+        return None, "", rest
+    # Words after the amount are a unit, even one missing from _UNITS
+    return amount, unit or rest.casefold(), ""
+
+
+def _unit_info(unit: str) -> tuple[str, Fraction]:
+    """Get the dimension and size of a unit; other words are their own unit."""
+    if unit in _UNITS:
+        _, dimension, size = _UNITS[unit]
+        return dimension, size
+    return f"unit:{unit}", Fraction(1)
+
+
+@dataclass
+class IngredientTotal:
+    """
+    The total quantity of one ingredient over several recipes.
+
+    Amounts are added up per dimension (volume, mass, or the same other
+    unit) in the unit they were first seen in; quantities without an amount
+    (e.g. "a pinch") are kept as text.
+    """
+
+    name: str
+    # Dimension -> (unit, amount in that unit)
+    amounts: dict[str, tuple[str, Fraction]] = field(default_factory=dict)
+    # Quantities that are not amounts
+    notes: list[str] = field(default_factory=list)
+    # The ingredients making up the total, for ListItem.ingredients
+    sources: list[pb.PBItemIngredient] = field(default_factory=list)
+
+    def add(self, amount: Fraction | None, unit: str = "", note: str = "") -> None:
+        """Add an amount (or, without one, a note such as "a pinch")."""
+        if amount is None:
+            if note and note not in self.notes:
+                self.notes.append(note)
+            return
+        dimension, size = _unit_info(unit)
+        if dimension in self.amounts:
+            total_unit, total = self.amounts[dimension]
+            _, total_size = _unit_info(total_unit)
+            self.amounts[dimension] = (total_unit, total + amount * size / total_size)
+        else:
+            self.amounts[dimension] = (unit, amount)
+
+    def add_quantity(self, text: str) -> None:
+        """Add a quantity given as text, e.g. an item's "2 cups"."""
+        self.add(*_split_quantity(text))
+
+    @property
+    def quantity_text(self) -> str:
+        """The total as text, e.g. "1 1/2 cup + a pinch"."""
+        parts = [
+            f"{format_amount(amount)} {unit}".strip()
+            for unit, amount in self.amounts.values()
+        ]
+        return " + ".join(parts + self.notes)
+
+    @property
+    def quantity(self) -> pb.PBItemQuantity:
+        """The total as an item quantity."""
+        text = self.quantity_text
+        if len(self.amounts) == 1 and not self.notes:
+            ((unit, amount),) = self.amounts.values()
+            return pb.PBItemQuantity(
+                amount=format_amount(amount), unit=unit, rawQuantity=text
+            )
+        return pb.PBItemQuantity(amount=text, rawQuantity=text)
+
+    @property
+    def recipe_ids(self) -> list[str]:
+        """The identifiers of the recipes the ingredient comes from."""
+        return list(dict.fromkeys(source.recipeId for source in self.sources))
+
+    def update(self, other: IngredientTotal) -> None:
+        """Add another total (of the same ingredient) to this one."""
+        for unit, amount in other.amounts.values():
+            self.add(amount, unit)
+        for note in other.notes:
+            self.add(None, note=note)
+        self.sources.extend(other.sources)
+
+    def combined_quantity(self, quantity: str) -> str:
+        """Get the total plus another quantity (e.g. of an existing item)."""
+        combined = IngredientTotal(self.name)
+        if quantity:
+            combined.add_quantity(quantity)
+        combined.update(self)
+        return combined.quantity_text
+
+
+@dataclass
+class RecipeUse:
+    """A recipe to shop for, scaled, optionally planned for a calendar event."""
+
+    recipe: Recipe | pb.PBRecipe
+    scale: float = 1.0
+    event: MealPlanEvent | pb.PBCalendarEvent | None = None
+
+
+def recipe_uses(
+    events: typing.Iterable[MealPlanEvent | pb.PBCalendarEvent],
+    recipes: RecipeBook,
+) -> list[RecipeUse]:
+    """
+    Get the recipes planned by meal plan events, scaled as planned.
+
+    Args:
+        events: E.g. ``meal_plan.events_between(monday, sunday)``
+        recipes: The recipes, e.g. ``await client.get_recipes()``
+
+    Returns:
+        A use per event with a known recipe, scaled by its
+        ``recipeScaleFactor`` (1 if unset)
+    """
+    uses = []
+    for event in events:
+        recipe = recipes.get(event.recipeId) if event.recipeId else None
+        if recipe is not None:
+            uses.append(RecipeUse(recipe, event.recipeScaleFactor or 1.0, event))
+    return uses
+
+
+def aggregate_ingredients(
+    recipes: typing.Iterable[Recipe | pb.PBRecipe | RecipeUse],
+) -> dict[str, IngredientTotal]:
+    """
+    Add up the ingredients of several recipes by name.
+
+    Headings are skipped. Each ingredient's amount is taken from its
+    ``quantity`` (or the start of ``rawIngredient``) and multiplied by the
+    scale of its recipe use.
+
+    Args:
+        recipes: The recipes, or recipe uses (e.g. from ``recipe_uses``)
+
+    Returns:
+        The totals by normalized ingredient name, in order of first use
+    """
+    totals: dict[str, IngredientTotal] = {}
+    for use in recipes:
+        if not isinstance(use, RecipeUse):
+            use = RecipeUse(use)
+        recipe = use.recipe.message if isinstance(use.recipe, Recipe) else use.recipe
+        scale = Fraction(use.scale).limit_denominator(100)
+        event = use.event
+
+        for ingredient in recipe.ingredients:
+            if ingredient.isHeading:
+                continue
+            if ingredient.quantity:
+                amount, unit, note = _split_quantity(ingredient.quantity)
+                name = ingredient.name
+            else:
+                amount, unit, rest = parse_quantity(ingredient.rawIngredient)
+                note = ""
+                name = ingredient.name or rest
+            key = normalize_name(name)
+            if not key:
+                continue
+            if amount is not None:
+                amount *= scale
+
+            total = totals.get(key)
+            if total is None:
+                total = totals[key] = IngredientTotal(name.strip())
+            total.add(amount, unit, note)
+            total.sources.append(
+                pb.PBItemIngredient(
+                    ingredient=ingredient,
+                    quantityPb=pb.PBItemQuantity(
+                        amount=format_amount(amount) if amount is not None else "",
+                        unit=unit,
+                        rawQuantity=ingredient.quantity,
+                    ),
+                    recipeId=recipe.identifier,
+                    recipeName=recipe.name,
+                    eventId=event.identifier if event is not None else "",
+                    eventDate=event.date if event is not None else "",
+                )
+            )
+    return totals
@@ -0,0 +1,256 @@
+"""Request instrumentation hooks and metrics for AnyList API clients."""
+
+from __future__ import annotations
+
+import bisect
+import time
+from dataclasses import dataclass
+
+import aiohttp
+
+__all__ = [
+    "ConnectionEvent",
+    "Instrumentation",
+    "MetricsCollector",
+    "RequestEvent",
+]
+
+
+@dataclass
+class RequestEvent:
+    """Timings (seconds) and sizes (bytes) of one request attempt."""
+
+    method: str
+    endpoint: str
+    status: int | None = None
+    request_bytes: int = 0
+    response_bytes: int = 0
+    # From sending the request until the response headers arrived
+    request_time: float = 0.0
+    response_read_time: float = 0.0
+    parse_time: float = 0.0
+    total_time: float = 0.0
+    error: BaseException | None = None
+
+
+@dataclass
+class ConnectionEvent:
+    """Timing of a DNS lookup or connection setup made by the session."""
+
+    phase: str
+    host: str
+    duration: float
+
+
+class Instrumentation:
+    """
+    Base class for client instrumentation hooks.
+
+    Subclass and override the hooks of interest, then pass an instance as
+    ``AnyListClient(instrumentation=...)``. Every hook does nothing by
+    default, and a client without instrumentation skips all timing work.
+    """
+
+    def on_request(self, event: RequestEvent) -> None:
+        """Called after every request attempt, successful or not."""
+
+    def on_retry(
+        self, endpoint: str, attempt: int, delay: float, error: BaseException
+    ) -> None:
+        """Called before a failed request is retried after ``delay`` seconds."""
+
+    def on_token_refresh(self, kind: str) -> None:
+        """Called when tokens are renewed; ``kind`` is "refresh" or "fetch"."""
+
+    def on_connection(self, event: ConnectionEvent) -> None:
+        """Called for DNS lookups and new connections (see trace_config)."""
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        """
+        Build an aiohttp trace config reporting DNS and connect timings.
+
+        Clients add it to sessions they create themselves; pass it to
+        ``create_session(trace_configs=[...])`` for shared sessions.
+        """
+        config = aiohttp.TraceConfig()
+
+        async def dns_start(session, ctx, params):
+            ctx.dns_start = time.perf_counter()
+
+        async def dns_end(session, ctx, params):
+            self.on_connection(
+                ConnectionEvent("dns", params.host, time.perf_counter() - ctx.dns_start)
+            )
+
+        async def connect_start(session, ctx, params):
+            ctx.connect_start = time.perf_counter()
+
+        async def connect_end(session, ctx, params):
+            self.on_connection(
+                ConnectionEvent("connect", "", time.perf_counter() - ctx.connect_start)
+            )
+
+        config.on_dns_resolvehost_start.append(dns_start)
+        config.on_dns_resolvehost_end.append(dns_end)
+        config.on_connection_create_start.append(connect_start)
+        config.on_connection_create_end.append(connect_end)
+        return config
+
+
+class _RequestTimer:
+    """Collects the timings of a request attempt for an instrumented client."""
+
+    __slots__ = ("event", "_start", "_mark")
+
+    def __init__(self, method: str, endpoint: str, request_bytes: int):
+        self.event = RequestEvent(method.upper(), endpoint, request_bytes=request_bytes)
+        self._start = self._mark = time.perf_counter()
+
+    def _lap(self) -> float:
+        now = time.perf_counter()
+        elapsed, self._mark = now - self._mark, now
+        return elapsed
+
+    def response_started(self, status: int) -> None:
+        self.event.status = status
+        self.event.request_time = self._lap()
+
+    def response_read(self, size: int) -> None:
+        self.event.response_bytes = size
+        self.event.response_read_time = self._lap()
+
+    def parsed(self) -> None:
+        self.event.parse_time = self._lap()
+
+    def finish(self, error: BaseException | None = None) -> RequestEvent:
+        self.event.error = error
+        self.event.total_time = time.perf_counter() - self._start
+        return self.event
+
+
+class _Histogram:
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsCollector(Instrumentation):
+    """
+    Instrumentation that aggregates request metrics in memory.
+
+    Keeps request counts, payload sizes, retry and token refresh counts, and
+    per-endpoint latency and parse time histograms. ``render_prometheus()``
+    exports them in the Prometheus text exposition format.
+    """
+
+    LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.requests: dict[tuple[str, str], int] = {}
+        self.request_bytes: dict[str, int] = {}
+        self.response_bytes: dict[str, int] = {}
+        self.latency: dict[str, _Histogram] = {}
+        self.parse_time: dict[str, _Histogram] = {}
+        self.connection_time: dict[str, _Histogram] = {}
+        self.retries: dict[str, int] = {}
+        self.token_refreshes: dict[str, int] = {}
+
+    def on_request(self, event: RequestEvent) -> None:
+        endpoint = event.endpoint
+        status = str(event.status) if event.status is not None else "error"
+        self.requests[(endpoint, status)] = self.requests.get((endpoint, status), 0) + 1
+        self.request_bytes[endpoint] = (
+            self.request_bytes.get(endpoint, 0) + event.request_bytes
+        )
+        self.response_bytes[endpoint] = (
+            self.response_bytes.get(endpoint, 0) + event.response_bytes
+        )
+        self._histogram(self.latency, endpoint).observe(event.total_time)
+        if event.parse_time:
+            self._histogram(self.parse_time, endpoint).observe(event.parse_time)
+
+    def on_retry(self, endpoint, attempt, delay, error) -> None:
+        self.retries[endpoint] = self.retries.get(endpoint, 0) + 1
+
+    def on_token_refresh(self, kind: str) -> None:
+        self.token_refreshes[kind] = self.token_refreshes.get(kind, 0) + 1
+
+    def on_connection(self, event: ConnectionEvent) -> None:
+        self._histogram(self.connection_time, event.phase).observe(event.duration)
+
+    def _histogram(self, histograms: dict[str, _Histogram], key: str) -> _Histogram:
+        if key not in histograms:
+            histograms[key] = _Histogram(self.buckets)
+        return histograms[key]
+
+    def render_prometheus(self, prefix: str = "anylist") -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines = []
+
+        def counter(name, help_text, values, label):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} counter")
+            for key, value in sorted(values.items()):
+                lines.append(f'{prefix}_{name}{{{label}="{key}"}} {value}')
+
+        def histogram(name, help_text, histograms, label):
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} histogram")
+            for key, hist in sorted(histograms.items()):
+                cumulative = 0
+                for bound, count in zip(
+                    (*hist.buckets, "+Inf"), hist.counts, strict=True
+                ):
+                    cumulative += count
+                    lines.append(
+                        f'{prefix}_{name}_bucket{{{label}="{key}",le="{bound}"}} '
+                        f"{cumulative}"
+                    )
+                lines.append(f'{prefix}_{name}_sum{{{label}="{key}"}} {hist.sum}')
+                lines.append(f'{prefix}_{name}_count{{{label}="{key}"}} {hist.count}')
+
+        lines.append(f"# HELP {prefix}_requests_total Requests by endpoint and status")
+        lines.append(f"# TYPE {prefix}_requests_total counter")
+        for (endpoint, status), value in sorted(self.requests.items()):
+            lines.append(
+                f'{prefix}_requests_total{{endpoint="{endpoint}",status="{status}"}} '
+                f"{value}"
+            )
+        counter(
+            "request_bytes_total",
+            "Request payload bytes",
+            self.request_bytes,
+            "endpoint",
+        )
+        counter(
+            "response_bytes_total",
+            "Response payload bytes",
+            self.response_bytes,
+            "endpoint",
+        )
+        counter("retries_total", "Retried requests", self.retries, "endpoint")
+        counter("token_refreshes_total", "Token renewals", self.token_refreshes, "kind")
+        histogram(
+            "request_duration_seconds", "Request latency", self.latency, "endpoint"
+        )
+        histogram(
+            "parse_duration_seconds",
+            "Protobuf parse time",
+            self.parse_time,
+            "endpoint",
+        )
+        histogram(
+            "connection_duration_seconds",
+            "DNS lookup and connect time",
+            self.connection_time,
+            "phase",
+        )
+        return "\n".join(lines) + "\n"
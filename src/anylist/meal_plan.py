@@ -0,0 +1,260 @@
+"""MealPlan and MealPlanEvent classes for AnyList API."""
+
+from __future__ import annotations
+
+import datetime
+import typing
+
+from anylist import messages_pb2 as pb
+from anylist.common import uuid
+
+if typing.TYPE_CHECKING:
+    from anylist.client import AnyListClient
+    from anylist.recipe import Recipe
+
+CALENDAR_PATH = "data/meal-planning-calendar/update"
+
+
+def _date_string(date: datetime.date | str) -> str:
+    """Format a date the way calendar events store it ("YYYY-MM-DD")."""
+    return date if isinstance(date, str) else date.isoformat()
+
+
+class MealPlanEvent:
+    """Represents an event (usually a recipe) on the meal planning calendar."""
+
+    def __init__(self, meal_plan: MealPlan, event: pb.PBCalendarEvent):
+        self.meal_plan = meal_plan
+        self._pb = event
+        # The event as last seen by the server, for update operations
+        self._original = pb.PBCalendarEvent()
+        self._original.CopyFrom(event)
+
+    def __repr__(self):
+        return f"MealPlanEvent(date={self.date}, title={self.title})"
+
+    @property
+    def identifier(self) -> str:
+        return self._pb.identifier
+
+    @property
+    def date(self) -> str:
+        return self._pb.date
+
+    @date.setter
+    def date(self, value: datetime.date | str):
+        self._pb.date = _date_string(value)
+
+    @property
+    def title(self) -> str:
+        return self._pb.title
+
+    @title.setter
+    def title(self, value):
+        self._pb.title = value
+
+    @property
+    def details(self) -> str:
+        return self._pb.details
+
+    @details.setter
+    def details(self, value):
+        self._pb.details = value
+
+    @property
+    def recipeId(self) -> str:
+        return self._pb.recipeId
+
+    @recipeId.setter
+    def recipeId(self, value):
+        self._pb.recipeId = value
+
+    @property
+    def labelId(self) -> str:
+        return self._pb.labelId
+
+    @labelId.setter
+    def labelId(self, value):
+        self._pb.labelId = value
+
+    @property
+    def recipeScaleFactor(self) -> float:
+        return self._pb.recipeScaleFactor
+
+    @recipeScaleFactor.setter
+    def recipeScaleFactor(self, value):
+        self._pb.recipeScaleFactor = value
+
+    def _mark_saved(self):
+        self._original.CopyFrom(self._pb)
+
+
+class MealPlan:
+    """
+    The meal planning calendar of an AnyList account.
+
+    Get it with ``client.get_meal_plan()``; ``sync()`` brings it up to date
+    with an incremental request that only downloads the events changed since
+    the calendar's ``logicalTimestamp``.
+    """
+
+    def __init__(self, client: "AnyListClient", calendar: pb.PBCalendarResponse):
+        self.client = client
+        self._events: dict[str, MealPlanEvent] = {}
+        self._load(calendar)
+
+    def _load(self, calendar: pb.PBCalendarResponse) -> None:
+        """(Re)build the events from a calendar response, keeping wrappers."""
+        self.calendar_id = calendar.calendarId
+        self.logical_timestamp = calendar.logicalTimestamp
+        self.labels: dict[str, pb.PBCalendarLabel] = {
+            label.identifier: label for label in calendar.labels
+        }
+        existing = self._events
+        self._events = {}
+        for event in calendar.events:
+            wrapper = existing.get(event.identifier)
+            if wrapper is None or wrapper._original != event:
+                wrapper = MealPlanEvent(self, event)
+            self._events[event.identifier] = wrapper
+
+    def __len__(self):
+        return len(self._events)
+
+    def __iter__(self) -> typing.Iterator[MealPlanEvent]:
+        return iter(self.events)
+
+    @property
+    def events(self) -> list[MealPlanEvent]:
+        """All events, ordered by date."""
+        return sorted(self._events.values(), key=lambda event: event.date)
+
+    def get_event(self, identifier: str) -> MealPlanEvent | None:
+        return self._events.get(identifier)
+
+    def events_on(self, date: datetime.date | str) -> list[MealPlanEvent]:
+        """Get the events of a day."""
+        date = _date_string(date)
+        return [event for event in self._events.values() if event.date == date]
+
+    def events_between(
+        self, start: datetime.date | str, end: datetime.date | str
+    ) -> list[MealPlanEvent]:
+        """
+        Get the events of a date range, ordered by date.
+
+        Args:
+            start: The first day
+            end: The last day (included)
+        """
+        start, end = _date_string(start), _date_string(end)
+        return [event for event in self.events if start <= event.date <= end]
+
+    def create_event(
+        self,
+        date: datetime.date | str,
+        title: str = "",
+        recipe: Recipe | None = None,
+        label_id: str = "",
+        details: str = "",
+        scale_factor: float = 1.0,
+    ) -> MealPlanEvent:
+        """
+        Create a new event. It is only sent by ``add_events``.
+
+        Args:
+            date: The day of the event
+            title: The title (for events without a recipe)
+            recipe: The recipe planned for the day
+            label_id: The identifier of a calendar label, e.g. "Dinner"
+            details: A note
+            scale_factor: How much to scale the recipe by
+        """
+        event = pb.PBCalendarEvent(
+            identifier=uuid(),
+            calendarId=self.calendar_id,
+            date=_date_string(date),
+            title=title,
+            details=details,
+            recipeId=recipe.identifier if recipe is not None else "",
+            labelId=label_id,
+            recipeScaleFactor=scale_factor,
+        )
+        return MealPlanEvent(self, event)
+
+    async def add_event(self, event: MealPlanEvent) -> None:
+        """Add an event to the calendar."""
+        await self.add_events([event])
+
+    async def add_events(self, events: typing.Iterable[MealPlanEvent]) -> None:
+        """
+        Add several events to the calendar in a single request.
+
+        Args:
+            events: Events made with ``create_event``
+        """
+        events = list(events)
+        operations = [
+            self._operation("new-event", updatedEvent=event._pb) for event in events
+        ]
+        if not operations:
+            return
+        await self.client._submit_operations(CALENDAR_PATH, operations)
+        for event in events:
+            event._mark_saved()
+            self._events[event.identifier] = event
+
+    async def update_events(self, events: typing.Iterable[MealPlanEvent]) -> None:
+        """
+        Save the local changes of several events in a single request.
+
+        Args:
+            events: Events of this calendar with unsaved changes
+        """
+        events = [event for event in events if event._pb != event._original]
+        operations = [
+            self._operation(
+                "update-event",
+                updatedEvent=event._pb,
+                originalEvent=event._original,
+            )
+            for event in events
+        ]
+        if not operations:
+            return
+        await self.client._submit_operations(CALENDAR_PATH, operations)
+        for event in events:
+            event._mark_saved()
+
+    async def remove_events(self, events: typing.Iterable[MealPlanEvent]) -> None:
+        """
+        Remove several events from the calendar in a single request.
+
+        Args:
+            events: Events of this calendar
+        """
+        events = list(events)
+        operations = [
+            self._operation("delete-event", originalEvent=event._original)
+            for event in events
+        ]
+        if not operations:
+            return
+        await self.client._submit_operations(CALENDAR_PATH, operations)
+        for event in events:
+            self._events.pop(event.identifier, None)
+
+    async def sync(self) -> MealPlan:
+        """Fetch the calendar changes made elsewhere and apply them."""
+        return await self.client.get_meal_plan(refresh=True)
+
+    def _operation(self, handler_id: str, **fields) -> pb.PBCalendarOperation:
+        return pb.PBCalendarOperation(
+            metadata=pb.PBOperationMetadata(
+                operationId=uuid(),
+                handlerId=handler_id,
+                userId=self.client.uid,
+            ),
+            calendarId=self.calendar_id,
+            **fields,
+        )
@@ -0,0 +1,150 @@
+"""Durable write-ahead log of pending AnyList list operations."""
+
+from __future__ import annotations
+
+import logging
+import os
+import struct
+import tempfile
+
+from anylist import messages_pb2 as pb
+
+__all__ = [
+    "OperationLog",
+]
+
+logger = logging.getLogger("anylist.oplog")
+
+_HEADER = struct.Struct(">BI")
+_RECORD_OPERATION = 1
+_RECORD_ACK = 2
+
+
+class OperationLog:
+    """
+    Append-only on-disk log of list operations that were not yet sent.
+
+    Pass an instance to ``AnyListClient(operation_log=...)`` to make item
+    saves and additions return as soon as their operations are recorded. The
+    client sends logged operations in order, batched, whenever it can reach
+    the server, and acknowledges them in the log once a request succeeded.
+    Pending operations survive restarts; each is keyed by its operation ID, so
+    resending one the server already processed is harmless.
+    """
+
+    def __init__(self, path: str, fsync: bool = True):
+        self.path = path
+        self.fsync = fsync
+        self._pending: dict[str, tuple[str, pb.PBListOperation]] = {}
+        self._acked = 0
+        self._load()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def __contains__(self, operation_id):
+        return operation_id in self._pending
+
+    def append(self, path: str, operations: list[pb.PBListOperation]) -> None:
+        """
+        Durably record operations for the given update endpoint.
+
+        Args:
+            path: The API endpoint the operations are posted to
+            operations: The operations to record
+        """
+        records = []
+        for op in operations:
+            payload = _encode_path(path) + op.SerializeToString()
+            records.append(_HEADER.pack(_RECORD_OPERATION, len(payload)) + payload)
+        self._write(b"".join(records))
+        for op in operations:
+            self._pending[op.metadata.operationId] = (path, op)
+
+    def pending(self) -> list[tuple[str, pb.PBListOperation]]:
+        """Get the pending operations and their endpoints, oldest first."""
+        return list(self._pending.values())
+
+    def acknowledge(self, operation_ids) -> None:
+        """
+        Record that operations no longer need to be sent.
+
+        Args:
+            operation_ids: The IDs of the operations to drop from the log
+        """
+        records = []
+        for operation_id in operation_ids:
+            if self._pending.pop(operation_id, None) is None:
+                continue
+            payload = operation_id.encode()
+            records.append(_HEADER.pack(_RECORD_ACK, len(payload)) + payload)
+            self._acked += 1
+        if not records:
+            return
+        if not self._pending:
+            self.compact()
+        else:
+            self._write(b"".join(records))
+            if self._acked > max(1000, len(self._pending)):
+                self.compact()
+
+    def compact(self) -> None:
+        """Rewrite the log so it only contains the pending operations."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for path, op in self._pending.values():
+                    payload = _encode_path(path) + op.SerializeToString()
+                    f.write(_HEADER.pack(_RECORD_OPERATION, len(payload)) + payload)
+                f.flush()
+                if self.fsync:
+                    os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self._acked = 0
+
+    def _write(self, data: bytes) -> None:
+        with open(self.path, "ab") as f:
+            f.write(data)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+
+    def _load(self) -> None:
+        """Replay the log file, dropping a torn record at its end."""
+        try:
+            with open(self.path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return
+
+        offset = 0
+        while offset + _HEADER.size <= len(data):
+            kind, length = _HEADER.unpack_from(data, offset)
+            end = offset + _HEADER.size + length
+            if end > len(data):
+                break
+            payload = data[offset + _HEADER.size : end]
+            if kind == _RECORD_OPERATION:
+                path_length = payload[0]
+                path = payload[1 : 1 + path_length].decode()
+                op = pb.PBListOperation()
+                op.ParseFromString(payload[1 + path_length :])
+                self._pending[op.metadata.operationId] = (path, op)
+            elif kind == _RECORD_ACK:
+                self._pending.pop(payload.decode(), None)
+                self._acked += 1
+            offset = end
+
+        if offset != len(data):
+            logger.warning("Discarding incomplete record at the end of %s", self.path)
+            with open(self.path, "r+b") as f:
+                f.truncate(offset)
+
+
+def _encode_path(path: str) -> bytes:
+    encoded = path.encode()
+    return bytes([len(encoded)]) + encoded
@@ -0,0 +1,134 @@
+"""Selective decoding of AnyList user data responses."""
+
+from __future__ import annotations
+
+import typing
+
+from anylist import messages_pb2 as pb
+
+__all__ = [
+    "USER_DATA_SECTIONS",
+    "parse_user_data",
+    "user_data_section",
+]
+
+# Top-level PBUserDataResponse fields by name, e.g. "recipeDataResponse" -> 3
+USER_DATA_SECTIONS = {
+    field.name: field.number for field in pb.PBUserDataResponse.DESCRIPTOR.fields
+}
+
+_WIRE_VARINT = 0
+_WIRE_FIXED64 = 1
+_WIRE_LENGTH_DELIMITED = 2
+_WIRE_FIXED32 = 5
+
+
+def parse_user_data(
+    data: bytes, sections: typing.Iterable[str] | None = None
+) -> pb.PBUserDataResponse:
+    """
+    Parse a serialized ``PBUserDataResponse``, decoding only some sections.
+
+    The wire bytes of the other top-level fields are skipped without building
+    their messages, so e.g. recipes and the meal plan calendar cost nothing
+    when only ``shoppingListsResponse`` is needed.
+
+    Args:
+        data: The serialized response
+        sections: Names of the top-level fields to decode (all if None)
+
+    Returns:
+        The response, with only the requested sections set
+    """
+    user_data = pb.PBUserDataResponse()
+    if sections is None:
+        user_data.ParseFromString(data)
+        return user_data
+
+    try:
+        wanted = {USER_DATA_SECTIONS[name] for name in sections}
+    except KeyError as error:
+        raise ValueError(f"Unknown user data section: {error.args[0]}") from None
+
+    view = memoryview(data)
+    kept = [
+        view[start:end]
+        for number, start, _, end in _iter_fields(view)
+        if number in wanted
+    ]
+    user_data.ParseFromString(b"".join(kept))
+    return user_data
+
+
+def user_data_section(data: bytes, name: str) -> bytes | None:
+    """
+    Get the serialized message of one section of a user data response.
+
+    Args:
+        data: The serialized ``PBUserDataResponse``
+        name: The name of the top-level field, e.g. "recipeDataResponse"
+
+    Returns:
+        The section's bytes, or None if the response does not contain it
+    """
+    try:
+        number = USER_DATA_SECTIONS[name]
+    except KeyError:
+        raise ValueError(f"Unknown user data section: {name}") from None
+    parts = [
+        value for field, value in _iter_values(memoryview(data)) if field == number
+    ]
+    # Repeated occurrences of a message field are merged, like concatenation
+    return b"".join(parts) if parts else None
+
+
+def _iter_values(data: memoryview) -> typing.Iterator[tuple[int, memoryview]]:
+    """Yield (field number, value bytes) of each top-level field.
+
+    The value of a length-delimited field is its payload, without the length.
+    """
+    for number, _, value_start, end in _iter_fields(data):
+        yield number, data[value_start:end]
+
+
+def _iter_fields(data: memoryview) -> typing.Iterator[tuple[int, int, int, int]]:
+    """Yield (field number, start, value start, end) of each top-level field.
+
+    The field starts with its tag; its value starts after the tag and, for
+    length-delimited fields, the length.
+    """
+    offset = 0
+    size = len(data)
+    while offset < size:
+        start = offset
+        tag, offset = _read_varint(data, offset)
+        value_start = offset
+        wire_type = tag & 0x7
+        if wire_type == _WIRE_LENGTH_DELIMITED:
+            length, value_start = _read_varint(data, offset)
+            offset = value_start + length
+        elif wire_type == _WIRE_VARINT:
+            _, offset = _read_varint(data, offset)
+        elif wire_type == _WIRE_FIXED64:
+            offset += 8
+        elif wire_type == _WIRE_FIXED32:
+            offset += 4
+        else:
+            raise ValueError(f"Unsupported wire type {wire_type} at offset {start}")
+        if offset > size:
+            raise ValueError("Truncated user data response")
+        yield tag >> 3, start, value_start, offset
+
+
+def _read_varint(data: memoryview, offset: int) -> tuple[int, int]:
+    result = 0
+    shift = 0
+    while True:
+        if offset >= len(data):
+            raise ValueError("Truncated varint in user data response")
+        byte = data[offset]
+        offset += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, offset
+        shift += 7
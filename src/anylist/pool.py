@@ -0,0 +1,258 @@
+"""Running many AnyList accounts over shared connections."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import hashlib
+import logging
+import os
+import random
+import typing
+from collections import OrderedDict
+
+import aiohttp
+
+from anylist.client import AnyListClient
+from anylist.scheduler import RequestScheduler, TokenBucket
+from anylist.session import create_session
+
+__all__ = [
+    "AccountPool",
+]
+
+logger = logging.getLogger("anylist.pool")
+
+
+class AccountPool:
+    """
+    Manages one ``AnyListClient`` per account over shared resources.
+
+    All clients of the pool share one pooled HTTP session and one
+    ``RequestScheduler``, which caps the number of requests in flight across
+    every account. Logins and token refreshes go through a shared rate limit
+    so that thousands of accounts do not hit the token endpoints at once, and
+    each client refreshes its access token at a randomly staggered point
+    before it expires.
+
+    With a ``memory_budget``, the user data held by accounts that are not in
+    use is dropped, least recently used first, once the accounts together
+    hold more than the budget. An evicted account fetches (or, with a snapshot
+    store, loads) its data again the next time it is used.
+
+    Example:
+        async with AccountPool(max_concurrency=50) as pool:
+            pool.add("household-1", email, password)
+            async with pool.use("household-1") as client:
+                lists = await client.get_lists()
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession | None = None,
+        max_concurrency: int = 64,
+        logins_per_second: float = 10,
+        refresh_jitter: float = 300,
+        memory_budget: int | None = None,
+        credentials_dir: str | None = None,
+        **client_kwargs,
+    ):
+        """
+        Args:
+            session: The session to share (created and closed by the pool if
+                not given)
+            max_concurrency: Maximum number of requests in flight across all
+                accounts
+            logins_per_second: Rate of logins and token refreshes across all
+                accounts
+            refresh_jitter: Each client refreshes its access token up to this
+                many seconds earlier than it otherwise would, chosen randomly
+            memory_budget: Maximum total serialized size (bytes) of the user
+                data held by idle accounts (no limit if None)
+            credentials_dir: Directory for the credentials files of accounts
+                added without one
+            **client_kwargs: Passed through to every ``AnyListClient``
+        """
+        self.session = session
+        self._owns_session = session is None
+        self.scheduler = RequestScheduler(max_concurrency=max_concurrency)
+        self.auth_rate_limit = TokenBucket(logins_per_second)
+        self.refresh_jitter = refresh_jitter
+        self.memory_budget = memory_budget
+        self.credentials_dir = credentials_dir or os.path.expanduser("~/.anylist_pool")
+        self.client_kwargs = client_kwargs
+        # Least recently used first
+        self._clients: OrderedDict[str, AnyListClient] = OrderedDict()
+        self._sizes: dict[str, int] = {}
+        self._in_use: dict[str, int] = {}
+        self._entered: set[str] = set()
+        self._login_tasks: dict[str, asyncio.Task] = {}
+
+    async def __aenter__(self):
+        """Enter the async context manager, creating the shared session."""
+        if self._owns_session:
+            self.session = create_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        """Exit the async context manager, shutting down every client."""
+        for key in list(self._clients):
+            await self.remove(key)
+        if self._owns_session:
+            await self.session.close()
+
+    def __len__(self):
+        return len(self._clients)
+
+    def __contains__(self, key):
+        return key in self._clients
+
+    def __iter__(self) -> typing.Iterator[str]:
+        return iter(list(self._clients))
+
+    def __getitem__(self, key: str) -> AnyListClient:
+        return self._clients[key]
+
+    def add(
+        self, key: str, email: str, password: str, credentials_file=None, **kwargs
+    ) -> AnyListClient:
+        """
+        Add an account to the pool.
+
+        The client only logs in when the account is first used.
+
+        Args:
+            key: Identifies the account within the pool
+            email: The account's email
+            password: The account's password
+            credentials_file: Where to store the account's tokens (a file per
+                account in the pool's credentials directory if neither this
+                nor a ``credentials_store`` is given)
+            **kwargs: Passed to this ``AnyListClient`` only
+
+        Returns:
+            The account's client
+        """
+        if self.session is None:
+            raise RuntimeError("Enter the pool (async with) before adding accounts")
+        if key in self._clients:
+            raise ValueError(f"Account {key!r} is already in the pool")
+        store_given = "credentials_store" in {**self.client_kwargs, **kwargs}
+        if credentials_file is None and not store_given:
+            os.makedirs(self.credentials_dir, exist_ok=True)
+            digest = hashlib.sha256(key.encode()).hexdigest()
+            credentials_file = os.path.join(self.credentials_dir, digest)
+
+        client = AnyListClient(
+            email,
+            password,
+            credentials_file,
+            session=self.session,
+            scheduler=self.scheduler,
+            auth_rate_limit=self.auth_rate_limit,
+            **{**self.client_kwargs, **kwargs},
+        )
+        # Spread the refreshes of accounts that logged in together
+        client.TOKEN_REFRESH_MARGIN = AnyListClient.TOKEN_REFRESH_MARGIN + (
+            random.uniform(0, self.refresh_jitter)
+        )
+        self._clients[key] = client
+        return client
+
+    async def remove(self, key: str) -> None:
+        """Remove an account from the pool, stopping its background work."""
+        client = self._clients.pop(key)
+        self._sizes.pop(key, None)
+        self._in_use.pop(key, None)
+        task = self._login_tasks.pop(key, None)
+        if task is not None:
+            task.cancel()
+        if key in self._entered:
+            self._entered.discard(key)
+            await client.__aexit__(None, None, None)
+
+    @contextlib.asynccontextmanager
+    async def use(self, key: str) -> typing.AsyncIterator[AnyListClient]:
+        """
+        Use an account's client, logging it in first if needed.
+
+        The account's user data is not evicted while it is in use. Afterwards
+        its size is counted against the memory budget.
+
+        Args:
+            key: The account to use
+        """
+        client = self._clients[key]
+        self._clients.move_to_end(key)
+        self._in_use[key] = self._in_use.get(key, 0) + 1
+        try:
+            await self._ensure_ready(key, client)
+            yield client
+        finally:
+            if key in self._clients:
+                self._in_use[key] -= 1
+                if not self._in_use[key]:
+                    del self._in_use[key]
+                self._clients.move_to_end(key)
+                self._sizes[key] = (
+                    client.user_data.ByteSize() if client.user_data else 0
+                )
+                self._enforce_budget()
+
+    async def login_all(self) -> dict[str, BaseException | None]:
+        """
+        Log in every account that is not logged in yet.
+
+        Logins are paced by the pool's login rate.
+
+        Returns:
+            The error of each account that failed to log in (None on success)
+        """
+        keys = list(self._clients)
+        results = await asyncio.gather(
+            *(self._ensure_ready(key, self._clients[key]) for key in keys),
+            return_exceptions=True,
+        )
+        errors = {}
+        for key, result in zip(keys, results, strict=True):
+            if isinstance(result, BaseException):
+                logger.warning("Failed to log in account %s: %s", key, result)
+                errors[key] = result
+            else:
+                errors[key] = None
+        return errors
+
+    def memory_usage(self) -> int:
+        """Get the total serialized size (bytes) of the held user data."""
+        return sum(self._sizes.values())
+
+    def evict(self, key: str) -> None:
+        """Drop the user data an account holds."""
+        self._clients[key]._release_user_data()
+        self._sizes.pop(key, None)
+
+    async def _ensure_ready(self, key: str, client: AnyListClient) -> None:
+        """Enter and log in a client once, sharing the login between callers."""
+        if key not in self._entered:
+            self._entered.add(key)
+            await client.__aenter__()
+        if client.access_token:
+            return
+        task = self._login_tasks.get(key)
+        if task is None:
+            task = self._login_tasks[key] = asyncio.create_task(client.login())
+            task.add_done_callback(lambda _: self._login_tasks.pop(key, None))
+        await asyncio.shield(task)
+
+    def _enforce_budget(self) -> None:
+        if self.memory_budget is None:
+            return
+        usage = self.memory_usage()
+        for key in list(self._clients):
+            if usage <= self.memory_budget:
+                break
+            if key in self._in_use or not self._sizes.get(key):
+                continue
+            usage -= self._sizes[key]
+            logger.debug("Evicting user data of account %s", key)
+            self.evict(key)
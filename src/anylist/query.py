@@ -0,0 +1,282 @@
+"""Indexed queries over the list items of AnyList user data."""
+
+from __future__ import annotations
+
+import typing
+
+from google.protobuf.descriptor import FieldDescriptor
+
+from anylist import messages_pb2 as pb
+
+__all__ = [
+    "INDEXED_FIELDS",
+    "ItemIndex",
+]
+
+# ListItem fields with a secondary index (storeIds holds several values)
+INDEXED_FIELDS = ("listId", "categoryMatchId", "checked", "storeIds", "userId")
+
+_TRUE_VALUES = {"y", "yes", "true", "1"}
+
+# Smart condition operators -> test of an item's string value against the
+# condition's value (both casefolded)
+_STRING_OPERATORS: dict[str, typing.Callable[[str, str], bool]] = {
+    "is": lambda actual, value: actual == value,
+    "is-not": lambda actual, value: actual != value,
+    "contains": lambda actual, value: value in actual,
+    "does-not-contain": lambda actual, value: value not in actual,
+    "begins-with": lambda actual, value: actual.startswith(value),
+    "ends-with": lambda actual, value: actual.endswith(value),
+}
+
+
+class ItemIndex:
+    """
+    Secondary indexes over the items of all lists in a user data response.
+
+    Every item is identified by its position; each index maps a field value
+    to the set of positions of the items having it. A query intersects the
+    position sets of its criteria, smallest first, so its cost depends on
+    the number of matching items rather than on the number of items.
+
+    Example:
+        index = client.item_index
+        items = index.query(
+            checked=False, categoryMatchId="dairy", storeIds=store_id
+        )
+
+    The client keeps one for its current user data as ``client.item_index``.
+    """
+
+    def __init__(self, user_data: pb.PBUserDataResponse):
+        self.items: list[pb.ListItem] = []
+        self.stores: dict[str, pb.PBStore] = {}
+        self.store_filters: dict[str, pb.PBStoreFilter] = {}
+        self._indexes: dict[str, dict[typing.Any, set[int]]] = {
+            field: {} for field in INDEXED_FIELDS
+        }
+        # The indexes in INDEXED_FIELDS order
+        self._index_list = [self._indexes[field] for field in INDEXED_FIELDS]
+        self._positions: dict[str, int] = {}
+        self._values: list[tuple] = []
+
+        lists_response = user_data.shoppingListsResponse
+        for lst in lists_response.newLists:
+            for item in lst.items:
+                # Some responses leave listId unset on the items
+                self._add(item, item.listId or lst.identifier)
+        for response in lists_response.listResponses:
+            for store in response.stores:
+                self.stores[store.identifier] = store
+            for store_filter in response.storeFilters:
+                self.store_filters[store_filter.identifier] = store_filter
+
+    def __len__(self):
+        return len(self.items)
+
+    def _add(self, item: pb.ListItem, list_id: str) -> None:
+        position = len(self.items)
+        self.items.append(item)
+        self._positions[item.identifier] = position
+        self._values.append(())
+        self._index(position, list_id)
+
+    def _index(self, position: int, list_id: str) -> None:
+        item = self.items[position]
+        # Items without a store are indexed under None
+        store_ids = tuple(item.storeIds) or (None,)
+        values = (list_id, item.categoryMatchId, item.checked, store_ids, item.userId)
+        by_list, by_category, by_checked, by_store, by_user = self._index_list
+        by_list.setdefault(list_id, set()).add(position)
+        by_category.setdefault(values[1], set()).add(position)
+        by_checked.setdefault(values[2], set()).add(position)
+        for store_id in store_ids:
+            by_store.setdefault(store_id, set()).add(position)
+        by_user.setdefault(values[4], set()).add(position)
+        self._values[position] = values
+
+    def reindex(self, identifier: str) -> None:
+        """
+        Update the indexes after an item message was changed in place.
+
+        Args:
+            identifier: The identifier of the changed item
+        """
+        position = self._positions.get(identifier)
+        if position is None:
+            return
+        old_values = self._values[position]
+        for field, value in zip(INDEXED_FIELDS, old_values, strict=True):
+            index = self._indexes[field]
+            for key in value if field == "storeIds" else (value,):
+                positions = index.get(key)
+                if positions is not None:
+                    positions.discard(position)
+                    if not positions:
+                        del index[key]
+        self._index(position, old_values[0])
+
+    def positions(self, field: str, value) -> set[int]:
+        """
+        Get the positions of the items with a field value.
+
+        Args:
+            field: One of ``INDEXED_FIELDS``
+            value: The value, or a collection of values (any of them)
+
+        Returns:
+            The matching positions (do not modify)
+        """
+        if field not in self._indexes:
+            raise ValueError(f"Field {field!r} is not indexed")
+        index = self._indexes[field]
+        if isinstance(value, (list, tuple, set, frozenset)):
+            return set().union(*(index.get(v, ()) for v in value))
+        return index.get(value, set())
+
+    def query(self, **criteria) -> list[pb.ListItem]:
+        """
+        Find the items matching all criteria.
+
+        Args:
+            **criteria: Indexed field values, e.g. ``checked=False`` or
+                ``storeIds=["store-a", "store-b"]`` (any of the given values)
+
+        Returns:
+            The matching items in list and item order
+        """
+        if not criteria:
+            return list(self.items)
+        return self._materialize(
+            _intersect(
+                [self.positions(field, value) for field, value in criteria.items()]
+            )
+        )
+
+    def store_filter(
+        self, store_filter: pb.PBStoreFilter | str, **criteria
+    ) -> list[pb.ListItem]:
+        """
+        Find the items a store filter shows, optionally narrowed further.
+
+        Args:
+            store_filter: The filter, or its identifier
+            **criteria: Additional criteria as for ``query``
+
+        Returns:
+            The matching items in list and item order
+        """
+        if isinstance(store_filter, str):
+            store_filter = self.store_filters[store_filter]
+        sets = [self.positions("listId", store_filter.listId)]
+        if not store_filter.showsAllItems:
+            store_ids = set(store_filter.storeIds)
+            if store_filter.includesUnassignedItems:
+                store_ids.add(None)
+            sets.append(self.positions("storeIds", store_ids))
+        sets.extend(self.positions(field, value) for field, value in criteria.items())
+        return self._materialize(_intersect(sets))
+
+    def smart_filter(self, smart_filter: pb.PBSmartFilter) -> list[pb.ListItem]:
+        """
+        Find the items matching a smart filter's conditions.
+
+        Conditions name a ``ListItem`` field in ``fieldID`` and one of "is",
+        "is-not", "contains", "does-not-contain", "begins-with" or
+        "ends-with" in ``operatorID``. Values are compared case-insensitively
+        by every operator. Equality on indexed fields is answered from the
+        indexes; other conditions are tested against the items the indexed
+        conditions leave (or all items, if there are none).
+
+        Args:
+            smart_filter: The filter to evaluate
+
+        Returns:
+            The matching items in list and item order
+        """
+        conditions = list(smart_filter.conditions)
+        if not conditions:
+            return list(self.items)
+        match_all = smart_filter.requiresMatchingAllConditions
+
+        indexed, scanned = [], []
+        for condition in conditions:
+            if condition.operatorID not in _STRING_OPERATORS:
+                raise ValueError(f"Unsupported operator {condition.operatorID!r}")
+            field = pb.ListItem.DESCRIPTOR.fields_by_name.get(condition.fieldID)
+            if field is None:
+                raise ValueError(f"Unknown item field {condition.fieldID!r}")
+            if field.type == FieldDescriptor.TYPE_MESSAGE:
+                raise ValueError(f"Cannot filter on message field {field.name!r}")
+            if condition.fieldID in self._indexes and condition.operatorID == "is":
+                indexed.append(self._condition_positions(condition))
+            else:
+                scanned.append(condition)
+
+        if match_all:
+            if indexed:
+                candidates = _intersect(indexed)
+            else:
+                candidates = range(len(self.items))
+            matches = {
+                position
+                for position in candidates
+                if all(_test(self.items[position], c) for c in scanned)
+            }
+        else:
+            matches = set().union(*indexed)
+            if scanned:
+                matches.update(
+                    position
+                    for position, item in enumerate(self.items)
+                    if position not in matches and any(_test(item, c) for c in scanned)
+                )
+        return self._materialize(matches)
+
+    def _condition_positions(self, condition: pb.PBSmartCondition) -> set[int]:
+        """Get the positions of the items an indexed "is" condition matches."""
+        if condition.fieldID == "checked":
+            value = condition.value.strip().casefold() in _TRUE_VALUES
+            return self.positions("checked", value)
+        # Compare like _test: the index keys are the original values, so
+        # collect every key equal to the value when casefolded
+        value = condition.value.casefold()
+        keys = [
+            key
+            for key in self._indexes[condition.fieldID]
+            if key is not None and key.casefold() == value
+        ]
+        return self.positions(condition.fieldID, keys)
+
+    def _materialize(self, positions: typing.Iterable[int]) -> list[pb.ListItem]:
+        return [self.items[position] for position in sorted(positions)]
+
+
+def _intersect(sets: list[set[int]]) -> set[int]:
+    """Intersect position sets, starting from the smallest."""
+    sets = sorted(sets, key=len)
+    result = set(sets[0])
+    for other in sets[1:]:
+        if not result:
+            break
+        result.intersection_update(other)
+    return result
+
+
+def _test(item: pb.ListItem, condition: pb.PBSmartCondition) -> bool:
+    """Test an item against a smart condition by scanning its field."""
+    actual = getattr(item, condition.fieldID)
+    value = condition.value.casefold()
+    if isinstance(actual, bool):
+        actual = "y" if actual else "n"
+        value = "y" if value.strip() in _TRUE_VALUES else "n"
+    test = _STRING_OPERATORS[condition.operatorID]
+    if isinstance(actual, str):
+        return test(actual.casefold(), value)
+    if isinstance(actual, (int, float)):
+        return test(str(actual), value)
+    # Repeated fields match if any of their values does
+    values = [str(v).casefold() for v in actual]
+    if condition.operatorID in ("is-not", "does-not-contain"):
+        return all(test(v, value) for v in values)
+    return any(test(v, value) for v in values)
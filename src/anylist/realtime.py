@@ -0,0 +1,425 @@
+"""Real-time list change notifications for AnyList API."""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+import typing
+from dataclasses import dataclass, field
+
+import aiohttp
+
+from anylist import messages_pb2 as pb
+from anylist.sync import _delete_where, merge_user_data
+
+if typing.TYPE_CHECKING:
+    from anylist.client import AnyListClient
+
+__all__ = [
+    "ListChange",
+    "RealtimeSync",
+]
+
+logger = logging.getLogger("anylist.realtime")
+
+# Queued to end watch() iterators when the sync stops
+_STOPPED = object()
+
+
+@dataclass
+class ListChange:
+    """A change to a single shopping list received from the server."""
+
+    list_id: str
+    updated_items: list[pb.ListItem] = field(default_factory=list)
+    deleted_item_ids: list[str] = field(default_factory=list)
+    list_deleted: bool = False
+    logical_timestamp: int = 0
+    processed_operation_ids: list[str] = field(default_factory=list)
+
+
+class RealtimeSync:
+    """
+    Keeps a client's user data up to date over a persistent connection.
+
+    The server pushes notifications over a websocket. Text notifications
+    (``refresh-shopping-lists`` and friends) trigger an incremental user data
+    refresh, binary messages are decoded as ``PBWatchSyncResponse`` deltas and
+    applied directly. Either way the resulting per-list changes are delivered
+    to listeners and ``watch()`` iterators.
+
+    Example:
+        async with RealtimeSync(client) as sync:
+            async for change in sync.watch(shopping_list.identifier):
+                print(change.updated_items)
+    """
+
+    LISTENER_PATH = "data/add-user-listener"
+    HEARTBEAT_INTERVAL = 5
+    HEARTBEAT_MESSAGE = "--heartbeat--"
+
+    def __init__(
+        self,
+        client: "AnyListClient",
+        reconnect_delay: float = 1,
+        max_reconnect_delay: float = 60,
+    ):
+        self.client = client
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.logical_timestamp = 0
+        self._listeners: dict[str | None, list[typing.Callable]] = {}
+        self._queues: dict[str | None, list[asyncio.Queue]] = {}
+        self._task: asyncio.Task | None = None
+        self._connected = asyncio.Event()
+        # Item identifier -> list identifier, see _find_item_lists()
+        self._item_lists: dict[str, str] | None = None
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.stop()
+
+    async def start(self) -> None:
+        """Start listening for changes in the background."""
+        if self._task is None:
+            await self.client.get_user_data()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop listening and close the connection, ending watch() iterators."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self._connected.clear()
+        for queues in self._queues.values():
+            for queue in queues:
+                queue.put_nowait(_STOPPED)
+
+    async def wait_connected(self) -> None:
+        """Wait until the websocket connection is established."""
+        await self._connected.wait()
+
+    def add_listener(
+        self, callback: typing.Callable[[ListChange], typing.Any], list_id=None
+    ) -> typing.Callable[[], None]:
+        """
+        Call ``callback`` with every change (of one list, or of all lists).
+
+        The callback may be a plain function or a coroutine function.
+
+        Args:
+            callback: Called with each ListChange
+            list_id: Only report changes of this list
+
+        Returns:
+            A function that removes the listener again
+        """
+        self._listeners.setdefault(list_id, []).append(callback)
+        return lambda: self._listeners[list_id].remove(callback)
+
+    async def watch(self, list_id=None) -> typing.AsyncIterator[ListChange]:
+        """
+        Iterate over changes (of one list, or of all lists) as they arrive.
+
+        The iteration ends when the sync is stopped.
+
+        Args:
+            list_id: Only yield changes of this list
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        self._queues.setdefault(list_id, []).append(queue)
+        try:
+            while True:
+                change = await queue.get()
+                if change is _STOPPED:
+                    return
+                yield change
+        finally:
+            self._queues[list_id].remove(queue)
+
+    def apply(self, response: pb.PBWatchSyncResponse) -> list[ListChange]:
+        """
+        Apply a watch sync delta to the client's user data in place.
+
+        A full sync (``isFullSync``) replaces the held lists instead.
+
+        Args:
+            response: The delta to apply
+
+        Returns:
+            The resulting changes, one per affected list
+        """
+        user_data = self.client.user_data
+        if user_data is None:
+            return []
+        if response.isFullSync:
+            return self._apply_full_sync(user_data, response)
+        lists = user_data.shoppingListsResponse.newLists
+        positions = {lst.identifier: index for index, lst in enumerate(lists)}
+        changes: dict[str, ListChange] = {}
+
+        def change_for(list_id):
+            if list_id not in changes:
+                changes[list_id] = ListChange(
+                    list_id=list_id,
+                    logical_timestamp=response.logicalTimestamp,
+                    processed_operation_ids=list(response.processedOperationIds),
+                )
+            return changes[list_id]
+
+        item_lists = self._item_lists
+        for lst in response.shoppingLists:
+            if lst.identifier in positions:
+                lists[positions[lst.identifier]].CopyFrom(lst)
+            else:
+                positions[lst.identifier] = len(lists)
+                lists.append(lst)
+            change_for(lst.identifier).updated_items.extend(lst.items)
+            if item_lists is not None:
+                item_lists.update(
+                    (item.identifier, lst.identifier) for item in lst.items
+                )
+
+        items_by_list: dict[str, list[pb.ListItem]] = {}
+        for item in response.listItems:
+            if item.listId in positions:
+                items_by_list.setdefault(item.listId, []).append(item)
+        for list_id, items in items_by_list.items():
+            lst = lists[positions[list_id]]
+            existing = {item.identifier: item for item in lst.items}
+            for item in items:
+                if item.identifier in existing:
+                    existing[item.identifier].CopyFrom(item)
+                else:
+                    lst.items.append(item)
+                    if item_lists is not None:
+                        item_lists[item.identifier] = list_id
+            change_for(list_id).updated_items.extend(items)
+
+        if response.deletedListItemIds:
+            deleted_by_list: dict[str, set[str]] = {}
+            for item_id, list_id in self._find_item_lists(
+                lists, response.deletedListItemIds
+            ).items():
+                if list_id in positions:
+                    deleted_by_list.setdefault(list_id, set()).add(item_id)
+            # Only the lists holding deleted items are scanned
+            for list_id, deleted in deleted_by_list.items():
+                lst = lists[positions[list_id]]
+                removed = [
+                    item.identifier for item in lst.items if item.identifier in deleted
+                ]
+                if removed:
+                    _delete_where(lst.items, lambda item: item.identifier in deleted)
+                    change_for(list_id).deleted_item_ids.extend(removed)
+                for item_id in deleted:
+                    self._item_lists.pop(item_id, None)
+
+        if response.deletedShoppingListIds:
+            deleted = set(response.deletedShoppingListIds)
+            for list_id in deleted & positions.keys():
+                change_for(list_id).list_deleted = True
+            _delete_where(lists, lambda lst: lst.identifier in deleted)
+
+        if response.logicalTimestamp:
+            self.logical_timestamp = response.logicalTimestamp
+        self.client._forget_lists(changes)
+        return list(changes.values())
+
+    def _find_item_lists(self, lists, item_ids) -> dict[str, str]:
+        """
+        Find the lists holding items, using an index kept across deltas.
+
+        The index is built on first use and kept up to date by ``apply()``.
+        It is built again when an item is missing from it, e.g. one that was
+        added locally or by a refresh since.
+
+        Returns:
+            The list identifier of each item found
+        """
+        index = self._item_lists
+        if index is None or any(item_id not in index for item_id in item_ids):
+            index = self._item_lists = {
+                item.identifier: lst.identifier for lst in lists for item in lst.items
+            }
+        return {item_id: index[item_id] for item_id in item_ids if item_id in index}
+
+    def _apply_full_sync(
+        self, user_data: pb.PBUserDataResponse, response: pb.PBWatchSyncResponse
+    ) -> list[ListChange]:
+        """Replace the held lists with the complete state of a full sync."""
+        lists_response = user_data.shoppingListsResponse
+        synced = pb.ShoppingListsResponse(
+            newLists=response.shoppingLists, orderedIds=lists_response.orderedIds
+        )
+        lists = {lst.identifier: lst for lst in synced.newLists}
+        synced.listResponses.extend(
+            list_response
+            for list_response in lists_response.listResponses
+            if list_response.listId in lists
+        )
+        items_by_list: dict[str, list[pb.ListItem]] = {}
+        for item in response.listItems:
+            if item.listId in lists:
+                items_by_list.setdefault(item.listId, []).append(item)
+        for list_id, items in items_by_list.items():
+            lst = lists[list_id]
+            existing = {item.identifier: item for item in lst.items}
+            for item in items:
+                if item.identifier in existing:
+                    existing[item.identifier].CopyFrom(item)
+                else:
+                    lst.items.append(item)
+
+        changes = _diff_lists(lists_response, synced)
+        for change in changes:
+            change.logical_timestamp = response.logicalTimestamp
+            change.processed_operation_ids = list(response.processedOperationIds)
+        # Wrappers of every list point into the replaced messages
+        previous_ids = [lst.identifier for lst in lists_response.newLists]
+        lists_response.CopyFrom(synced)
+
+        if response.logicalTimestamp:
+            self.logical_timestamp = response.logicalTimestamp
+        self._item_lists = None
+        self.client._forget_lists(previous_ids)
+        return changes
+
+    async def _run(self) -> None:
+        delay = self.reconnect_delay
+        while True:
+            try:
+                await self._listen()
+                delay = self.reconnect_delay
+            except asyncio.CancelledError:
+                raise
+            except Exception as error:
+                logger.warning("Realtime connection failed: %s", error)
+            self._connected.clear()
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.max_reconnect_delay)
+            # Catch up on anything missed while disconnected
+            try:
+                await self._refresh()
+            except Exception as error:
+                logger.warning("Failed to refresh after reconnect: %s", error)
+
+    async def _listen(self) -> None:
+        client = self.client
+        if not client.access_token:
+            await client.login()
+        url = f"{client.BASE_URL}/{self.LISTENER_PATH}".replace("http", "ws", 1)
+        params = {
+            "client_id": client.client_id,
+            "access_token": client.access_token,
+        }
+        async with client.session.ws_connect(
+            url, params=params, headers=client._get_auth_headers()
+        ) as ws:
+            self._connected.set()
+            heartbeat = asyncio.create_task(self._heartbeat(ws))
+            try:
+                async for message in ws:
+                    if message.type == aiohttp.WSMsgType.TEXT:
+                        if message.data.startswith("refresh-"):
+                            await self._refresh()
+                    elif message.type == aiohttp.WSMsgType.BINARY:
+                        response = pb.PBWatchSyncResponse()
+                        response.ParseFromString(message.data)
+                        await self._dispatch(self.apply(response))
+                    elif message.type == aiohttp.WSMsgType.ERROR:
+                        raise ws.exception()
+            finally:
+                heartbeat.cancel()
+
+    async def _heartbeat(self, ws) -> None:
+        while True:
+            await asyncio.sleep(self.HEARTBEAT_INTERVAL)
+            await ws.send_str(self.HEARTBEAT_MESSAGE)
+
+    async def _refresh(self) -> None:
+        """Incrementally refresh user data and report what changed."""
+        client = self.client
+        self._item_lists = None
+        if client.user_data is None:
+            after = await client.get_user_data(refresh=True)
+            await self._dispatch(_diff_lists(None, after.shoppingListsResponse))
+            return
+        delta = await client._fetch_user_data_changes()
+        # The merge changes the held lists in place, so it keeps copies of
+        # the lists it replaces to compare against (and only of those)
+        replaced: dict[str, pb.ShoppingList | None] = {}
+        after = merge_user_data(client.user_data, delta, replaced_lists=replaced)
+        client._hold_user_data(after)
+        await self._dispatch(_diff_replaced(replaced, after.shoppingListsResponse))
+
+    async def _dispatch(self, changes: list[ListChange]) -> None:
+        for change in changes:
+            for key in (change.list_id, None):
+                for queue in self._queues.get(key, ()):
+                    queue.put_nowait(change)
+                for callback in list(self._listeners.get(key, ())):
+                    try:
+                        result = callback(change)
+                        if inspect.isawaitable(result):
+                            await result
+                    except Exception:
+                        logger.exception("Realtime listener failed")
+
+
+def _diff_lists(
+    before: pb.ShoppingListsResponse | None, after: pb.ShoppingListsResponse
+) -> list[ListChange]:
+    """Compute per-list item changes between two versions of the lists."""
+    old_lists = (
+        {lst.identifier: lst for lst in before.newLists} if before is not None else {}
+    )
+    changes = []
+    for lst in after.newLists:
+        change = _diff_list(old_lists.pop(lst.identifier, None), lst)
+        if change is not None:
+            changes.append(change)
+    changes.extend(ListChange(list_id, list_deleted=True) for list_id in old_lists)
+    return changes
+
+
+def _diff_replaced(
+    replaced: dict[str, pb.ShoppingList | None], after: pb.ShoppingListsResponse
+) -> list[ListChange]:
+    """Compute the changes of the lists a merge replaced (see merge_user_data)."""
+    if not replaced:
+        return []
+    changes = []
+    for lst in after.newLists:
+        if lst.identifier in replaced:
+            change = _diff_list(replaced.pop(lst.identifier), lst)
+            if change is not None:
+                changes.append(change)
+    # What is left was deleted
+    changes.extend(ListChange(list_id, list_deleted=True) for list_id in replaced)
+    return changes
+
+
+def _diff_list(old: pb.ShoppingList | None, lst: pb.ShoppingList) -> ListChange | None:
+    """Compute the item changes of a list (None if it did not change)."""
+    if old is None:
+        return ListChange(lst.identifier, updated_items=list(lst.items))
+    if old.timestamp == lst.timestamp and old.logicalClockTime == lst.logicalClockTime:
+        return None
+    old_items = {item.identifier: item for item in old.items}
+    change = ListChange(lst.identifier)
+    for item in lst.items:
+        if old_items.pop(item.identifier, None) != item:
+            change.updated_items.append(item)
+    change.deleted_item_ids.extend(old_items)
+    if change.updated_items or change.deleted_item_ids:
+        return change
+    return None
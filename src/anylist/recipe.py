@@ -0,0 +1,277 @@
+"""Recipe and RecipeBook classes for AnyList API."""
+
+from __future__ import annotations
+
+import typing
+
+from google.protobuf import descriptor_pb2, descriptor_pool, message_factory
+
+from anylist import messages_pb2 as pb
+from anylist.common import uuid
+
+if typing.TYPE_CHECKING:
+    from anylist.client import AnyListClient
+
+RECIPES_PATH = "data/user-recipe-data/update"
+
+
+def _recipe_headers_class():
+    """
+    Build a message type reading only the headers of ``PBRecipeDataResponse``.
+
+    It has the timestamp, recipeDataId and recipes of the response, with only
+    the identifier and name of each recipe. The other recipe fields are kept
+    as unknown fields, so a recipe header serializes back to the full recipe.
+    """
+    field = descriptor_pb2.FieldDescriptorProto
+    file = descriptor_pb2.FileDescriptorProto(
+        name="anylist/recipe_headers.proto", package="anylist.headers"
+    )
+    recipe = file.message_type.add(name="RecipeHeader")
+    recipe.field.add(
+        name="identifier", number=1, type=field.TYPE_STRING, label=field.LABEL_OPTIONAL
+    )
+    recipe.field.add(
+        name="name", number=3, type=field.TYPE_STRING, label=field.LABEL_OPTIONAL
+    )
+    data = file.message_type.add(name="RecipeDataHeaders")
+    data.field.add(
+        name="timestamp", number=1, type=field.TYPE_DOUBLE, label=field.LABEL_OPTIONAL
+    )
+    data.field.add(
+        name="recipes",
+        number=3,
+        type=field.TYPE_MESSAGE,
+        label=field.LABEL_REPEATED,
+        type_name=".anylist.headers.RecipeHeader",
+    )
+    data.field.add(
+        name="recipeDataId",
+        number=9,
+        type=field.TYPE_STRING,
+        label=field.LABEL_OPTIONAL,
+    )
+    pool = descriptor_pool.DescriptorPool()
+    pool.Add(file)
+    return message_factory.GetMessageClass(
+        pool.FindMessageTypeByName("anylist.headers.RecipeDataHeaders")
+    )
+
+
+_RecipeDataHeaders = _recipe_headers_class()
+
+
+class Recipe:
+    """
+    Represents an AnyList recipe.
+
+    The identifier and name are always available. Everything else (such as
+    ingredients and preparation steps) lives in ``message``, which is decoded
+    on first access when the recipe was loaded lazily.
+    """
+
+    __slots__ = ("client", "_pb", "_header")
+
+    def __init__(
+        self,
+        client: "AnyListClient",
+        recipe: pb.PBRecipe | None = None,
+        header=None,
+    ):
+        self.client = client
+        self._pb = recipe
+        # The undecoded recipe, see _recipe_headers_class
+        self._header = header
+
+    def __repr__(self):
+        return f"Recipe(id={self.identifier}, name={self.name})"
+
+    @property
+    def decoded(self) -> bool:
+        """Whether the recipe body has been decoded."""
+        return self._pb is not None
+
+    @property
+    def message(self) -> pb.PBRecipe:
+        """The full recipe message, decoded on first access."""
+        if self._pb is None:
+            self._pb = pb.PBRecipe.FromString(self._header.SerializeToString())
+            self._header = None
+        return self._pb
+
+    @property
+    def identifier(self) -> str:
+        return (self._pb or self._header).identifier
+
+    @property
+    def name(self) -> str:
+        return (self._pb or self._header).name
+
+    @name.setter
+    def name(self, value):
+        self.message.name = value
+
+    @property
+    def ingredients(self) -> list[pb.PBIngredient]:
+        return list(self.message.ingredients)
+
+    @property
+    def preparationSteps(self) -> list[str]:
+        return list(self.message.preparationSteps)
+
+    @property
+    def servings(self) -> str:
+        return self.message.servings
+
+    @property
+    def scaleFactor(self) -> float:
+        return self.message.scaleFactor
+
+    @property
+    def note(self) -> str:
+        return self.message.note
+
+
+class RecipeBook:
+    """
+    The recipes of an AnyList account, by identifier.
+
+    Get it with ``client.get_recipes()``. With ``AnyListClient(
+    lazy_recipes=True)`` only the identifier and name of each recipe are
+    decoded when the user data arrives; a recipe's body is decoded when it
+    is first used.
+    """
+
+    def __init__(
+        self,
+        client: "AnyListClient",
+        recipe_data_id: str = "",
+        timestamp: float = 0.0,
+    ):
+        self.client = client
+        self.recipe_data_id = recipe_data_id
+        self.timestamp = timestamp
+        self._recipes: dict[str, Recipe] = {}
+
+    @classmethod
+    def from_response(
+        cls, client: "AnyListClient", response: pb.PBRecipeDataResponse
+    ) -> RecipeBook:
+        """Build a book around already decoded recipe data."""
+        book = cls(client, response.recipeDataId, response.timestamp)
+        for recipe in response.recipes:
+            book._recipes[recipe.identifier] = Recipe(client, recipe=recipe)
+        return book
+
+    @classmethod
+    def from_bytes(cls, client: "AnyListClient", data: bytes) -> RecipeBook:
+        """Build a book from a serialized ``PBRecipeDataResponse``."""
+        headers = _RecipeDataHeaders.FromString(data)
+        book = cls(client, headers.recipeDataId, headers.timestamp)
+        for header in headers.recipes:
+            book._recipes[header.identifier] = Recipe(client, header=header)
+        return book
+
+    def __len__(self):
+        return len(self._recipes)
+
+    def __iter__(self) -> typing.Iterator[Recipe]:
+        return iter(list(self._recipes.values()))
+
+    def __contains__(self, identifier):
+        return identifier in self._recipes
+
+    def get(self, identifier: str) -> Recipe | None:
+        """Get a recipe by its identifier, without decoding other recipes."""
+        return self._recipes.get(identifier)
+
+    def find_by_name(self, name: str) -> Recipe | None:
+        """Find a recipe by name (case-insensitive) without decoding bodies."""
+        name = name.casefold()
+        for recipe in self._recipes.values():
+            if recipe.name.casefold() == name:
+                return recipe
+        return None
+
+    def create_recipe(
+        self,
+        name: str,
+        ingredients: typing.Iterable[str] = (),
+        preparation_steps: typing.Iterable[str] = (),
+        servings: str = "",
+    ) -> Recipe:
+        """
+        Create a new recipe. It is only sent by ``save_recipes``.
+
+        Args:
+            name: The recipe name
+            ingredients: Raw ingredient lines, e.g. "2 cups flour"
+            preparation_steps: The preparation steps
+            servings: The servings, e.g. "4"
+        """
+        recipe = pb.PBRecipe(
+            identifier=uuid(),
+            name=name,
+            ingredients=[
+                pb.PBIngredient(identifier=uuid(), rawIngredient=line, name=line)
+                for line in ingredients
+            ],
+            preparationSteps=list(preparation_steps),
+            servings=servings,
+            recipeDataId=self.recipe_data_id,
+        )
+        return Recipe(self.client, recipe=recipe)
+
+    async def save_recipes(self, recipes: typing.Iterable[Recipe]) -> None:
+        """
+        Create or update recipes in a single request.
+
+        Args:
+            recipes: The new or changed recipes
+        """
+        recipes = list(recipes)
+        operations = [
+            self._operation("save-recipe", recipe=recipe.message) for recipe in recipes
+        ]
+        if not operations:
+            return
+        await self.client._submit_operations(RECIPES_PATH, operations)
+        for recipe in recipes:
+            self._recipes[recipe.identifier] = recipe
+
+    async def remove_recipes(self, recipes: typing.Iterable[Recipe | str]) -> None:
+        """
+        Remove recipes in a single request.
+
+        Args:
+            recipes: The recipes, or their identifiers
+        """
+        identifiers = [
+            recipe if isinstance(recipe, str) else recipe.identifier
+            for recipe in recipes
+        ]
+        if not identifiers:
+            return
+        # The identifier is enough, so lazily loaded bodies stay undecoded
+        operations = [
+            self._operation("remove-recipe", recipe=pb.PBRecipe(identifier=identifier))
+            for identifier in identifiers
+        ]
+        await self.client._submit_operations(RECIPES_PATH, operations)
+        for identifier in identifiers:
+            self._recipes.pop(identifier, None)
+
+    def _operation(self, handler_id: str, **fields) -> pb.PBRecipeOperation:
+        return pb.PBRecipeOperation(
+            metadata=pb.PBOperationMetadata(
+                operationId=uuid(),
+                handlerId=handler_id,
+                userId=self.client.uid,
+            ),
+            recipeDataId=self.recipe_data_id,
+            **fields,
+        )
+
+    def _timestamp(self) -> pb.PBTimestamp:
+        """The timestamp of the recipe data, for incremental requests."""
+        return pb.PBTimestamp(identifier=self.recipe_data_id, timestamp=self.timestamp)
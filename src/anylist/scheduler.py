@@ -0,0 +1,152 @@
+"""Request scheduling (retries, backoff, rate limits) for AnyList API."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import time
+import typing
+from email.utils import parsedate_to_datetime
+
+import aiohttp
+
+__all__ = [
+    "RequestScheduler",
+    "TokenBucket",
+]
+
+logger = logging.getLogger("anylist.scheduler")
+
+T = typing.TypeVar("T")
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter.
+
+    Allows ``burst`` requests at once and ``rate`` requests per second on
+    average after that.
+    """
+
+    def __init__(self, rate: float, burst: int | None = None):
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a request may be sent."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class RequestScheduler:
+    """
+    Runs requests with a concurrency cap and retries transient failures.
+
+    Rate limited (429) and server error (5xx) responses as well as connection
+    failures are retried with jittered exponential backoff, honouring the
+    ``Retry-After`` header. Only requests marked idempotent are retried; list
+    operations qualify because each one carries a unique operation ID.
+
+    One scheduler can be shared by many clients to cap their combined
+    concurrency, while each client keeps its own rate limit.
+    """
+
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+    def __init__(
+        self,
+        max_concurrency: int | None = None,
+        max_retries: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 30,
+    ):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._semaphore = (
+            asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        )
+
+    async def run(
+        self,
+        send: typing.Callable[[], typing.Awaitable[T]],
+        idempotent: bool = True,
+        rate_limit: TokenBucket | None = None,
+        on_retry: typing.Callable[[int, float, BaseException], None] | None = None,
+    ) -> T:
+        """
+        Run a request, retrying it if it failed transiently.
+
+        Args:
+            send: Creates and awaits one attempt of the request
+            idempotent: Whether the request may safely be sent more than once
+            rate_limit: The rate limit to apply to every attempt
+            on_retry: Called with the attempt number, delay and error before
+                each retry
+
+        Returns:
+            The result of the successful attempt
+        """
+        attempt = 0
+        while True:
+            if rate_limit is not None:
+                await rate_limit.acquire()
+            try:
+                if self._semaphore is None:
+                    return await send()
+                async with self._semaphore:
+                    return await send()
+            except (
+                aiohttp.ClientResponseError,
+                aiohttp.ClientConnectionError,
+                asyncio.TimeoutError,
+            ) as error:
+                if not idempotent or attempt >= self.max_retries:
+                    raise
+                if isinstance(error, aiohttp.ClientResponseError):
+                    if error.status not in self.RETRY_STATUSES:
+                        raise
+                    delay = self.backoff(attempt, _retry_after(error))
+                else:
+                    delay = self.backoff(attempt)
+                attempt += 1
+                logger.info(
+                    "Request failed (%s), retry %d in %.2fs", error, attempt, delay
+                )
+                if on_retry is not None:
+                    on_retry(attempt, delay, error)
+                await asyncio.sleep(delay)
+
+    def backoff(self, attempt: int, retry_after: float | None = None) -> float:
+        """Get the delay before the next attempt."""
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2**attempt))
+
+
+def _retry_after(error: aiohttp.ClientResponseError) -> float | None:
+    """Parse the Retry-After header (seconds or HTTP date) of a response."""
+    value = error.headers.get("Retry-After") if error.headers else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,218 @@
+"""Prefix and fuzzy (trigram) search over item names."""
+
+from __future__ import annotations
+
+import bisect
+import heapq
+import typing
+from collections import Counter
+from dataclasses import dataclass
+
+from anylist import messages_pb2 as pb
+from anylist.common import normalize_name
+
+__all__ = [
+    "NameEntry",
+    "NameIndex",
+    "NameMatch",
+    "build_name_index",
+    "normalize_name",
+]
+
+# Minimum trigram similarity of names add_item(fuzzy=True) treats as the same
+FUZZY_THRESHOLD = 0.6
+
+
+def _trigrams(key: str) -> set[str]:
+    """Get the trigrams of a normalized name, padded to weigh its start."""
+    padded = f"  {key} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass
+class NameMatch:
+    """A name found by a search, with the values stored under it."""
+
+    name: str
+    score: float
+    values: list
+
+
+@dataclass
+class NameEntry:
+    """Where a name in a user data name index comes from."""
+
+    # "item", "starter", "recent", "favorite" or "categorized"
+    source: str
+    item: pb.ListItem
+    list_id: str
+
+
+class NameIndex:
+    """
+    Trigram and prefix index over names, each with any number of values.
+
+    Names are normalized with ``normalize_name``. Prefix lookups bisect a
+    sorted list of the names; fuzzy searches count the trigrams a name shares
+    with the query through per-trigram posting sets, so only names sharing at
+    least one trigram with the query are ever looked at.
+    """
+
+    def __init__(self):
+        self._values: dict[str, list] = {}
+        self._postings: dict[str, set[str]] = {}
+        self._sizes: dict[str, int] = {}
+        # Sorted names for prefix lookups, rebuilt after names changed
+        self._sorted: list[str] | None = []
+
+    def __len__(self):
+        return len(self._values)
+
+    def __contains__(self, name):
+        return normalize_name(name) in self._values
+
+    def add(self, name: str, value) -> None:
+        """Add a value under a name."""
+        key = normalize_name(name)
+        values = self._values.get(key)
+        if values is None:
+            values = self._values[key] = []
+            trigrams = _trigrams(key)
+            for trigram in trigrams:
+                self._postings.setdefault(trigram, set()).add(key)
+            self._sizes[key] = len(trigrams)
+            self._sorted = None
+        values.append(value)
+
+    def remove(self, name: str, value) -> None:
+        """Remove a value from under a name (and the name, if now unused)."""
+        key = normalize_name(name)
+        values = self._values.get(key)
+        if values is None or value not in values:
+            return
+        values.remove(value)
+        if values:
+            return
+        del self._values[key]
+        del self._sizes[key]
+        for trigram in _trigrams(key):
+            postings = self._postings[trigram]
+            postings.discard(key)
+            if not postings:
+                del self._postings[trigram]
+        self._sorted = None
+
+    def get(self, name: str) -> list:
+        """Get the values stored under exactly this name."""
+        return list(self._values.get(normalize_name(name), ()))
+
+    def prefix(self, prefix: str, limit: int = 10) -> list[NameMatch]:
+        """
+        Find names starting with a prefix, for autocompletion.
+
+        Args:
+            prefix: The typed prefix
+            limit: Maximum number of matches
+
+        Returns:
+            Up to ``limit`` matches in alphabetical order, scored by the share
+            of the name the prefix covers
+        """
+        if self._sorted is None:
+            self._sorted = sorted(self._values)
+        names = self._sorted
+        key = normalize_name(prefix)
+        matches = []
+        position = bisect.bisect_left(names, key)
+        while position < len(names) and len(matches) < limit:
+            name = names[position]
+            if not name.startswith(key):
+                break
+            position += 1
+            matches.append(
+                NameMatch(name, len(key) / len(name) if name else 1.0, self.get(name))
+            )
+        return matches
+
+    def search(
+        self, query: str, limit: int = 10, min_score: float = 0.3
+    ) -> list[NameMatch]:
+        """
+        Find the names most similar to a query.
+
+        Similarity is the Dice coefficient of the trigram sets of the query
+        and a name (1.0 for the same name). Ties favor names that start with
+        the query, then shorter names.
+
+        Args:
+            query: The name to look for
+            limit: Maximum number of matches
+            min_score: Minimum similarity of a match
+
+        Returns:
+            Up to ``limit`` matches, most similar first
+        """
+        key = normalize_name(query)
+        trigrams = _trigrams(key)
+        common = Counter()
+        for trigram in trigrams:
+            postings = self._postings.get(trigram)
+            if postings:
+                common.update(postings)
+
+        size = len(trigrams)
+        scored = []
+        for name, shared in common.items():
+            score = 2 * shared / (size + self._sizes[name])
+            if score >= min_score:
+                scored.append((score, name.startswith(key), -len(name), name))
+        best = heapq.nlargest(limit, scored)
+        return [NameMatch(name, score, self.get(name)) for score, _, _, name in best]
+
+
+def build_name_index(
+    user_data: pb.PBUserDataResponse,
+    sources: typing.Collection[str] | None = None,
+) -> NameIndex:
+    """
+    Build a name index over the item names of a user data response.
+
+    Every value is a ``NameEntry`` telling where the name comes from: list
+    items ("item"), starter lists ("starter"), recent and favorite items
+    ("recent", "favorite", from ``starterListsResponse``) and previously
+    categorized items ("categorized").
+
+    Args:
+        user_data: The user data, e.g. ``await client.get_user_data()``
+        sources: The sources to include (all if None)
+
+    Returns:
+        The index
+    """
+    index = NameIndex()
+
+    def wanted(source):
+        return sources is None or source in sources
+
+    if wanted("item"):
+        for lst in user_data.shoppingListsResponse.newLists:
+            for item in lst.items:
+                index.add(item.name, NameEntry("item", item, lst.identifier))
+
+    starter_lists = user_data.starterListsResponse
+    for source, batch in (
+        ("starter", starter_lists.userListsResponse),
+        ("recent", starter_lists.recentItemListsResponse),
+        ("favorite", starter_lists.favoriteItemListsResponse),
+    ):
+        if not wanted(source):
+            continue
+        for response in batch.listResponses:
+            starter_list = response.starterList
+            for item in starter_list.items:
+                index.add(item.name, NameEntry(source, item, starter_list.identifier))
+
+    if wanted("categorized"):
+        for item in user_data.categorizedItemsResponse.categorizedItems:
+            index.add(item.name, NameEntry("categorized", item, item.listId))
+    return index
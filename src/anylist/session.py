@@ -0,0 +1,44 @@
+"""Shared HTTP session helpers for AnyList API clients."""
+
+from __future__ import annotations
+
+import aiohttp
+
+__all__ = [
+    "create_session",
+]
+
+
+def create_session(
+    limit: int = 100,
+    limit_per_host: int = 0,
+    keepalive_timeout: float = 30,
+    ttl_dns_cache: int | None = 300,
+    **kwargs,
+) -> aiohttp.ClientSession:
+    """
+    Create a pooled session that can be shared by many clients.
+
+    Pass the result as ``AnyListClient(session=...)``. Clients never close a
+    session they were given, and authentication is sent per request, so one
+    session (and its connection pool) can serve any number of accounts.
+
+    Args:
+        limit: Maximum number of open connections in total (0 for no limit)
+        limit_per_host: Maximum number of open connections per host (0 for
+            no limit)
+        keepalive_timeout: Seconds to keep idle connections open for reuse
+        ttl_dns_cache: Seconds to cache DNS lookups (None to cache forever)
+        **kwargs: Passed through to ``aiohttp.ClientSession``
+
+    Returns:
+        The new session, which the caller is responsible for closing
+    """
+    connector = aiohttp.TCPConnector(
+        limit=limit,
+        limit_per_host=limit_per_host,
+        keepalive_timeout=keepalive_timeout,
+        ttl_dns_cache=ttl_dns_cache,
+        use_dns_cache=True,
+    )
+    return aiohttp.ClientSession(connector=connector, **kwargs)
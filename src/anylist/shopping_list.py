@@ -3,8 +3,11 @@
 import typing
 
 from anylist import messages_pb2 as pb
-from anylist.common import uuid
-from anylist.shopping_list_item import ShoppingListItem
+from anylist.common import normalize_name, uuid
+from anylist.ingredients import IngredientTotal, RecipeUse, aggregate_ingredients
+from anylist.recipe import Recipe
+from anylist.search import FUZZY_THRESHOLD, NameIndex
+from anylist.shopping_list_item import FIELD_BITS, ShoppingListItem, quantity_text
 
 if typing.TYPE_CHECKING:
     from anylist.client import AnyListClient
@@ -22,11 +25,32 @@ class ShoppingList:
         self.identifier = lst.identifier
         self.name = lst.name
         self.uid = lst.creator
-        self.items = [ShoppingListItem(client, item) for item in lst.items]
+        self._pb = lst
+        self._items: list[ShoppingListItem] | None = None
+        self._items_by_id: dict[str, ShoppingListItem] = {}
+        self._items_by_name: dict[str, list[ShoppingListItem]] = {}
+        # Built on the first fuzzy lookup, then kept up to date
+        self._name_index: NameIndex | None = None
 
     def __repr__(self):
         return f"List(id={self.identifier}, name={self.name})"
 
+    @property
+    def items(self) -> list[ShoppingListItem]:
+        """The items of the list, wrapped on first access."""
+        return self._load_items()
+
+    def _load_items(self) -> list[ShoppingListItem]:
+        """Build the item wrappers and indexes if not done yet."""
+        if self._items is None:
+            self._items = []
+            for pb_item in self._pb.items:
+                item = ShoppingListItem(self.client, pb_item)
+                self._items.append(item)
+                # Index straight from the protobuf so items stay undecoded
+                self._add_to_index(item, pb_item.identifier, pb_item.name)
+        return self._items
+
     async def find_item_by_name(self, name: str) -> typing.Optional[ShoppingListItem]:
         """
         Find an item in the list by name (case-insensitive).
@@ -37,30 +61,382 @@ class ShoppingList:
         Returns:
             The item if found, None otherwise
         """
-        return next(
-            filter(lambda item: item.name.lower() == name.lower(), self.items), None
-        )
+        self._load_items()
+        matches = self._items_by_name.get(name.casefold())
+        return matches[0] if matches else None
+
+    def search_items(
+        self, query: str, limit: int = 10, min_score: float = 0.3
+    ) -> list[ShoppingListItem]:
+        """
+        Find the items with names most similar to a query.
+
+        Args:
+            query: The (partial or misspelled) name to look for
+            limit: Maximum number of items
+            min_score: Minimum trigram similarity (0-1) of a matching name
+
+        Returns:
+            The matching items, most similar name first
+        """
+        matches = self._names().search(query, limit=limit, min_score=min_score)
+        return [item for match in matches for item in match.values][:limit]
+
+    def _names(self) -> NameIndex:
+        """Get the trigram index of item names, building it if needed."""
+        self._load_items()
+        if self._name_index is None:
+            self._name_index = NameIndex()
+            for name, items in self._items_by_name.items():
+                for item in items:
+                    self._name_index.add(name, item)
+        return self._name_index
+
+    def find_item_by_id(self, identifier: str) -> typing.Optional[ShoppingListItem]:
+        """
+        Find an item in the list by its identifier.
+
+        Args:
+            identifier: The identifier of the item to find
+
+        Returns:
+            The item if found, None otherwise
+        """
+        self._load_items()
+        return self._items_by_id.get(identifier)
+
+    def _append_item(self, item: ShoppingListItem, list_item: pb.ListItem) -> None:
+        """Add a newly saved item to the list's message, items and indexes."""
+        items = self._load_items()
+        self._pb.items.append(list_item)
+        # Share the list's copy of the message, like the items loaded from it
+        item._pb = self._pb.items[-1]
+        items.append(item)
+        self._index_item(item)
+        self.client._items_added_or_removed()
+
+    def _index_item(self, item: ShoppingListItem) -> None:
+        """Add an item to the lookup indexes."""
+        self._add_to_index(item, item.identifier, item.name)
+
+    def _add_to_index(self, item: ShoppingListItem, identifier: str, name: str):
+        item._list = self
+        self._items_by_id[identifier] = item
+        self._items_by_name.setdefault(name.casefold(), []).append(item)
+        if self._name_index is not None:
+            self._name_index.add(name, item)
 
-    async def add_item(self, item: ShoppingListItem):
+    def _unindex_item(self, item: ShoppingListItem) -> None:
+        """Remove an item from the lookup indexes."""
+        item._list = None
+        self._items_by_id.pop(item.identifier, None)
+        self._remove_name(item, item.name)
+
+    def _rename_item(self, item: ShoppingListItem, old_name: str) -> None:
+        """Move an item to its new name in the name index."""
+        self._remove_name(item, old_name)
+        self._items_by_name.setdefault(item.name.casefold(), []).append(item)
+        if self._name_index is not None:
+            self._name_index.add(item.name, item)
+
+    def _remove_name(self, item: ShoppingListItem, name: str) -> None:
+        key = name.casefold()
+        matches = self._items_by_name.get(key, [])
+        if item in matches:
+            matches.remove(item)
+        if not matches:
+            self._items_by_name.pop(key, None)
+        if self._name_index is not None:
+            self._name_index.remove(name, item)
+
+    async def add_item(self, item: ShoppingListItem, fuzzy: bool = False):
         """
         Add an item to the list.
 
         If an item with the same name already exists and is checked,
-        it will be unchecked instead of adding a new item.
+        it will be unchecked instead of adding a new item. The category of
+        a new item is assigned locally unless it was set explicitly.
 
         Args:
             item: The item to add to the list
+            fuzzy: Also treat an item with a similar name (e.g. "tomato" for
+                "tomatoes") as already existing
+        """
+        await self.add_items([item], fuzzy=fuzzy)
+
+    async def add_items(
+        self, items: typing.Iterable[ShoppingListItem | str], fuzzy: bool = False
+    ) -> list[ShoppingListItem]:
+        """
+        Add several items to the list in a single request.
+
+        Like ``add_item``, an item whose name is already on the list is not
+        added again; the existing item is unchecked instead if needed. Names
+        repeated within ``items`` are added once. New items without an
+        explicitly set category are categorized by ``client.categorizer``
+        (unless the client's ``auto_categorize`` is off).
+
+        Args:
+            items: The items (or names of new items) to add
+            fuzzy: Also treat items with similar names (by trigram similarity
+                of at least ``search.FUZZY_THRESHOLD``) as already existing
+
+        Returns:
+            The list's item for each of the given items
+        """
+        operations = []
+        added: dict[str, ShoppingListItem] = {}
+        # Item identifier -> the message sent for the new item
+        sent: dict[str, pb.ListItem] = {}
+        unchecked = []
+        results = []
+
+        for item in items:
+            if isinstance(item, str):
+                name, item = item, self.client.create_item()
+                item.name = name
+            key = item.name.casefold()
+
+            existing = added.get(key) or await self.find_item_by_name(item.name)
+            if existing is None and fuzzy:
+                existing = self._find_similar_item(item.name)
+            if existing:
+                if existing.checked:
+                    existing.checked = False
+                    operations.extend(existing._save_operations())
+                    unchecked.append(existing)
+                results.append(existing)
+                continue
+
+            item.listId = self.identifier
+            item.userId = self.uid
+            operations.append(self._add_operation(item))
+            sent[item.identifier] = operations[-1].listItem
+            if self.client.auto_categorize and not item._dirty & FIELD_BITS["category"]:
+                self._categorize(item, operations[-1].listItem)
+            added[key] = item
+            results.append(item)
+
+        if operations:
+            await self.client._submit_operations(
+                "data/shopping-lists/update", operations
+            )
+
+        for item in unchecked:
+            item._mark_saved()
+        for item in added.values():
+            item._mark_saved()
+            self._append_item(item, sent[item.identifier])
+        return results
+
+    async def add_recipes(
+        self,
+        recipes: typing.Iterable[Recipe | pb.PBRecipe | RecipeUse],
+        fuzzy: bool = False,
+    ) -> list[ShoppingListItem]:
+        """
+        Add the ingredients of several recipes to the list in a single request.
+
+        To shop for a week of the meal plan:
+            recipes = await client.get_recipes()
+            week = meal_plan.events_between("2026-10-19", "2026-10-25")
+            await lst.add_recipes(recipe_uses(week, recipes))
+
+        Args:
+            recipes: The recipes, or scaled recipe uses (see ``recipe_uses``)
+            fuzzy: Also treat items with similar names as the same ingredient
+
+        Returns:
+            The list's item for each ingredient
+        """
+        return await self.add_ingredients(
+            aggregate_ingredients(recipes).values(), fuzzy=fuzzy
+        )
+
+    async def add_ingredients(
+        self, totals: typing.Iterable[IngredientTotal], fuzzy: bool = False
+    ) -> list[ShoppingListItem]:
+        """
+        Merge ingredient totals into the list in a single request.
+
+        An ingredient already on the list gets the total added to its
+        quantity (or, if it was checked, is unchecked with the total as its
+        quantity). Other ingredients become new items carrying their
+        quantity, recipe and ingredients.
+
+        Args:
+            totals: The totals, e.g. from ``aggregate_ingredients``
+            fuzzy: Also treat items with similar names as the same ingredient
+
+        Returns:
+            The list's item for each total
+        """
+        # Totals named alike (e.g. "Onion" and "onion ") become one item
+        merged: dict[str, IngredientTotal] = {}
+        for total in totals:
+            key = normalize_name(total.name)
+            merged.setdefault(key, IngredientTotal(total.name.strip())).update(total)
+
+        operations = []
+        added = []
+        sent: dict[str, pb.ListItem] = {}
+        changed: dict[str, ShoppingListItem] = {}
+        results = []
+
+        for total in merged.values():
+            existing = await self.find_item_by_name(total.name)
+            if existing is None and fuzzy:
+                existing = self._find_similar_item(total.name)
+            if existing is not None:
+                if existing.checked:
+                    existing.checked = False
+                    existing.quantity = total.quantity_text
+                else:
+                    existing.quantity = total.combined_quantity(existing.quantity)
+                changed[existing.identifier] = existing
+                results.append(existing)
+                continue
+
+            quantity = total.quantity
+            item = self.client.create_item()
+            item.name = total.name
+            item.quantity = quantity_text(quantity)
+            item.listId = self.identifier
+            item.userId = self.uid
+            operations.append(self._add_operation(item))
+            list_item = operations[-1].listItem
+            sent[item.identifier] = list_item
+            list_item.quantityPb.CopyFrom(quantity)
+            list_item.ingredients.extend(total.sources)
+            recipe_ids = total.recipe_ids
+            if len(recipe_ids) == 1:
+                list_item.recipeId = recipe_ids[0]
+            if len(total.sources) == 1:
+                list_item.rawIngredient = total.sources[0].ingredient.rawIngredient
+            if self.client.auto_categorize:
+                self._categorize(item, list_item)
+            added.append(item)
+            results.append(item)
+
+        for item in changed.values():
+            operations.extend(item._save_operations())
+        if operations:
+            await self.client._submit_operations(
+                "data/shopping-lists/update", operations
+            )
+
+        for item in changed.values():
+            item._mark_saved()
+        for item in added:
+            item._mark_saved()
+            self._append_item(item, sent[item.identifier])
+        return results
+
+    async def update_items(self, items: typing.Iterable[ShoppingListItem]) -> None:
+        """
+        Save the local changes of several items in a single request.
+
+        Args:
+            items: Items of this list with unsaved changes
+        """
+        items = list(items)
+        operations = []
+        for item in items:
+            operations.extend(item._save_operations())
+
+        if operations:
+            await self.client._submit_operations(
+                "data/shopping-lists/update", operations
+            )
+
+        for item in items:
+            item._mark_saved()
+
+    async def remove_item(self, item: ShoppingListItem | str) -> None:
+        """
+        Remove an item from the list.
+
+        Args:
+            item: The item to remove, or the name of the items to remove
+        """
+        await self.remove_items([item])
+
+    async def remove_items(
+        self, items: typing.Iterable[ShoppingListItem | str]
+    ) -> list[ShoppingListItem]:
+        """
+        Remove several items from the list in a single request.
+
+        Names match every item with that name (case-insensitive). Items that
+        are not on the list are ignored.
+
+        Args:
+            items: The items, or names of the items, to remove
+
+        Returns:
+            The removed items
         """
-        if existing := await self.find_item_by_name(item.name):
-            if existing.checked:
-                existing.checked = False
-                await existing.save()
-            return
+        self._load_items()
+        removed: dict[str, ShoppingListItem] = {}
+        for item in items:
+            if isinstance(item, str):
+                matches = self._items_by_name.get(item.casefold(), [])
+            else:
+                matches = [item] if item.identifier in self._items_by_id else []
+            for match in matches:
+                removed[match.identifier] = match
+
+        if not removed:
+            return []
+
+        operations = [
+            pb.PBListOperation(
+                listId=self.identifier,
+                listItemId=item.identifier,
+                listItem=item.encode(),
+                metadata=pb.PBOperationMetadata(
+                    operationId=uuid(),
+                    handlerId="remove-shopping-list-item",
+                    userId=item.userId,
+                ),
+            )
+            for item in removed.values()
+        ]
+        await self.client._submit_operations("data/shopping-lists/update", operations)
+
+        for item in removed.values():
+            self._unindex_item(item)
+        self._items[:] = [
+            item for item in self._items if item.identifier not in removed
+        ]
+        positions = [
+            index
+            for index, pb_item in enumerate(self._pb.items)
+            if pb_item.identifier in removed
+        ]
+        for index in reversed(positions):
+            del self._pb.items[index]
+        self.client._items_added_or_removed()
+        return list(removed.values())
 
-        item.listId = self.identifier
-        item.userId = self.uid
+    def _find_similar_item(self, name: str) -> ShoppingListItem | None:
+        """Get the item with the most similar name, if similar enough."""
+        matches = self._names().search(name, limit=1, min_score=FUZZY_THRESHOLD)
+        return matches[0].values[0] if matches else None
 
-        op = pb.PBListOperation(
+    def _categorize(self, item: ShoppingListItem, list_item: pb.ListItem) -> None:
+        """Assign a new item's category and list category by its name."""
+        categorizer = self.client.categorizer
+        if category := categorizer.categorize(item.name, self.identifier):
+            item.category = category
+            list_item.categoryMatchId = category
+        assignment = categorizer.category_assignment(item.name, self.identifier)
+        if assignment is not None:
+            list_item.categoryAssignments.append(assignment)
+
+    def _add_operation(self, item: ShoppingListItem) -> pb.PBListOperation:
+        """Build the operation adding a new item to the list."""
+        return pb.PBListOperation(
             listId=self.identifier,
             listItemId=item.identifier,
             listItem=item.encode(),
@@ -70,16 +446,3 @@ class ShoppingList:
                 userId=item.userId,
             ),
         )
-
-        ops = pb.PBListOperationList(
-            operations=[op],
-        )
-
-        await self.client._request_protobuf(
-            method="POST",
-            path="data/shopping-lists/update",
-            data={"operations": ops.SerializeToString()},
-            as_form=True,
-            auth_required=True,
-        )
-        self.items.append(item)
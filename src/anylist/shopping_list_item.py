@@ -7,6 +7,7 @@ from anylist.common import uuid
 
 if typing.TYPE_CHECKING:
     from anylist.client import AnyListClient
+    from anylist.shopping_list import ShoppingList
 
 
 # Operation mapping for item fields to API handlers
@@ -19,6 +20,24 @@ OP_MAPPING = {
     "manualSortIndex": "set-list-item-sort-order",
 }
 
+# Bit used to mark each updatable field as changed
+FIELD_BITS = {field: 1 << index for index, field in enumerate(OP_MAPPING)}
+
+# ListItem fields holding the server value of each updatable field
+# (quantity lives in quantityPb, see quantity_text)
+PB_FIELDS = {
+    "name": "name",
+    "details": "details",
+    "checked": "checked",
+    "category": "categoryMatchId",
+    "manualSortIndex": "manualSortIndex",
+}
+
+
+def quantity_text(quantity: pb.PBItemQuantity) -> str:
+    """Get an item quantity as text, e.g. "2 cup" for amount "2" and unit "cup"."""
+    return " ".join(part for part in (quantity.amount, quantity.unit) if part)
+
 
 class ShoppingListItem:
     """
@@ -27,21 +46,51 @@ class ShoppingListItem:
     Provides methods to interact with items and their properties.
     """
 
+    __slots__ = (
+        "client",
+        "_pb",
+        "_decoded",
+        "_dirty",
+        "_list",
+        "_listId",
+        "_identifier",
+        "_name",
+        "_details",
+        "_quantity",
+        "_checked",
+        "_category",
+        "_userId",
+        "_manualSortIndex",
+    )
+
     def __init__(self, client: "AnyListClient", item: pb.ListItem | None):
         self.client = client
+        self._pb = item
+        self._decoded = False
+        self._dirty = 0
+        self._list: "ShoppingList | None" = None
+        if item is None:
+            self._decode()
+
+    def _decode(self) -> None:
+        """Copy the item fields out of the protobuf message on first access."""
+        if self._decoded:
+            return
+        item = self._pb
         self._listId = item.listId if item else None
         self._identifier = item.identifier if item else uuid()
         self._name = item.name if item else ""
         self._details = item.details if item else ""
-        self._quantity = item.quantityPb.amount if item else "1"
+        self._quantity = quantity_text(item.quantityPb) if item else "1"
         self._checked = item.checked if item else False
         self._category = item.categoryMatchId if item else "other"
-        self._userId = item.userId if item else client.uid
+        self._userId = item.userId if item else self.client.uid
         self._manualSortIndex = getattr(item, "manualSortIndex", None)
-        self._fields_to_update = []
+        self._decoded = True
 
     @property
     def identifier(self) -> str:
+        self._decode()
         return self._identifier
 
     @identifier.setter
@@ -50,88 +99,107 @@ class ShoppingListItem:
 
     @property
     def listId(self) -> str:
+        self._decode()
         return self._listId
 
     @listId.setter
     def listId(self, value):
+        self._decode()
         if self._listId is None:
             self._listId = value
-            self._fields_to_update.append("listId")
         else:
             raise ValueError("You cannot move items between lists.")
 
     @property
     def name(self) -> str:
+        self._decode()
         return self._name
 
     @name.setter
     def name(self, value):
+        self._decode()
+        old_name = self._name
         self._name = value
-        self._fields_to_update.append("name")
+        self._dirty |= FIELD_BITS["name"]
+        if self._list is not None:
+            self._list._rename_item(self, old_name)
 
     @property
     def quantity(self) -> str:
+        self._decode()
         return self._quantity
 
     @quantity.setter
     def quantity(self, value):
+        self._decode()
         if isinstance(value, (int, float)):
             value = str(value)
         self._quantity = value
-        self._fields_to_update.append("quantity")
+        self._dirty |= FIELD_BITS["quantity"]
 
     @property
     def details(self) -> str:
+        self._decode()
         return self._details
 
     @details.setter
     def details(self, value):
+        self._decode()
         self._details = value
-        self._fields_to_update.append("details")
+        self._dirty |= FIELD_BITS["details"]
 
     @property
     def checked(self) -> bool:
+        self._decode()
         return self._checked
 
     @checked.setter
     def checked(self, value):
+        self._decode()
         if not isinstance(value, bool):
             raise TypeError("Checked must be a boolean.")
         self._checked = value
-        self._fields_to_update.append("checked")
+        self._dirty |= FIELD_BITS["checked"]
 
     @property
     def userId(self) -> str:
+        self._decode()
         return self._userId
 
     @userId.setter
     def userId(self, value):
+        self._decode()
         if self._userId:
             raise ValueError("Cannot set user ID of an item after creation.")
         self._userId = value
 
     @property
     def category(self) -> str:
+        self._decode()
         return self._category
 
     @category.setter
     def category(self, value):
+        self._decode()
         self._category = value
-        self._fields_to_update.append("category")
+        self._dirty |= FIELD_BITS["category"]
 
     @property
     def manualSortIndex(self):
+        self._decode()
         return self._manualSortIndex
 
     @manualSortIndex.setter
     def manualSortIndex(self, value):
+        self._decode()
         if not isinstance(value, (int, float)):
             raise TypeError("Sort index must be a number.")
         self._manualSortIndex = value
-        self._fields_to_update.append("manualSortIndex")
+        self._dirty |= FIELD_BITS["manualSortIndex"]
 
     def encode(self) -> pb.ListItem:
         """Encode the item to a protobuf message."""
+        self._decode()
         return pb.ListItem(
             identifier=self._identifier,
             listId=self._listId,
@@ -144,27 +212,74 @@ class ShoppingListItem:
             manualSortIndex=self._manualSortIndex,
         )
 
+    def _server_value(self, field: str):
+        """Get a field's value as last known to the server (None if unknown)."""
+        if self._pb is None:
+            return None
+        if field == "quantity":
+            return quantity_text(self._pb.quantityPb)
+        return getattr(self._pb, PB_FIELDS[field])
+
+    def _mark_saved(self) -> None:
+        """Record the local values as the server's, clearing changed fields."""
+        if self._pb is None:
+            self._pb = self.encode()
+        else:
+            server_name = self._pb.name
+            for field in OP_MAPPING:
+                if not self._dirty & FIELD_BITS[field]:
+                    continue
+                value = getattr(self, field)
+                if field == "quantity":
+                    # The text replaces any structured amount and unit
+                    self._pb.quantityPb.CopyFrom(pb.PBItemQuantity(amount=value))
+                elif field == "manualSortIndex":
+                    self._pb.manualSortIndex = int(value)
+                else:
+                    setattr(self._pb, PB_FIELDS[field], value)
+                if field == "category" and value:
+                    # Put new items of the same name in this category too
+                    self.client.categorizer.remember(self.name, value)
+            if self._dirty:
+                self.client._item_changed(self._pb, server_name)
+        self._dirty = 0
+
     async def save(self, is_favorite: bool = False) -> None:
         """
         Save local changes to item to AnyList's API.
 
+        Only fields whose value differs from the server's are sent, each with
+        the server's value as ``originalValue``. Nothing is sent when every
+        changed field was set back to its original value.
+
         Args:
             is_favorite: Must set to True if editing "favorites" list
         """
+        operations = self._save_operations()
+
+        if operations:
+            path = (
+                "data/starter-lists/update"
+                if is_favorite
+                else "data/shopping-lists/update"
+            )
+            await self.client._submit_operations(path, operations)
+
+        # The server now has the local values
+        self._mark_saved()
+
+    def _save_operations(self) -> list[pb.PBListOperation]:
+        """Build the operations sending the net changes of the item."""
         operations = []
 
-        for field in self._fields_to_update:
-            if field not in OP_MAPPING:
+        for field, handler_id in OP_MAPPING.items():
+            if not self._dirty & FIELD_BITS[field]:
                 continue
 
             value = getattr(self, field)
-            handler_id = OP_MAPPING[field]
-
-            # Convert boolean to y/n for API
-            if isinstance(value, bool):
-                updated_value = "y" if value else "n"
-            else:
-                updated_value = str(value)
+            original = self._server_value(field)
+            if value == original:
+                continue
 
             op = pb.PBListOperation(
                 listId=self._listId,
@@ -174,29 +289,19 @@ class ShoppingListItem:
                     handlerId=handler_id,
                     userId=self._userId,
                 ),
-                updatedValue=updated_value,
+                updatedValue=_wire_value(value),
             )
+            if original is not None:
+                op.originalValue = _wire_value(original)
 
             operations.append(op)
 
-        if not operations:
-            return
-
-        ops = pb.PBListOperationList(
-            operations=operations,
-        )
+        return operations
 
-        path = (
-            "data/starter-lists/update" if is_favorite else "data/shopping-lists/update"
-        )
-
-        await self.client._request_protobuf(
-            method="POST",
-            path=path,
-            data={"operations": ops.SerializeToString()},
-            as_form=True,
-            auth_required=True,
-        )
 
-        # Clear the fields to update after saving
-        self._fields_to_update = []
+def _wire_value(value) -> str:
+    """Convert a field value to its string form in list operations."""
+    # Booleans are sent as y/n
+    if isinstance(value, bool):
+        return "y" if value else "n"
+    return str(value)
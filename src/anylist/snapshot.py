@@ -0,0 +1,90 @@
+"""On-disk snapshots of AnyList user data for fast cold starts."""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import mmap
+import os
+import tempfile
+
+from anylist import messages_pb2 as pb
+
+__all__ = [
+    "SnapshotStore",
+]
+
+logger = logging.getLogger("anylist.snapshot")
+
+
+class SnapshotStore:
+    """
+    Stores the last fetched ``PBUserDataResponse`` of each user on disk.
+
+    Pass an instance to ``AnyListClient(snapshot_store=...)`` to have the
+    client answer from the last known state right away and revalidate it
+    against the server in the background. The snapshot timestamps needed for
+    that revalidation are taken from the stored response itself.
+    """
+
+    def __init__(self, directory: str | None = None):
+        self.directory = directory or os.path.expanduser("~/.anylist_snapshots")
+
+    def path(self, key: str) -> str:
+        """Get the snapshot file path for a user (usually their email)."""
+        digest = hashlib.sha256(key.strip().lower().encode()).hexdigest()
+        return os.path.join(self.directory, f"{digest}.pb")
+
+    def load(self, key: str) -> pb.PBUserDataResponse | None:
+        """
+        Load the snapshot of a user, memory-mapping the file while parsing.
+
+        Args:
+            key: The user the snapshot belongs to
+
+        Returns:
+            The stored user data, or None if there is no usable snapshot
+        """
+        path = self.path(key)
+        try:
+            with open(path, "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return None
+                with (
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data,
+                    memoryview(data) as view,
+                ):
+                    user_data = pb.PBUserDataResponse()
+                    user_data.ParseFromString(view)
+                    return user_data
+        except FileNotFoundError:
+            return None
+        except Exception as error:
+            logger.warning("Failed to load snapshot %s: %s", path, error)
+            return None
+
+    def save(self, key: str, user_data: pb.PBUserDataResponse) -> None:
+        """
+        Atomically replace the snapshot of a user.
+
+        Args:
+            key: The user the snapshot belongs to
+            user_data: The user data to store
+        """
+        path = self.path(key)
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(user_data.SerializeToString())
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def delete(self, key: str) -> None:
+        """Remove the snapshot of a user, if any."""
+        try:
+            os.unlink(self.path(key))
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,361 @@
+"""Incremental user-data sync helpers for AnyList API.
+
+The ``data/user-data/get`` endpoint accepts the timestamps of the data the
+client already holds and only returns the sections and lists that changed
+since then. These helpers build that request from a previously fetched
+``PBUserDataResponse`` and fold the (partial) response back into it.
+"""
+
+from __future__ import annotations
+
+import typing
+
+from anylist import messages_pb2 as pb
+
+__all__ = [
+    "build_client_timestamps",
+    "merge_sections",
+    "merge_user_data",
+]
+
+
+def build_client_timestamps(
+    user_data: pb.PBUserDataResponse,
+) -> pb.PBUserDataClientTimestamps:
+    """
+    Build the client timestamps describing the state held in ``user_data``.
+
+    Sections which are not present in ``user_data`` are left unset so the
+    server sends them in full.
+
+    Args:
+        user_data: The locally held user data
+
+    Returns:
+        The timestamps to send along with a user data request
+    """
+    timestamps = pb.PBUserDataClientTimestamps()
+
+    if user_data.HasField("shoppingListsResponse"):
+        lists_response = user_data.shoppingListsResponse
+        logical_timestamps = {
+            response.listId: response.logicalTimestamp
+            for response in lists_response.listResponses
+        }
+        for lst in lists_response.newLists:
+            timestamps.shoppingListTimestamps.timestamps.add(
+                identifier=lst.identifier,
+                timestamp=lst.timestamp,
+            )
+            timestamps.shoppingListLogicalTimestamps.timestamps.add(
+                identifier=lst.identifier,
+                logicalTimestamp=logical_timestamps.get(
+                    lst.identifier, lst.logicalClockTime
+                ),
+            )
+
+    if user_data.HasField("recipeDataResponse"):
+        recipes = user_data.recipeDataResponse
+        timestamps.userRecipeDataTimestamp.CopyFrom(
+            pb.PBTimestamp(identifier=recipes.recipeDataId, timestamp=recipes.timestamp)
+        )
+
+    if user_data.HasField("mealPlanningCalendarResponse"):
+        calendar = user_data.mealPlanningCalendarResponse
+        timestamps.mealPlanningCalendarTimestamp.CopyFrom(
+            pb.PBLogicalTimestamp(
+                identifier=calendar.calendarId,
+                logicalTimestamp=calendar.logicalTimestamp,
+            )
+        )
+
+    if user_data.categorizedItemsResponse.HasField("timestamp"):
+        timestamps.categorizedItemsTimestamp.CopyFrom(
+            user_data.categorizedItemsResponse.timestamp
+        )
+
+    if user_data.HasField("userCategoriesResponse"):
+        categories = user_data.userCategoriesResponse
+        timestamps.userCategoriesTimestamp.CopyFrom(
+            pb.PBTimestamp(
+                identifier=categories.identifier, timestamp=categories.timestamp
+            )
+        )
+
+    if user_data.listSettingsResponse.HasField("timestamp"):
+        timestamps.listSettingsTimestamp.CopyFrom(
+            user_data.listSettingsResponse.timestamp
+        )
+
+    if user_data.starterListSettingsResponse.HasField("timestamp"):
+        timestamps.starterListSettingsTimestamp.CopyFrom(
+            user_data.starterListSettingsResponse.timestamp
+        )
+
+    if user_data.HasField("mobileAppSettingsResponse"):
+        settings = user_data.mobileAppSettingsResponse
+        timestamps.mobileAppSettingsTimestamp.CopyFrom(
+            pb.PBTimestamp(identifier=settings.identifier, timestamp=settings.timestamp)
+        )
+
+    return timestamps
+
+
+def merge_user_data(
+    current: pb.PBUserDataResponse | None,
+    delta: pb.PBUserDataResponse,
+    replaced_lists: dict[str, pb.ShoppingList | None] | None = None,
+) -> pb.PBUserDataResponse:
+    """
+    Merge an incremental user data response into the locally held state.
+
+    ``current`` is updated in place: only the lists and sections present in
+    the delta are copied, so merging a small delta into a large account is
+    cheap. The result always holds every shopping list in
+    ``shoppingListsResponse.newLists``, so it can be used exactly like the
+    result of a full download (and as the base for the next merge).
+
+    Args:
+        current: The locally held user data, or None if there is none
+        delta: The response to an incremental user data request
+        replaced_lists: If given, receives a copy of each held list the delta
+            replaces or deletes, as it was before the merge, and None for
+            each list the delta adds (only these lists are copied)
+
+    Returns:
+        The merged user data (``current``, or ``delta`` if it was None)
+    """
+    if current is None:
+        _normalize_lists(delta.shoppingListsResponse)
+        if replaced_lists is not None:
+            replaced_lists.update(
+                dict.fromkeys(
+                    lst.identifier for lst in delta.shoppingListsResponse.newLists
+                )
+            )
+        return delta
+
+    if delta.HasField("shoppingListsResponse"):
+        _merge_lists(
+            current.shoppingListsResponse,
+            delta.shoppingListsResponse,
+            replaced_lists,
+        )
+
+    if delta.HasField("mealPlanningCalendarResponse"):
+        _merge_calendar(
+            current.mealPlanningCalendarResponse, delta.mealPlanningCalendarResponse
+        )
+
+    # The remaining sections are only sent (in full) when they changed.
+    for field in (
+        "listFoldersResponse",
+        "recipeDataResponse",
+        "categorizedItemsResponse",
+        "userCategoriesResponse",
+        "starterListsResponse",
+        "orderedStarterListIdsResponse",
+        "listSettingsResponse",
+        "starterListSettingsResponse",
+        "mobileAppSettingsResponse",
+    ):
+        if delta.HasField(field):
+            getattr(current, field).CopyFrom(getattr(delta, field))
+
+    return current
+
+
+def merge_sections(
+    current: pb.PBUserDataResponse,
+    fetched: pb.PBUserDataResponse,
+    sections: typing.Iterable[str],
+) -> pb.PBUserDataResponse:
+    """
+    Replace some sections of the locally held state with freshly fetched ones.
+
+    ``current`` is updated in place. A section missing from ``fetched`` is
+    cleared, since a full (non-incremental) response omits only empty ones.
+
+    Args:
+        current: The locally held user data
+        fetched: A full response decoded with only ``sections``
+        sections: Names of the top-level fields that were decoded
+
+    Returns:
+        The updated user data (``current``)
+    """
+    for name in sections:
+        if fetched.HasField(name):
+            getattr(current, name).CopyFrom(getattr(fetched, name))
+        else:
+            current.ClearField(name)
+    return current
+
+
+def _normalize_lists(lists_response: pb.ShoppingListsResponse) -> None:
+    """Fold modified lists into newLists, dropping the delta bookkeeping."""
+    _upsert(
+        lists_response.newLists,
+        lists_response.modifiedLists,
+        key=lambda lst: lst.identifier,
+    )
+    del lists_response.modifiedLists[:]
+    del lists_response.unmodifiedIds[:]
+    _order_lists(lists_response)
+
+
+def _merge_lists(
+    target: pb.ShoppingListsResponse,
+    delta: pb.ShoppingListsResponse,
+    replaced: dict[str, pb.ShoppingList | None] | None = None,
+) -> None:
+    """Merge a delta shopping lists response into target in place."""
+    present = {lst.identifier for lst in delta.newLists}
+    present.update(lst.identifier for lst in delta.modifiedLists)
+    present.update(delta.unmodifiedIds)
+
+    if replaced is not None:
+        held = {lst.identifier: lst for lst in target.newLists}
+        changed = [lst.identifier for lst in delta.newLists]
+        changed.extend(lst.identifier for lst in delta.modifiedLists)
+        changed.extend(list_id for list_id in held if list_id not in present)
+        for list_id in changed:
+            if list_id not in replaced:
+                old = held.get(list_id)
+                replaced[list_id] = _copy(old) if old is not None else None
+
+    # Lists the delta neither sent nor reported unmodified were deleted
+    _delete_where(target.newLists, lambda lst: lst.identifier not in present)
+    _delete_where(target.listResponses, lambda response: response.listId not in present)
+
+    def key(lst):
+        return lst.identifier
+
+    _upsert(target.newLists, delta.newLists, key=key)
+    _upsert(target.newLists, delta.modifiedLists, key=key)
+
+    positions = {
+        response.listId: index for index, response in enumerate(target.listResponses)
+    }
+    for response in delta.listResponses:
+        index = positions.get(response.listId)
+        if index is None:
+            positions[response.listId] = len(target.listResponses)
+            target.listResponses.append(response)
+        elif response.isFullSync:
+            target.listResponses[index].CopyFrom(response)
+        else:
+            _merge_list_response(target.listResponses[index], response)
+
+    if delta.orderedIds:
+        target.orderedIds[:] = delta.orderedIds
+    _order_lists(target)
+
+
+def _order_lists(lists_response: pb.ShoppingListsResponse) -> None:
+    """Sort newLists (and their listResponses) by orderedIds, if out of order.
+
+    Lists missing from orderedIds keep their relative order after the others.
+    """
+    rank = {list_id: index for index, list_id in enumerate(lists_response.orderedIds)}
+    order = [lst.identifier for lst in lists_response.newLists]
+    wanted = sorted(order, key=lambda list_id: rank.get(list_id, len(rank)))
+    if wanted != order:
+        positions = {list_id: index for index, list_id in enumerate(wanted)}
+        _replace(
+            lists_response.newLists,
+            sorted(lists_response.newLists, key=lambda lst: positions[lst.identifier]),
+        )
+    else:
+        positions = {list_id: index for index, list_id in enumerate(order)}
+
+    responses = [response.listId for response in lists_response.listResponses]
+    if responses != sorted(responses, key=positions.__getitem__):
+        _replace(
+            lists_response.listResponses,
+            sorted(
+                lists_response.listResponses,
+                key=lambda response: positions[response.listId],
+            ),
+        )
+
+
+def _merge_list_response(target: pb.PBListResponse, delta: pb.PBListResponse):
+    """Apply a partial list response (categories, rules, stores) to target."""
+    target.logicalTimestamp = delta.logicalTimestamp
+
+    groups = {
+        response.categoryGroup.identifier: response
+        for response in target.categoryGroupResponses
+    }
+    for response in delta.categoryGroupResponses:
+        groups[response.categoryGroup.identifier] = response
+    for group_id in delta.deletedCategoryGroupIds:
+        groups.pop(group_id, None)
+    _replace(target.categoryGroupResponses, groups.values())
+
+    _merge_by_identifier(
+        target.categorizationRules,
+        delta.categorizationRules,
+        delta.deletedCategorizationRuleIds,
+    )
+    _merge_by_identifier(target.stores, delta.stores, delta.deletedStoreIds)
+    _merge_by_identifier(
+        target.storeFilters, delta.storeFilters, delta.deletedStoreFilterIds
+    )
+
+
+def _merge_calendar(target: pb.PBCalendarResponse, delta: pb.PBCalendarResponse):
+    """Apply a calendar response to target, honouring isFullSync."""
+    if delta.isFullSync or not target.calendarId:
+        target.CopyFrom(delta)
+        return
+    target.logicalTimestamp = delta.logicalTimestamp
+    _merge_by_identifier(target.events, delta.events, delta.deletedEventIds)
+    _merge_by_identifier(target.labels, delta.labels, delta.deletedLabelIds)
+
+
+def _merge_by_identifier(target, updates, deleted_ids) -> None:
+    """Upsert ``updates`` into the repeated field ``target`` by identifier."""
+    if deleted_ids:
+        deleted = set(deleted_ids)
+        _delete_where(target, lambda message: message.identifier in deleted)
+    _upsert(target, updates, key=lambda message: message.identifier)
+
+
+def _upsert(target, updates, key) -> None:
+    """Copy ``updates`` over the messages of ``target`` with the same key.
+
+    Messages without a counterpart are appended; the others are left alone.
+    """
+    if not updates:
+        return
+    positions = {key(message): index for index, message in enumerate(target)}
+    for message in updates:
+        index = positions.get(key(message))
+        if index is None:
+            positions[key(message)] = len(target)
+            target.append(message)
+        else:
+            target[index].CopyFrom(message)
+
+
+def _delete_where(target, predicate) -> None:
+    """Delete the messages of a repeated field matching ``predicate``."""
+    indexes = [index for index, message in enumerate(target) if predicate(message)]
+    for index in reversed(indexes):
+        del target[index]
+
+
+def _replace(target, messages) -> None:
+    """Replace the contents of a repeated message field with ``messages``."""
+    copies = [_copy(message) for message in messages]
+    del target[:]
+    target.extend(copies)
+
+
+def _copy(message):
+    """Copy a message, e.g. to keep it after its repeated field changes."""
+    copy = type(message)()
+    copy.CopyFrom(message)
+    return copy
@@ -0,0 +1,32 @@
+"""Shared fixtures: a local fake AnyList server and a client logged into it."""
+
+from __future__ import annotations
+
+import pytest
+
+from anylist import AnyListClient
+from benchmarks.fake_server import FakeAnyListServer, make_user_data
+
+
+@pytest.fixture
+def user_data():
+    """A small account: two lists of ten items each."""
+    return make_user_data(20, items_per_list=10)
+
+
+@pytest.fixture
+async def server(user_data):
+    server = FakeAnyListServer(user_data)
+    server.url = await server.start()
+    yield server
+    await server.stop()
+
+
+@pytest.fixture
+async def client(server, tmp_path):
+    async with AnyListClient(
+        "user@example.com", "password", str(tmp_path / "credentials")
+    ) as client:
+        client.BASE_URL = server.url
+        await client.login()
+        yield client
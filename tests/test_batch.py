@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import asyncio
+
+import aiohttp
+import pytest
+
+UPDATE = "/data/shopping-lists/update"
+
+
+async def test_failed_flush_keeps_operations(client, server):
+    lst = (await client.get_lists())[0]
+
+    async with client.batch() as batch:
+        for item in lst.items[:3]:
+            item.checked = not item.checked
+            await item.save()
+        server.update_errors.append(400)
+        with pytest.raises(aiohttp.ClientResponseError):
+            await batch.flush()
+        assert len(batch) == 3
+        assert server.operations == 0
+
+    # Leaving the block sends them again
+    assert len(batch) == 0
+    assert server.operations == 3
+    assert len(batch.results) == 3 and all(batch.results.values())
+
+
+async def test_batch_only_captures_its_own_task(client, server):
+    lst = (await client.get_lists())[0]
+    first, second = lst.items[:2]
+    entered = asyncio.Event()
+    saved = asyncio.Event()
+
+    async def batched():
+        async with client.batch() as batch:
+            entered.set()
+            await saved.wait()
+            first.checked = not first.checked
+            await first.save()
+        return batch
+
+    task = asyncio.create_task(batched())
+    await entered.wait()
+    second.checked = not second.checked
+    await second.save()
+    assert server.requests[UPDATE] == 1
+    saved.set()
+
+    batch = await task
+    assert len(batch.results) == 1
+    assert server.requests[UPDATE] == 2
+
+
+async def test_failed_timer_flush_is_logged(client, server, caplog):
+    item = (await client.get_lists())[0].items[0]
+
+    async with client.batch(max_delay=0) as batch:
+        server.update_errors.append(400)
+        item.checked = not item.checked
+        await item.save()
+        timer = batch._timer
+        await timer
+
+        assert timer.exception() is None
+        assert "Failed to flush operation batch" in caplog.text
+        assert len(batch) == 1
+
+    assert server.operations == 1
+    assert len(batch) == 0
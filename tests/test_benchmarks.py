@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from benchmarks.fake_server import make_user_data
+from benchmarks.run import bench_size, summarize
+
+
+def test_make_user_data_is_deterministic():
+    assert make_user_data(30, items_per_list=7) == make_user_data(30, items_per_list=7)
+    assert make_user_data(30, seed=1) != make_user_data(30)
+
+    lists = make_user_data(30, items_per_list=7).shoppingListsResponse.newLists
+    assert [len(lst.items) for lst in lists] == [7, 7, 7, 7, 2]
+
+
+def test_summarize_percentiles():
+    summary = summarize([0.001 * n for n in range(1, 101)])
+
+    assert summary["n"] == 100
+    assert round(summary["p50_ms"], 6) == 50.5
+    assert round(summary["p99_ms"], 6) == 99.01
+
+
+async def test_bench_size_runs_every_benchmark():
+    results = await bench_size(10, repeat=2, writes=3)
+
+    assert set(results) >= {"login", "full_sync", "find_item_by_name", "save"}
+    assert results["login"]["n"] == 2
+    # Three single adds, three saves and one batched request for three adds
+    assert results["server"]["operations"] == 9
+    assert results["server"]["requests"]["/data/shopping-lists/update"] == 7
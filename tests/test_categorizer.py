@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import pytest
+
+from anylist import Categorizer
+from anylist import messages_pb2 as pb
+
+
+@pytest.fixture
+def categorized(user_data):
+    """The user data with a list rule and a previously categorized item."""
+    response = user_data.shoppingListsResponse.listResponses.add(listId="list0000")
+    response.categoryGroupResponses.add(
+        categoryGroup=pb.PBListCategoryGroup(
+            identifier="group",
+            listId="list0000",
+            categories=[
+                pb.PBListCategory(
+                    identifier="cold", categoryGroupId="group", systemCategory="dairy"
+                )
+            ],
+        )
+    )
+    response.categorizationRules.add(
+        identifier="rule",
+        listId="list0000",
+        categoryGroupId="group",
+        itemName="Oat Milk",
+        categoryId="cold",
+    )
+    user_data.categorizedItemsResponse.categorizedItems.add(
+        name="oat milk", categoryMatchId="beverages"
+    )
+    user_data.categorizedItemsResponse.categorizedItems.add(
+        name="Sourdough", categoryMatchId="bakery"
+    )
+    return user_data
+
+
+def test_list_rule_wins_over_learned_category(categorized):
+    categorizer = Categorizer.from_user_data(categorized)
+
+    assert categorizer.categorize("OAT  milk", "list0000") == "dairy"
+    assert categorizer.categorize("oat milk", "list0001") == "beverages"
+    assert categorizer.categorize("sourdough") == "bakery"
+    assert categorizer.categorize("caviar") is None
+
+
+def test_category_assignment_follows_list_rule(categorized):
+    categorizer = Categorizer.from_user_data(categorized)
+
+    assignment = categorizer.category_assignment("oat milk", "list0000")
+
+    assert (assignment.categoryGroupId, assignment.categoryId) == ("group", "cold")
+    assert categorizer.category_assignment("oat milk", "list0001") is None
+
+
+async def test_new_items_are_categorized_locally(client, server, categorized):
+    server.set_user_data(categorized)
+    lst = await client.get_list_by_name("List 0")
+
+    explicit = client.create_item()
+    explicit.name = "Sourdough"
+    explicit.category = "other"
+    milk, bread = await lst.add_items(["Oat Milk", explicit])
+
+    assert milk.category == "dairy"
+    [assignment] = milk._pb.categoryAssignments
+    assert assignment.categoryId == "cold"
+    assert bread.category == "other"
+
+
+async def test_auto_categorize_can_be_turned_off(client, server, categorized):
+    server.set_user_data(categorized)
+    client.auto_categorize = False
+    lst = await client.get_list_by_name("List 0")
+
+    [milk] = await lst.add_items(["Oat Milk"])
+
+    assert milk.category == "other"
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+from anylist import AnyListClient, SnapshotStore
+from anylist import messages_pb2 as pb
+
+
+async def test_release_drops_every_cache(client):
+    await client.get_lists()
+    await client.get_recipes()
+    await client.get_meal_plan()
+    client.item_index
+    client.name_index
+    client.categorizer
+
+    client._release_user_data()
+
+    assert client.user_data is None
+    assert client._caches == {}
+    assert client._recipe_book is None
+    assert client._meal_plan is None
+
+
+async def test_refresh_rebuilds_cached_wrappers(client):
+    lst = (await client.get_lists())[0]
+    assert (await client.get_lists())[0] is lst
+
+    await client.get_user_data(refresh=True)
+
+    assert (await client.get_lists())[0] is not lst
+
+
+async def test_failed_snapshot_write_keeps_fetched_data(client, tmp_path, caplog):
+    blocked = tmp_path / "snapshots"
+    blocked.write_text("not a directory")
+    client.snapshot_store = SnapshotStore(str(blocked))
+
+    user_data = await client.get_user_data(refresh=True)
+
+    assert client.user_data is user_data
+    assert "Failed to write user data snapshot" in caplog.text
+
+
+async def test_cold_start_answers_from_snapshot(client, server, tmp_path):
+    store = SnapshotStore(str(tmp_path / "snapshots"))
+    client.snapshot_store = store
+    await client.get_user_data()
+    changed = pb.PBUserDataResponse()
+    changed.CopyFrom(server.user_data)
+    changed.shoppingListsResponse.newLists[0].name = "Groceries"
+    server.set_user_data(changed)
+
+    restarted = AnyListClient(
+        client.email,
+        client.password,
+        client.credentials_file,
+        snapshot_store=store,
+        session=client.session,
+    )
+    restarted.BASE_URL = server.url
+    await restarted.login()
+
+    lists = await restarted.get_lists()
+    assert lists[0].name == "List 0"
+    await restarted.wait_until_revalidated()
+    assert (await restarted.get_lists())[0].name == "Groceries"
+    assert store.load(client.email).shoppingListsResponse.newLists[0].name == (
+        "Groceries"
+    )
+
+
+def test_unreadable_snapshot_is_ignored(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    with open(store.path("user@example.com"), "wb") as f:
+        f.write(b"\xff not a message")
+
+    assert store.load("user@example.com") is None
+    assert store.load("other@example.com") is None
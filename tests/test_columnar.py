@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import pytest
+
+from anylist import ITEM_COLUMNS, item_arrays, item_columns, item_table
+from anylist import messages_pb2 as pb
+
+
+def test_item_columns_follow_list_and_item_order(user_data):
+    columns = item_columns(user_data)
+
+    assert list(columns) == list(ITEM_COLUMNS)
+    assert columns["name"][:2] == ["item 0-0", "item 0-1"]
+    assert columns["name"][10] == "item 1-0"
+    assert columns["listId"].count("list0001") == 10
+    assert all(len(values) == 20 for values in columns.values())
+
+
+def test_item_columns_of_no_items():
+    assert item_columns(pb.PBUserDataResponse()) == {name: [] for name in ITEM_COLUMNS}
+
+
+def test_item_table(user_data):
+    pytest.importorskip("pyarrow")
+
+    table = item_table(user_data)
+
+    assert table.num_rows == 20
+    assert table.column("checked").to_pylist() == item_columns(user_data)["checked"]
+
+
+def test_item_arrays(user_data):
+    np = pytest.importorskip("numpy")
+
+    arrays = item_arrays(user_data)
+
+    assert arrays["manualSortIndex"].dtype == np.int64
+    assert arrays["checked"].sum() == sum(item_columns(user_data)["checked"])
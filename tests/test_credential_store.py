@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import pytest
+
+from anylist import (
+    CredentialStore,
+    FileCredentialStore,
+    MemoryCredentialStore,
+    SQLiteCredentialStore,
+)
+
+CREDENTIALS = {"clientId": "client", "accessToken": "a", "refreshToken": "r"}
+
+
+def test_base_class_is_abstract():
+    with pytest.raises(TypeError):
+        CredentialStore()
+
+
+def test_file_store_round_trip(tmp_path):
+    path = str(tmp_path / "credentials")
+    FileCredentialStore(path).save("user", CREDENTIALS, "password")
+
+    assert FileCredentialStore(path).load("user", "password") == CREDENTIALS
+
+
+def test_store_keeps_derived_key_not_password(tmp_path):
+    store = SQLiteCredentialStore(str(tmp_path / "credentials.db"))
+    store.save("a@example.com", CREDENTIALS, "secret-a")
+    store.save("b@example.com", dict(CREDENTIALS, clientId="b"), "secret-b")
+
+    assert all(isinstance(key, bytes) for key in store._keys.values())
+    assert store._keys["a@example.com"] != store._keys["b@example.com"]
+    store.close()
+    reopened = SQLiteCredentialStore(str(tmp_path / "credentials.db"))
+    assert reopened.load("b@example.com", "secret-b")["clientId"] == "b"
+    reopened.close()
+
+
+def test_unchanged_credentials_are_not_written(tmp_path):
+    store = FileCredentialStore(str(tmp_path / "credentials"))
+    store.save("user", CREDENTIALS, "password")
+    writes = []
+    store._write = lambda key, encrypted: writes.append(key)
+
+    store.save("user", dict(CREDENTIALS), "password")
+    store.save("user", dict(CREDENTIALS, accessToken="b"), "password")
+
+    assert writes == ["user"]
+
+
+def test_memory_store_forgets_deleted_credentials():
+    store = MemoryCredentialStore()
+    store.save("user", CREDENTIALS, "password")
+
+    store.delete("user")
+
+    assert store.load("user", "password") is None
+
+
+def test_changed_password_reencrypts_credentials(tmp_path):
+    path = str(tmp_path / "credentials.db")
+    store = SQLiteCredentialStore(path)
+    store.save("user", CREDENTIALS, "old-password")
+
+    store.save("user", CREDENTIALS, "new-password")
+    store.close()
+
+    reopened = SQLiteCredentialStore(path)
+    assert reopened.load("user", "new-password") == CREDENTIALS
+    reopened.close()
+    assert "old-password" not in repr(store.__dict__)
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+
+import pytest
+
+from anylist import EXPORT_FIELDS, export_arrow, export_csv, export_ndjson
+
+
+async def test_export_ndjson_streams_every_item(client):
+    f = io.StringIO()
+
+    count = await export_ndjson(client.iter_items(), f, chunk_size=3)
+
+    records = [json.loads(line) for line in f.getvalue().splitlines()]
+    assert count == len(records) == 20
+    assert list(records[0]) == list(EXPORT_FIELDS)
+    assert records[10]["name"] == "item 1-0"
+    assert records[10]["listId"] == "list0001"
+
+
+async def test_export_csv_writes_header_and_rows(client):
+    f = io.StringIO(newline="")
+
+    count = await export_csv(
+        client.iter_items(lists=["list0001"], checked=False), f, chunk_size=4
+    )
+
+    rows = list(csv.DictReader(io.StringIO(f.getvalue())))
+    assert count == len(rows)
+    assert rows and all(row["listId"] == "list0001" for row in rows)
+    assert all(row["checked"] == "False" for row in rows)
+
+
+async def test_export_csv_of_no_items(client):
+    f = io.StringIO()
+
+    assert await export_csv(client.iter_items(lists=["unknown"]), f) == 0
+    assert f.getvalue().splitlines() == [",".join(EXPORT_FIELDS)]
+
+
+async def test_export_arrow(client):
+    pa = pytest.importorskip("pyarrow")
+    sink = io.BytesIO()
+
+    count = await export_arrow(client.iter_items(), sink, chunk_size=8)
+
+    table = pa.ipc.open_stream(sink.getvalue()).read_all()
+    assert count == table.num_rows == 20
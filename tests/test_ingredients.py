@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from fractions import Fraction
+
+import pytest
+
+from anylist import RecipeUse, aggregate_ingredients, parse_quantity
+from anylist import messages_pb2 as pb
+
+
+@pytest.mark.parametrize(
+    ("text", "amount", "unit"),
+    [
+        ("2 cups", Fraction(2), "cup"),
+        ("1 1/2 tbsp", Fraction(3, 2), "tbsp"),
+        ("1½ cup", Fraction(3, 2), "cup"),
+        ("10/2 cups", Fraction(5), "cup"),
+        ("12/4 oz", Fraction(3), "oz"),
+        ("1,000 g", Fraction(1000), "g"),
+        ("2,500,000 ml", Fraction(2_500_000), "ml"),
+        ("1,5 l", Fraction(3, 2), "l"),
+        ("12,25 kg", Fraction(49, 4), "kg"),
+    ],
+)
+def test_parse_quantity_amounts(text, amount, unit):
+    assert parse_quantity(text) == (amount, unit, "")
+
+
+def test_parse_quantity_without_amount():
+    assert parse_quantity("a pinch") == (None, "", "a pinch")
+
+
+def _recipe(identifier, *ingredients):
+    return pb.PBRecipe(
+        identifier=identifier,
+        name=identifier,
+        ingredients=[
+            pb.PBIngredient(name=name, quantity=quantity)
+            for name, quantity in ingredients
+        ],
+    )
+
+
+def test_aggregate_ingredients_adds_up_by_name_and_dimension():
+    soup = _recipe("soup", ("Onion", "1"), ("Stock", "2 cups"), ("Salt", "a pinch"))
+    stew = _recipe("stew", ("onion ", "2"), ("stock", "120 ml"), ("Salt", "1 tsp"))
+    stew.ingredients.add(isHeading=True, name="For serving")
+
+    totals = aggregate_ingredients([soup, RecipeUse(stew, scale=2)])
+
+    assert list(totals) == ["onion", "stock", "salt"]
+    assert totals["onion"].quantity_text == "5"
+    # 2 cups plus 240 ml, in the unit first seen
+    assert totals["stock"].quantity_text == "3 cup"
+    assert totals["salt"].quantity_text == "2 tsp + a pinch"
+    assert totals["onion"].recipe_ids == ["soup", "stew"]
+
+
+async def test_add_recipes_merges_into_existing_items(client, server):
+    lst = (await client.get_lists())[0]
+    existing = lst.items[0]
+    existing.quantity = "1 cup"
+    if existing.checked:
+        existing.checked = False
+    await existing.save()
+    recipe = _recipe("cake", (existing.name, "2 cups"), ("Sugar", "100 g"))
+    requests = server.requests["/data/shopping-lists/update"]
+
+    merged, sugar = await lst.add_recipes([RecipeUse(recipe, scale=0.5)])
+
+    assert merged is existing
+    assert existing.quantity == "2 cup"
+    assert sugar.quantity == "50 g"
+    assert sugar._pb.recipeId == "cake"
+    assert server.requests["/data/shopping-lists/update"] == requests + 1
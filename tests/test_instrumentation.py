@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import anylist.client
+from anylist import AnyListClient, MetricsCollector, RequestScheduler
+
+
+async def test_metrics_collector_counts_requests_and_retries(server, tmp_path):
+    metrics = MetricsCollector()
+    async with AnyListClient(
+        "user@example.com",
+        "password",
+        str(tmp_path / "credentials"),
+        scheduler=RequestScheduler(base_delay=0),
+        instrumentation=metrics,
+    ) as client:
+        client.BASE_URL = server.url
+        await client.login()
+        item = (await client.get_lists())[0].items[0]
+        item.details = "organic"
+        server.update_errors = [503]
+        await item.save()
+
+    assert metrics.token_refreshes == {"fetch": 1}
+    assert metrics.requests[("data/user-data/get", "200")] == 1
+    assert metrics.requests[("data/shopping-lists/update", "503")] == 1
+    assert metrics.requests[("data/shopping-lists/update", "200")] == 1
+    assert metrics.retries == {"data/shopping-lists/update": 1}
+    assert metrics.response_bytes["data/user-data/get"] == len(
+        server.user_data.SerializeToString()
+    )
+    assert metrics.latency["data/user-data/get"].count == 1
+    assert metrics.parse_time["data/user-data/get"].count == 1
+
+    text = metrics.render_prometheus()
+    assert (
+        'anylist_requests_total{endpoint="data/user-data/get",status="200"} 1' in text
+    )
+    assert 'anylist_retries_total{endpoint="data/shopping-lists/update"} 1' in text
+
+
+async def test_uninstrumented_client_skips_timing(client, server, monkeypatch):
+    def fail(*args):
+        raise AssertionError("timed a request without instrumentation")
+
+    monkeypatch.setattr(anylist.client, "_RequestTimer", fail)
+
+    await client.get_lists()
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import pytest
+
+from anylist import SnapshotStore
+
+
+@pytest.fixture
+def user_data(user_data):
+    calendar = user_data.mealPlanningCalendarResponse
+    calendar.calendarId = "calendar"
+    calendar.events.add(identifier="event", date="2026-10-19", title="Soup")
+    return user_data
+
+
+async def test_first_refresh_fetches_all_user_data(client, tmp_path):
+    client.snapshot_store = SnapshotStore(str(tmp_path / "snapshots"))
+
+    meal_plan = await client.get_meal_plan(refresh=True)
+
+    assert [event.title for event in meal_plan] == ["Soup"]
+    assert len(client.user_data.shoppingListsResponse.newLists) == 2
+    stored = client.snapshot_store.load(client.email)
+    assert len(stored.shoppingListsResponse.newLists) == 2
+
+
+async def test_refresh_keeps_other_sections(client):
+    await client.get_lists()
+
+    meal_plan = await client.get_meal_plan(refresh=True)
+
+    assert meal_plan.events_on("2026-10-19")[0].title == "Soup"
+    assert len(client.user_data.shoppingListsResponse.newLists) == 2
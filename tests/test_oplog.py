@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import aiohttp
+import pytest
+
+from anylist import OperationLog
+from anylist import messages_pb2 as pb
+from anylist.common import uuid
+
+PATH = "data/shopping-lists/update"
+
+
+def _operations(count):
+    return [
+        pb.PBListOperation(
+            metadata=pb.PBOperationMetadata(
+                operationId=uuid(), handlerId="set-list-item-checked"
+            ),
+            listId="list0000",
+        )
+        for _ in range(count)
+    ]
+
+
+@pytest.fixture
+def log(client, tmp_path):
+    client.operation_log = OperationLog(str(tmp_path / "operations.log"), fsync=False)
+    return client.operation_log
+
+
+def test_replay_drops_torn_record(tmp_path):
+    path = str(tmp_path / "operations.log")
+    log = OperationLog(path, fsync=False)
+    operations = _operations(3)
+    log.append(PATH, operations)
+    log.acknowledge([operations[0].metadata.operationId])
+    with open(path, "ab") as f:
+        # A record header promising more bytes than were written
+        f.write(b"\x01\x00\x00\x01\x00partial")
+
+    replayed = OperationLog(path, fsync=False)
+
+    assert [op for _, op in replayed.pending()] == operations[1:]
+    with open(path, "rb") as f:
+        assert b"partial" not in f.read()
+    replayed.append(PATH, _operations(1))
+    assert len(OperationLog(path, fsync=False)) == 3
+
+
+@pytest.mark.parametrize("errors", [[401, 401], [403], [408]])
+async def test_auth_and_timeout_errors_keep_operations(client, server, log, errors):
+    log.append(PATH, _operations(2))
+    server.update_errors.extend(errors)
+
+    with pytest.raises(aiohttp.ClientResponseError):
+        await client.flush_operation_log()
+
+    assert len(log) == 2
+    assert all((await client.flush_operation_log()).values())
+    assert len(log) == 0
+
+
+async def test_rejected_operations_are_dropped(client, server, log):
+    log.append(PATH, _operations(2))
+    server.update_errors.append(400)
+
+    results = await client.flush_operation_log()
+
+    assert list(results.values()) == [False, False]
+    assert len(log) == 0
+
+
+async def test_unprocessed_operations_stay_pending(client, server, log):
+    operations = _operations(3)
+    log.append(PATH, operations)
+    server.unprocessed_operations = 1
+
+    results = await client.flush_operation_log()
+
+    assert list(results.values()) == [False, True, True]
+    assert [op for _, op in log.pending()] == operations[:1]
+    assert server.requests[f"/{PATH}"] == 1
+    await client.flush_operation_log()
+    assert len(log) == 0
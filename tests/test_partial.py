@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import pytest
+
+from anylist import messages_pb2 as pb
+from anylist import parse_user_data
+
+SECTIONS = ["mealPlanningCalendarResponse"]
+
+
+@pytest.fixture
+def user_data(user_data):
+    user_data.mealPlanningCalendarResponse.calendarId = "calendar"
+    user_data.mealPlanningCalendarResponse.events.add(identifier="event", title="Soup")
+    user_data.userCategoriesResponse.identifier = "categories"
+    return user_data
+
+
+def test_parse_user_data_skips_other_sections(user_data):
+    parsed = parse_user_data(user_data.SerializeToString(), SECTIONS)
+
+    assert parsed.mealPlanningCalendarResponse == user_data.mealPlanningCalendarResponse
+    assert not parsed.HasField("shoppingListsResponse")
+    assert not parsed.HasField("userCategoriesResponse")
+
+
+def test_parse_user_data_rejects_unknown_sections(user_data):
+    with pytest.raises(ValueError):
+        parse_user_data(user_data.SerializeToString(), ["noSuchResponse"])
+
+
+async def test_sections_refresh_merges_into_held_data(client, server, user_data):
+    held = await client.get_user_data()
+    changed = pb.PBUserDataResponse()
+    changed.CopyFrom(user_data)
+    changed.mealPlanningCalendarResponse.events[0].title = "Stew"
+    del changed.shoppingListsResponse.newLists[1:]
+    server.set_user_data(changed)
+
+    result = await client.get_user_data(refresh=True, sections=SECTIONS)
+
+    assert result is held is client.user_data
+    assert result.mealPlanningCalendarResponse.events[0].title == "Stew"
+    assert len(result.shoppingListsResponse.newLists) == 2
+    assert result.userCategoriesResponse.identifier == "categories"
+
+
+async def test_sections_fetch_without_held_data_is_not_kept(client):
+    partial = await client.get_user_data(refresh=True, sections=SECTIONS)
+
+    assert partial.mealPlanningCalendarResponse.calendarId == "calendar"
+    assert not partial.HasField("shoppingListsResponse")
+    assert client.user_data is None
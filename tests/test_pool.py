@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from anylist import AccountPool
+
+
+async def _pool_of(server, tmp_path, count, **kwargs):
+    pool = AccountPool(credentials_dir=str(tmp_path / "pool"), **kwargs)
+    await pool.__aenter__()
+    for index in range(count):
+        client = pool.add(f"account-{index}", f"user{index}@example.com", "password")
+        client.BASE_URL = server.url
+    return pool
+
+
+async def test_clients_share_session_and_scheduler(server, tmp_path):
+    pool = await _pool_of(server, tmp_path, 3)
+    try:
+        errors = await pool.login_all()
+
+        assert errors == dict.fromkeys(pool)
+        clients = [pool[key] for key in pool]
+        assert {id(client.session) for client in clients} == {id(pool.session)}
+        assert {id(client.scheduler) for client in clients} == {id(pool.scheduler)}
+        assert server.requests["/auth/token"] == 3
+    finally:
+        await pool.__aexit__(None, None, None)
+
+    assert pool.session.closed
+
+
+async def test_idle_accounts_are_evicted_over_budget(server, tmp_path):
+    # Room for the data of one account
+    budget = server.user_data.ByteSize()
+    pool = await _pool_of(server, tmp_path, 3, memory_budget=budget)
+    try:
+        for key in pool:
+            async with pool.use(key) as client:
+                await client.get_lists()
+                # An account in use keeps its data
+                assert client.user_data is not None
+
+        held = [key for key in pool if pool[key].user_data is not None]
+        assert held == ["account-2"]
+
+        async with pool.use("account-0") as client:
+            assert len(await client.get_lists()) == 2
+    finally:
+        await pool.__aexit__(None, None, None)
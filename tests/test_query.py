@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import pytest
+
+from anylist import ItemIndex
+from anylist import messages_pb2 as pb
+
+
+def _scan(user_data, **criteria):
+    return [
+        item
+        for lst in user_data.shoppingListsResponse.newLists
+        for item in lst.items
+        if all(getattr(item, field) == value for field, value in criteria.items())
+    ]
+
+
+@pytest.fixture
+def stocked(user_data):
+    """The user data with two stores and a store filter on the first list."""
+    items = user_data.shoppingListsResponse.newLists[0].items
+    items[0].storeIds.append("store-a")
+    items[1].storeIds.extend(["store-a", "store-b"])
+    items[2].storeIds.append("store-b")
+    response = user_data.shoppingListsResponse.listResponses.add(listId="list0000")
+    response.stores.add(identifier="store-a", listId="list0000")
+    response.stores.add(identifier="store-b", listId="list0000")
+    response.storeFilters.add(
+        identifier="filter-a",
+        listId="list0000",
+        storeIds=["store-a"],
+        includesUnassignedItems=True,
+    )
+    return user_data
+
+
+def test_query_matches_a_scan(user_data):
+    index = ItemIndex(user_data)
+
+    for criteria in (
+        {"checked": False},
+        {"checked": True, "categoryMatchId": "dairy"},
+        {"listId": "list0001", "userId": "user2"},
+    ):
+        assert index.query(**criteria) == _scan(user_data, **criteria)
+    assert len(index.query()) == 20
+    assert index.query(categoryMatchId="caviar") == []
+
+
+def test_query_any_of_several_values(stocked):
+    index = ItemIndex(stocked)
+    items = stocked.shoppingListsResponse.newLists[0].items
+
+    assert index.query(storeIds="store-b") == [items[1], items[2]]
+    assert index.query(storeIds=["store-a", "store-b"]) == list(items[:3])
+    with pytest.raises(ValueError):
+        index.query(name="item 0-0")
+
+
+def test_store_filter_includes_unassigned_items(stocked):
+    index = ItemIndex(stocked)
+    items = stocked.shoppingListsResponse.newLists[0].items
+
+    shown = index.store_filter("filter-a")
+
+    assert items[2] not in shown
+    assert shown == [items[0], items[1], *items[3:]]
+    assert index.store_filter("filter-a", checked=True) == [
+        item for item in shown if item.checked
+    ]
+
+
+def test_smart_filter_combines_indexed_and_scanned_conditions(user_data):
+    index = ItemIndex(user_data)
+    conditions = [
+        pb.PBSmartCondition(fieldID="listId", operatorID="is", value="list0001"),
+        pb.PBSmartCondition(fieldID="name", operatorID="ends-with", value="-3"),
+    ]
+    items = user_data.shoppingListsResponse.newLists[1].items
+
+    match_all = pb.PBSmartFilter(
+        requiresMatchingAllConditions=True, conditions=conditions
+    )
+    match_any = pb.PBSmartFilter(conditions=conditions)
+
+    assert index.smart_filter(match_all) == [items[3]]
+    assert index.smart_filter(match_any) == [
+        user_data.shoppingListsResponse.newLists[0].items[3],
+        *items,
+    ]
+
+
+def test_smart_filter_rejects_unknown_operators(user_data):
+    condition = pb.PBSmartCondition(fieldID="name", operatorID="sounds-like")
+
+    with pytest.raises(ValueError):
+        ItemIndex(user_data).smart_filter(pb.PBSmartFilter(conditions=[condition]))
+
+
+async def test_saved_change_is_reindexed(client):
+    lst = (await client.get_lists())[0]
+    item = lst.items[0]
+    category = "caviar"
+    assert await client.query_items(categoryMatchId=category) == []
+
+    item.category = category
+    await item.save()
+
+    assert await client.query_items(categoryMatchId=category) == [item]
+
+
+def test_smart_filter_operators_ignore_case(user_data):
+    index = ItemIndex(user_data)
+    dairy = _scan(user_data, categoryMatchId="dairy")
+
+    for operator, value in (
+        ("is", "DAIRY"),
+        ("is", "Dairy"),
+        ("begins-with", "DAI"),
+        ("ends-with", "AIRY"),
+    ):
+        condition = pb.PBSmartCondition(
+            fieldID="categoryMatchId", operatorID=operator, value=value
+        )
+        assert index.smart_filter(pb.PBSmartFilter(conditions=[condition])) == dairy
+    condition = pb.PBSmartCondition(fieldID="name", operatorID="is", value="ITEM 1-2")
+    assert index.smart_filter(pb.PBSmartFilter(conditions=[condition])) == [
+        user_data.shoppingListsResponse.newLists[1].items[2]
+    ]
+
+
+def test_smart_filter_rejects_message_fields(user_data):
+    condition = pb.PBSmartCondition(fieldID="quantityPb", operatorID="is", value="2")
+
+    with pytest.raises(ValueError):
+        ItemIndex(user_data).smart_filter(pb.PBSmartFilter(conditions=[condition]))
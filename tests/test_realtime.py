@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from anylist import RealtimeSync
+from anylist import messages_pb2 as pb
+
+
+@pytest.fixture
+async def sync(client, server):
+    async with RealtimeSync(client) as sync:
+        await asyncio.wait_for(sync.wait_connected(), 5)
+        while not server.listeners:
+            await asyncio.sleep(0.01)
+        yield sync
+
+
+def _listen(sync, list_id=None) -> asyncio.Queue:
+    changes = asyncio.Queue()
+    sync.add_listener(changes.put_nowait, list_id)
+    return changes
+
+
+async def _next(changes):
+    return await asyncio.wait_for(changes.get(), 5)
+
+
+async def test_binary_delta_updates_items(client, server, sync):
+    lst = client.user_data.shoppingListsResponse.newLists[0]
+    item = pb.ListItem()
+    item.CopyFrom(lst.items[0])
+    item.name = "Oat Milk"
+    removed_id = lst.items[1].identifier
+    changes = _listen(sync, lst.identifier)
+
+    await server.push(
+        pb.PBWatchSyncResponse(
+            logicalTimestamp=7,
+            listItems=[item],
+            deletedListItemIds=[removed_id],
+        ).SerializeToString()
+    )
+    change = await _next(changes)
+
+    assert [updated.name for updated in change.updated_items] == ["Oat Milk"]
+    assert change.deleted_item_ids == [removed_id]
+    assert lst.items[0].name == "Oat Milk"
+    assert len(lst.items) == 9
+    assert sync.logical_timestamp == 7
+
+
+async def test_full_sync_replaces_lists(client, server, sync):
+    first, second = client.user_data.shoppingListsResponse.newLists
+    kept = pb.ShoppingList()
+    kept.CopyFrom(first)
+    kept.timestamp += 1
+    del kept.items[5:]
+    changes = _listen(sync)
+
+    await server.push(
+        pb.PBWatchSyncResponse(
+            isFullSync=True, shoppingLists=[kept]
+        ).SerializeToString()
+    )
+    received = [await _next(changes), await _next(changes)]
+
+    assert {change.list_id: len(change.deleted_item_ids) for change in received} == {
+        kept.identifier: 5,
+        second.identifier: 0,
+    }
+    assert received[1].list_deleted
+    lists = client.user_data.shoppingListsResponse.newLists
+    assert [len(lst.items) for lst in lists] == [5]
+
+
+async def test_refresh_message_fetches_changes(client, server, sync, user_data):
+    changed = pb.PBUserDataResponse()
+    changed.CopyFrom(user_data)
+    lst = changed.shoppingListsResponse.newLists[1]
+    lst.timestamp += 1
+    lst.items[0].checked = not lst.items[0].checked
+    server.set_user_data(changed)
+    changes = _listen(sync)
+
+    await server.push("refresh-shopping-lists")
+    change = await _next(changes)
+
+    assert change.list_id == lst.identifier
+    assert [item.identifier for item in change.updated_items] == [
+        lst.items[0].identifier
+    ]
+    assert server.requests["/data/user-data/get"] == 2
+
+
+async def test_refresh_reports_deleted_items_and_lists(client, server, sync):
+    changed = pb.PBUserDataResponse()
+    changed.CopyFrom(server.user_data)
+    first, second = changed.shoppingListsResponse.newLists
+    first.timestamp += 1
+    removed_id = first.items[0].identifier
+    del first.items[0]
+    del changed.shoppingListsResponse.newLists[1]
+    server.set_user_data(changed)
+    changes = _listen(sync)
+
+    await server.push("refresh-shopping-lists")
+    received = {}
+    for _ in range(2):
+        change = await _next(changes)
+        received[change.list_id] = change
+
+    assert received[first.identifier].deleted_item_ids == [removed_id]
+    assert not received[first.identifier].updated_items
+    assert received[second.identifier].list_deleted
+
+
+async def test_deltas_delete_items_through_the_item_index(client, server, sync):
+    lists = client.user_data.shoppingListsResponse.newLists
+    first_id = lists[1].items[0].identifier
+    changes = _listen(sync)
+
+    await server.push(
+        pb.PBWatchSyncResponse(deletedListItemIds=[first_id]).SerializeToString()
+    )
+    assert (await _next(changes)).deleted_item_ids == [first_id]
+    assert first_id not in sync._item_lists
+
+    # Added since the index was built, so it is built again
+    [added] = await (await client.get_lists())[0].add_items(["Oat Milk"])
+    await server.push(
+        pb.PBWatchSyncResponse(
+            deletedListItemIds=[added.identifier, "unknown"]
+        ).SerializeToString()
+    )
+    change = await _next(changes)
+
+    assert change.list_id == lists[0].identifier
+    assert change.deleted_item_ids == [added.identifier]
+    assert [len(lst.items) for lst in lists] == [10, 9]
+
+
+async def test_stop_ends_watch_iterators(sync):
+    changes = sync.watch()
+    waiting = asyncio.ensure_future(anext(changes))
+    await asyncio.sleep(0)
+
+    await sync.stop()
+
+    with pytest.raises(StopAsyncIteration):
+        await asyncio.wait_for(waiting, 5)
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import pytest
+
+from anylist import AnyListClient
+from anylist import messages_pb2 as pb
+
+
+@pytest.fixture
+def user_data(user_data):
+    recipes = user_data.recipeDataResponse
+    recipes.recipeDataId = "recipes"
+    recipes.timestamp = 1_700_000_000
+    for index in range(3):
+        recipes.recipes.add(
+            identifier=f"recipe{index}",
+            name=f"Recipe {index}",
+            servings="4",
+            ingredients=[pb.PBIngredient(name="Flour", quantity=f"{index + 1} cups")],
+        )
+    return user_data
+
+
+@pytest.fixture
+async def lazy_client(server, tmp_path):
+    async with AnyListClient(
+        "user@example.com",
+        "password",
+        str(tmp_path / "credentials"),
+        lazy_recipes=True,
+    ) as client:
+        client.BASE_URL = server.url
+        await client.login()
+        yield client
+
+
+async def test_lazy_recipes_decode_on_first_use(lazy_client):
+    book = await lazy_client.get_recipes()
+
+    assert len(book) == 3
+    assert not lazy_client.user_data.recipeDataResponse.recipes
+    recipe = book.find_by_name("recipe 1")
+    assert recipe.identifier == "recipe1"
+    assert not any(other.decoded for other in book)
+
+    assert recipe.ingredients[0].quantity == "2 cups"
+    assert recipe.servings == "4"
+    assert [other.decoded for other in book] == [False, True, False]
+
+
+async def test_lazy_recipe_book_is_kept_across_refreshes(lazy_client):
+    book = await lazy_client.get_recipes()
+
+    assert await lazy_client.get_recipes() is book
+    refreshed = await lazy_client.get_recipes(refresh=True)
+
+    assert refreshed.get("recipe2").name == "Recipe 2"
+
+
+async def test_eager_recipes_are_decoded(client):
+    book = await client.get_recipes()
+
+    assert all(recipe.decoded for recipe in book)
+    assert (
+        book.get("recipe0").message is (client.user_data.recipeDataResponse.recipes[0])
+    )
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import aiohttp
+import pytest
+from multidict import CIMultiDict
+
+from anylist import RequestScheduler
+
+
+def _error(status, retry_after=None):
+    headers = CIMultiDict()
+    if retry_after is not None:
+        headers["Retry-After"] = retry_after
+    return aiohttp.ClientResponseError(None, (), status=status, headers=headers)
+
+
+def _failing(*errors):
+    calls = []
+
+    async def send():
+        calls.append(len(calls))
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return "ok"
+
+    return send, calls
+
+
+async def test_transient_errors_are_retried_after_retry_after():
+    scheduler = RequestScheduler(base_delay=0)
+    send, calls = _failing(_error(429, "0"), _error(503))
+    retries = []
+
+    result = await scheduler.run(send, on_retry=lambda *args: retries.append(args))
+
+    assert result == "ok"
+    assert len(calls) == 3
+    assert [(attempt, delay) for attempt, delay, _ in retries] == [(1, 0.0), (2, 0.0)]
+
+
+async def test_non_idempotent_requests_are_not_retried():
+    send, calls = _failing(_error(503))
+
+    with pytest.raises(aiohttp.ClientResponseError):
+        await RequestScheduler(base_delay=0).run(send, idempotent=False)
+
+    assert len(calls) == 1
+
+
+async def test_client_errors_are_not_retried():
+    send, calls = _failing(_error(400))
+
+    with pytest.raises(aiohttp.ClientResponseError):
+        await RequestScheduler(base_delay=0).run(send)
+
+    assert len(calls) == 1
+
+
+async def test_retries_stop_after_max_retries():
+    send, calls = _failing(*[_error(500)] * 3)
+
+    with pytest.raises(aiohttp.ClientResponseError):
+        await RequestScheduler(max_retries=2, base_delay=0).run(send)
+
+    assert len(calls) == 3
+
+
+def test_retry_after_is_capped_by_max_delay():
+    scheduler = RequestScheduler(max_delay=5)
+
+    assert scheduler.backoff(0, retry_after=120) == 5
+    assert 0 <= scheduler.backoff(3) <= 4
+
+
+async def test_client_retries_failed_update(client, server):
+    client.scheduler = RequestScheduler(base_delay=0)
+    item = (await client.get_lists())[0].items[0]
+    item.details = "organic"
+    server.update_errors = [503, 502]
+
+    await item.save()
+
+    assert server.requests["/data/shopping-lists/update"] == 3
+    assert server.operations == 1
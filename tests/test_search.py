@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from anylist import NameIndex, build_name_index
+from anylist import messages_pb2 as pb
+
+
+def _index(*names):
+    index = NameIndex()
+    for value, name in enumerate(names):
+        index.add(name, value)
+    return index
+
+
+def test_prefix_lists_names_alphabetically():
+    index = _index("Tomatoes", "tomato paste", "Tortillas", "tofu", "Apples")
+
+    matches = index.prefix("TOM")
+
+    assert [match.name for match in matches] == ["tomato paste", "tomatoes"]
+    assert matches[1].values == [0]
+    assert [match.name for match in index.prefix("to", limit=2)] == [
+        "tofu",
+        "tomato paste",
+    ]
+
+
+def test_search_finds_misspelled_and_plural_names():
+    index = _index("Tomatoes", "Potatoes", "Tofu", "Bananas")
+
+    best, *others = index.search("tomato")
+
+    assert best.name == "tomatoes"
+    assert all(match.score < best.score for match in others)
+    assert index.search("tomatoes")[0].score == 1.0
+    assert index.search("xyz") == []
+
+
+def test_removed_name_is_no_longer_found():
+    index = _index("Milk", "milk")
+
+    index.remove("MILK", 0)
+    assert index.get("milk") == [1]
+
+    index.remove("milk", 1)
+    assert "milk" not in index
+    assert index.search("milk") == []
+    assert index.prefix("mi") == []
+
+
+def test_name_index_covers_every_source(user_data):
+    starter = user_data.starterListsResponse
+    starter.recentItemListsResponse.listResponses.add(
+        starterList=pb.StarterList(
+            identifier="recent", items=[pb.ListItem(name="Kale")]
+        )
+    )
+    user_data.categorizedItemsResponse.categorizedItems.add(name="kale", listId="x")
+
+    index = build_name_index(user_data)
+
+    assert [entry.source for entry in index.get("kale")] == ["recent", "categorized"]
+    assert [entry.list_id for entry in index.get("item 1-2")] == ["list0001"]
+    assert not build_name_index(user_data, sources=["item"]).get("kale")
+
+
+async def test_fuzzy_add_reuses_a_similar_item(client, server):
+    lst = (await client.get_lists())[0]
+    existing = lst.items[0]
+
+    [same] = await lst.add_items([existing.name + "s"], fuzzy=True)
+    [new] = await lst.add_items([existing.name + "s"])
+
+    assert same is existing
+    assert new is not existing
+    assert lst.search_items(existing.name)[:2] == [existing, new]
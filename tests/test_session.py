@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from anylist import AnyListClient, create_session
+
+
+async def test_client_does_not_close_a_shared_session(server, tmp_path):
+    session = create_session()
+    try:
+        async with AnyListClient(
+            "user@example.com",
+            "password",
+            str(tmp_path / "credentials"),
+            session=session,
+        ) as client:
+            client.BASE_URL = server.url
+            await client.login()
+
+        assert not session.closed
+    finally:
+        await session.close()
+
+
+async def test_clients_on_one_session_keep_their_own_tokens(server, tmp_path):
+    async with create_session() as session:
+        clients = [
+            AnyListClient(
+                f"user{index}@example.com",
+                "password",
+                str(tmp_path / f"credentials{index}"),
+                session=session,
+            )
+            for index in range(2)
+        ]
+        for client in clients:
+            client.BASE_URL = server.url
+            await client.__aenter__()
+            await client.login()
+            await client.get_lists()
+
+        assert clients[0].access_token != clients[1].access_token
+        assert "Authorization" not in session.headers
+        for client in clients:
+            await client.__aexit__(None, None, None)
+        assert not session.closed
@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+from anylist import IngredientTotal
+
+
+async def test_find_item_by_name_ignores_case(client):
+    lst = (await client.get_lists())[0]
+
+    item = await lst.find_item_by_name("ITEM 0-3")
+
+    assert item is lst.items[3]
+    assert lst.find_item_by_id(item.identifier) is item
+
+
+async def test_rename_moves_item_in_name_index(client):
+    lst = (await client.get_lists())[0]
+    item = lst.items[0]
+
+    item.name = "Oat Milk"
+
+    assert await lst.find_item_by_name("item 0-0") is None
+    assert await lst.find_item_by_name("oat milk") is item
+
+
+async def test_removed_item_is_no_longer_found(client, server):
+    lst = (await client.get_lists())[0]
+    item = lst.items[1]
+
+    await lst.remove_item(item)
+
+    assert await lst.find_item_by_name(item.name) is None
+    assert lst.find_item_by_id(item.identifier) is None
+    assert item not in lst.items
+    assert server.requests["/data/shopping-lists/update"] == 1
+
+
+async def test_saved_category_is_remembered(client):
+    lst = (await client.get_lists())[0]
+    item = lst.items[2]
+
+    item.category = "beverages"
+    await item.save()
+
+    assert client.categorizer.categorize(item.name.upper()) == "beverages"
+
+
+async def test_iter_items_sees_added_and_removed_items(client):
+    lst = (await client.get_lists())[0]
+    removed = lst.items[0]
+
+    [added] = await lst.add_items(["Oat Milk"])
+    await lst.remove_item(removed)
+
+    items = [item async for item in client.iter_items(lists=[lst.identifier])]
+    assert added in items
+    assert removed not in items
+    assert len(items) == 10
+
+
+async def test_query_items_sees_added_and_removed_items(client):
+    lst = (await client.get_lists())[0]
+    removed = lst.items[0]
+    before = await client.query_items(listId=lst.identifier)
+
+    [added] = await lst.add_items(["Oat Milk"])
+    await lst.remove_item(removed)
+
+    items = await client.query_items(listId=lst.identifier)
+    assert len(before) == len(items) == 10
+    assert added in items
+    assert removed not in items
+
+
+async def test_name_index_sees_added_and_removed_items(client):
+    lst = (await client.get_lists())[0]
+    removed = lst.items[0]
+    assert client.name_index.get(removed.name)
+
+    await lst.add_items(["Oat Milk"])
+    await lst.remove_item(removed)
+
+    assert not client.name_index.get(removed.name)
+    [entry] = client.name_index.get("oat milk")
+    assert entry.list_id == lst.identifier
+
+
+async def test_added_ingredient_quantity_matches_server_value(client, server):
+    lst = (await client.get_lists())[0]
+    total = IngredientTotal("Flour")
+    total.add_quantity("2 cups")
+
+    [item] = await lst.add_ingredients([total])
+
+    assert item.quantity == "2 cup"
+    assert item._server_value("quantity") == "2 cup"
+    assert (item._pb.quantityPb.amount, item._pb.quantityPb.unit) == ("2", "cup")
+
+    [again] = await lst.add_ingredients([total])
+
+    assert again is item
+    assert item.quantity == "4 cup"
+    assert server.operations == 2
+
+
+async def test_add_items_adds_each_name_once(client, server):
+    lst = (await client.get_lists())[0]
+    existing = lst.items[4]
+    if existing.checked:
+        existing.checked = False
+        await existing.save()
+    requests = server.requests.get("/data/shopping-lists/update", 0)
+
+    results = await lst.add_items(["Oat Milk", "oat milk", existing.name.upper()])
+
+    assert results[0] is results[1]
+    assert results[2] is existing
+    assert len(lst.items) == 11
+    assert server.requests["/data/shopping-lists/update"] == requests + 1
+
+
+async def test_add_items_unchecks_a_checked_item(client, server):
+    lst = (await client.get_lists())[0]
+    existing = lst.items[5]
+    if not existing.checked:
+        existing.checked = True
+        await existing.save()
+    operations = server.operations
+
+    [result] = await lst.add_items([existing.name])
+
+    assert result is existing
+    assert not existing.checked
+    assert len(lst.items) == 10
+    assert server.operations == operations + 1
+
+
+async def test_remove_items_by_name_removes_all_matches(client, server):
+    lst = (await client.get_lists())[0]
+    name = lst.items[0].name
+    [duplicate] = await lst.add_items([client.create_item()])
+    duplicate.name = name
+    requests = server.requests.get("/data/shopping-lists/update", 0)
+
+    removed = await lst.remove_items([name, name.upper(), "not on the list"])
+
+    assert len(removed) == 2
+    assert await lst.find_item_by_name(name) is None
+    assert server.requests["/data/shopping-lists/update"] == requests + 1
+
+
+async def test_items_are_wrapped_and_decoded_lazily(client):
+    first, second = await client.get_lists()
+    assert first._items is None
+
+    item = first.find_item_by_id(first._pb.items[2].identifier)
+
+    assert item is first.items[2]
+    assert not any(other._decoded for other in first.items)
+    assert second._items is None
+    assert item.name == "item 0-2"
+    assert item._decoded
+    assert await client.get_list_by_name("list 0") is first
+
+
+async def test_saved_rename_moves_item_in_name_index(client):
+    lst = (await client.get_lists())[0]
+    item = lst.items[0]
+    old_name = item.name
+    assert client.name_index.get(old_name)
+
+    item.name = "Oat Milk"
+    await item.save()
+
+    assert not client.name_index.get(old_name)
+    [entry] = client.name_index.get("oat milk")
+    assert entry.item.identifier == item.identifier
+    assert [match.name for match in client.name_index.search("oat milk")] == [
+        "oat milk"
+    ]
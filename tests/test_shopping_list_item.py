@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from anylist.shopping_list_item import FIELD_BITS
+
+
+async def test_field_set_back_is_not_sent(client, server):
+    lst = (await client.get_lists())[0]
+    item = lst.items[0]
+    name = item.name
+
+    item.name = "Oat Milk"
+    item.name = name
+    assert item._save_operations() == []
+    await item.save()
+
+    assert "/data/shopping-lists/update" not in server.requests
+    assert item._save_operations() == []
+
+
+async def test_only_changed_fields_are_sent(client, server):
+    lst = (await client.get_lists())[0]
+    item = lst.items[0]
+    name = item.name
+
+    item.details = "organic"
+    item.checked = not item.checked
+    item.checked = not item.checked
+    [operation] = item._save_operations()
+    await item.save()
+
+    assert operation.metadata.handlerId == "set-list-item-details"
+    assert operation.updatedValue == "organic"
+    assert server.requests["/data/shopping-lists/update"] == 1
+    assert server.operations == 1
+    assert item.name == name
+
+
+async def test_saved_value_is_the_new_original(client, server):
+    lst = (await client.get_lists())[0]
+    item = lst.items[0]
+
+    item.details = "organic"
+    await item.save()
+    item.details = "organic"
+
+    assert item._save_operations() == []
+    item.details = ""
+    [operation] = item._save_operations()
+    assert operation.originalValue == "organic"
+
+
+async def test_items_have_slots_and_dirty_bits(client):
+    item = (await client.get_lists())[0].items[0]
+    assert not hasattr(item, "__dict__")
+
+    item.quantity = 3
+    item.category = "dairy"
+
+    assert item._dirty == FIELD_BITS["quantity"] | FIELD_BITS["category"]
+    assert item.encode().quantityPb.amount == "3"
+    item._mark_saved()
+    assert item._dirty == 0
+    assert item._pb.categoryMatchId == "dairy"
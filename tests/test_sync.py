@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from anylist import messages_pb2 as pb
+from anylist.sync import merge_user_data
+from benchmarks.fake_server import make_user_data
+
+
+def _delta(user_data, modified=(), new=(), deleted=()):
+    """An incremental response: only the given lists changed."""
+    lists = user_data.shoppingListsResponse
+    changed = {lst.identifier for lst in (*modified, *new)} | set(deleted)
+    return pb.PBUserDataResponse(
+        shoppingListsResponse=pb.ShoppingListsResponse(
+            newLists=list(new),
+            modifiedLists=list(modified),
+            unmodifiedIds=[
+                lst.identifier
+                for lst in lists.newLists
+                if lst.identifier not in changed
+            ],
+        )
+    )
+
+
+def test_merge_replaces_only_modified_lists():
+    current = make_user_data(30, items_per_list=10)
+    lists = current.shoppingListsResponse.newLists
+    untouched = lists[0]
+    modified = pb.ShoppingList()
+    modified.CopyFrom(lists[1])
+    modified.name = "Renamed"
+    del modified.items[3:]
+
+    merged = merge_user_data(current, _delta(current, modified=[modified]))
+
+    assert merged is current
+    assert [lst.name for lst in lists] == ["List 0", "Renamed", "List 2"]
+    assert len(lists[1].items) == 3
+    assert lists[0] is untouched
+
+
+def test_merge_adds_new_and_drops_deleted_lists():
+    current = make_user_data(30, items_per_list=10)
+    lists = current.shoppingListsResponse.newLists
+    new = pb.ShoppingList(identifier="new-list", name="New")
+
+    merge_user_data(current, _delta(current, new=[new], deleted=[lists[1].identifier]))
+
+    assert [lst.name for lst in lists] == ["List 0", "List 2", "New"]
+    assert not current.shoppingListsResponse.modifiedLists
+    assert not current.shoppingListsResponse.unmodifiedIds
+
+
+def test_merge_follows_ordered_ids():
+    current = make_user_data(30, items_per_list=10)
+    ids = [lst.identifier for lst in current.shoppingListsResponse.newLists]
+    delta = _delta(current)
+    delta.shoppingListsResponse.orderedIds.extend(reversed(ids))
+
+    merge_user_data(current, delta)
+
+    assert [lst.identifier for lst in current.shoppingListsResponse.newLists] == ids[
+        ::-1
+    ]
+
+
+def test_merge_without_current_normalizes_delta():
+    base = make_user_data(20, items_per_list=10)
+    lists = base.shoppingListsResponse.newLists
+    delta = pb.PBUserDataResponse(
+        shoppingListsResponse=pb.ShoppingListsResponse(
+            newLists=[lists[0]], modifiedLists=[lists[1]]
+        )
+    )
+
+    merged = merge_user_data(None, delta)
+
+    assert [lst.identifier for lst in merged.shoppingListsResponse.newLists] == [
+        lists[0].identifier,
+        lists[1].identifier,
+    ]
+    assert not merged.shoppingListsResponse.modifiedLists
+
+
+def test_merge_keeps_sections_missing_from_delta():
+    current = make_user_data(10, items_per_list=10)
+    current.userCategoriesResponse.identifier = "categories"
+
+    merge_user_data(current, _delta(current))
+
+    assert current.userCategoriesResponse.identifier == "categories"
+    assert len(current.shoppingListsResponse.newLists) == 1
+
+
+def test_merge_reports_only_the_lists_it_replaced():
+    current = make_user_data(30, items_per_list=10)
+    lists = current.shoppingListsResponse.newLists
+    modified = pb.ShoppingList()
+    modified.CopyFrom(lists[0])
+    del modified.items[5:]
+    deleted_id = lists[2].identifier
+    new = pb.ShoppingList(identifier="new-list", name="New")
+    replaced = {}
+
+    merge_user_data(
+        current,
+        _delta(current, modified=[modified], new=[new], deleted=[deleted_id]),
+        replaced_lists=replaced,
+    )
+
+    assert set(replaced) == {modified.identifier, deleted_id, "new-list"}
+    assert len(replaced[modified.identifier].items) == 10
+    assert replaced[deleted_id].name == "List 2"
+    assert replaced["new-list"] is None
@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import asyncio
+
+from anylist import RequestScheduler
+
+
+async def test_concurrent_401s_share_one_refresh(client, server):
+    lst = (await client.get_lists())[0]
+    items = lst.items[:5]
+    for item in items:
+        item.details = "organic"
+    token = client.access_token
+    server.update_errors = [401] * len(items)
+
+    await asyncio.gather(*(item.save() for item in items))
+
+    assert server.requests["/auth/token/refresh"] == 1
+    # Only the login fetched tokens with the password
+    assert server.requests["/auth/token"] == 1
+    assert client.access_token != token
+    assert server.operations == len(items)
+
+
+async def test_refresh_after_another_caller_refreshed_is_skipped(client, server):
+    token = client.access_token
+    await client._refresh_tokens_once(token)
+
+    await client._refresh_tokens_once(token)
+
+    assert server.requests["/auth/token/refresh"] == 1
+
+
+async def test_timed_out_refresh_is_not_retried(client, monkeypatch):
+    client.scheduler = RequestScheduler(base_delay=0)
+    posted = []
+
+    def post(url, **kwargs):
+        posted.append(url)
+        raise asyncio.TimeoutError
+
+    monkeypatch.setattr(client.session, "post", post)
+
+    assert not await client._refresh_tokens()
+    assert posted == [f"{client.BASE_URL}/auth/token/refresh"]